@@ -0,0 +1,154 @@
+"""
+EPV API load test.
+
+Drives the ASGI app with many concurrent clients and reports latency
+percentiles, throughput and status codes. By default the app runs in-process
+against an in-memory results store seeded with synthetic analyses (no network,
+no LLM), so the numbers measure the service itself: routing, coalescing,
+caching, serialization. Pass --url to load-test a running server instead.
+
+    python -m benchmarks.bench_api --requests 5000 --concurrency 64
+    python -m benchmarks.bench_api --url http://127.0.0.1:8000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api.app import create_app
+from src.api.testing import asgi_request
+from src.data.results_store import ResultsStore
+from src.finance.valuation import value_company
+
+
+def synthetic_record(ticker, rng):
+    revenue = rng.uniform(5e8, 2e10)
+    financials = {
+        "ticker": ticker, "revenue": revenue, "prev_revenue": revenue / rng.uniform(1.0, 1.5),
+        "ebit": revenue * rng.uniform(-0.2, 0.3), "sga": revenue * 0.4, "rnd": revenue * 0.2, "tax_rate": 0.21,
+        "shares_outstanding": rng.uniform(1e8, 2e9), "cash": revenue * 0.3, "debt": revenue * 0.1,
+    }
+    market_data = {"price": rng.uniform(10, 400), "market_cap": revenue * rng.uniform(2, 15),
+                   "company_name": f"{ticker} Inc", "sector": "Software", "is_mock": True}
+    ai_estimates = {"maintenance_sga_percent": 0.4, "maintenance_rnd_percent": 0.5, "reasoning": "synthetic"}
+    return {"ticker": ticker, "financials": financials, "mda": {"text": "", "is_mock": True},
+            "market_data": market_data, "ai_estimates": ai_estimates,
+            "valuation": value_company(financials, market_data, ai_estimates)}
+
+
+def make_requests(tickers, count, rng):
+    # Mostly single valuations (hot tickers + WACC variants), some batches and sweeps
+    hot = tickers[:max(len(tickers) // 10, 1)]
+    plan = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            plan.append(("GET", f"/valuation/{rng.choice(hot)}", None))
+        elif roll < 0.8:
+            plan.append(("GET", f"/valuation/{rng.choice(tickers)}?wacc={rng.choice([0.08, 0.09, 0.1, 0.11])}", None))
+        elif roll < 0.95:
+            plan.append(("GET", "/valuations?tickers=" + ",".join(rng.sample(hot, min(5, len(hot)))), None))
+        else:
+            plan.append(("POST", "/scenarios", {
+                "tickers": rng.sample(hot, min(3, len(hot))),
+                "scenarios": [{"name": f"wacc{w}", "cost_of_capital": w} for w in (0.08, 0.1, 0.12)],
+            }))
+    return plan
+
+
+async def run_in_process(plan, concurrency, tickers, revalidate, seed):
+    rng = random.Random(seed)
+    store = ResultsStore(":memory:")
+    for ticker in tickers:
+        store.put(synthetic_record(ticker, rng))
+    app = create_app(store=store)
+    etags = {}
+    queue = list(reversed(plan))
+    latencies, statuses = [], Counter()
+
+    async def client():
+        while queue:
+            method, url, body = queue.pop()
+            headers = {}
+            if revalidate and url in etags and rng.random() < revalidate:
+                headers["If-None-Match"] = etags[url]
+            start = time.perf_counter()
+            status, response_headers, _ = await asgi_request(app, method, url, headers=headers, body=body or b"")
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if "etag" in response_headers:
+                etags[url] = response_headers["etag"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start, app.state.service
+
+
+def run_against_url(plan, concurrency, base_url):
+    import json
+
+    def send(item):
+        method, url, body = item
+        data = json.dumps(body).encode() if body else None
+        request = urllib.request.Request(base_url.rstrip("/") + url, data=data, method=method,
+                                         headers={"Content-Type": "application/json"} if data else {})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, plan))
+    return [r[0] for r in results], Counter(r[1] for r in results), time.perf_counter() - start
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def report(latencies, statuses, elapsed):
+    print(f"requests={len(latencies)}  elapsed={elapsed:.2f}s  throughput={len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50={percentile(latencies, 50) * 1000:.2f}ms  p90={percentile(latencies, 90) * 1000:.2f}ms  "
+          f"p99={percentile(latencies, 99) * 1000:.2f}ms  mean={statistics.mean(latencies) * 1000:.2f}ms")
+    print("status codes: " + ", ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--tickers", type=int, default=200, help="Size of the synthetic universe")
+    parser.add_argument("--revalidate", type=float, default=0.3,
+                        help="Share of repeat requests sent with If-None-Match (in-process mode)")
+    parser.add_argument("--url", default=None, help="Load-test a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    tickers = sorted({"".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4)) for _ in range(args.tickers)})
+    plan = make_requests(tickers, args.requests, rng)
+
+    if args.url:
+        report(*run_against_url(plan, args.concurrency, args.url))
+        return
+    latencies, statuses, elapsed, service = asyncio.run(
+        run_in_process(plan, args.concurrency, tickers, args.revalidate, args.seed)
+    )
+    report(latencies, statuses, elapsed)
+    print(f"response cache hits={service.cache.hits} misses={service.cache.misses}  coalesced={service.coalesced}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+MD&A parsing scaling benchmark.
+
+Generates a batch of synthetic 10-K-sized fixture filings and parses them with
+FilingParserPool at increasing worker counts, reporting throughput and speedup
+over the single-process baseline.
+
+    python -m benchmarks.bench_filing_parser --filings 64 --size-mb 3 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+from src.data.filing_parser import FilingParserPool
+
+
+def make_fixture_filing(index, size_mb):
+    paragraph = (
+        f"<p style='font-family:Times'>Company {index} revenue increased driven by new customers. "
+        "Net Revenue Retention remained above 115% and we expanded into new geographies.</p>\n"
+    )
+    filler = "<tr><td>Item</td><td>1,234</td><td>5,678</td></tr>\n"
+    target = int(size_mb * 1024 * 1024)
+    head = "<html><body><p>Item 7. Management's Discussion and Analysis</p><p>Item 8. Financial Statements</p>"
+    mda = "<p>Item 7. Management's Discussion and Analysis of Financial Condition</p>" + paragraph * 2000
+    tail = "<p>Item 7A. Quantitative and Qualitative Disclosures</p>"
+    padding = filler * max((target - len(head) - len(mda) - len(tail)) // len(filler), 0)
+    return (head + mda + tail + padding + "</body></html>").encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filings", type=int, default=64)
+    parser.add_argument("--size-mb", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    documents = [make_fixture_filing(i, args.size_mb) for i in range(args.filings)]
+    total_mb = sum(len(doc) for doc in documents) / 1024 / 1024
+    print(f"{args.filings} filings, {total_mb:.0f} MB total, {os.cpu_count()} CPUs available")
+
+    baseline = None
+    for workers in args.workers:
+        with FilingParserPool(max_workers=workers) as pool:
+            pool.parse(documents[:workers])  # warm up worker processes
+            start = time.perf_counter()
+            sections = pool.parse(documents)
+            elapsed = time.perf_counter() - start
+
+        assert all(sections), "every fixture filing has an MD&A section"
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} {elapsed:6.2f}s  {total_mb / elapsed:7.1f} MB/s  speedup {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
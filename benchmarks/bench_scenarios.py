@@ -0,0 +1,65 @@
+"""
+Scenario sweep benchmark.
+
+Builds a synthetic universe of companies and a WACC x maintenance x tax
+scenario grid, then times run_scenarios in-process and with worker processes.
+
+    python -m benchmarks.bench_scenarios --tickers 10000 --scenarios 1000 --workers 1 4 8
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.finance.financials import NUMERIC_FIELDS, FinancialsBatch
+from src.finance.scenarios import run_scenarios, scenario_grid
+
+
+def make_universe(size, seed=0):
+    rng = np.random.default_rng(seed)
+    revenue = rng.lognormal(20, 1.5, size)
+    columns = {name: revenue * rng.uniform(0.05, 0.6, size) for name in NUMERIC_FIELDS}
+    columns.update(
+        revenue=revenue,
+        prev_revenue=revenue / rng.uniform(0.9, 1.6, size),
+        ebit=revenue * rng.uniform(-0.3, 0.35, size),
+        tax_rate=rng.uniform(0.1, 0.3, size),
+        shares_outstanding=rng.uniform(5e7, 2e9, size),
+    )
+    return FinancialsBatch([f"T{i:05d}" for i in range(size)], columns)
+
+
+def make_scenarios(count):
+    # Roughly `count` scenarios as a cube of WACC x maintenance S&M x tax rate
+    side = max(round(count ** (1 / 3)), 1)
+    return scenario_grid(
+        cost_of_capital=np.linspace(0.06, 0.15, side),
+        maintenance_sga_percent=np.linspace(0.1, 1.0, side),
+        tax_rate=np.linspace(0.1, 0.3, side),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=10_000)
+    parser.add_argument("--scenarios", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    batch = make_universe(args.tickers)
+    scenarios = make_scenarios(args.scenarios)
+    cells = len(batch) * len(scenarios)
+    print(f"{len(batch)} tickers x {len(scenarios)} scenarios = {cells:,} valuations, {os.cpu_count()} CPUs available")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        frame = run_scenarios(batch, scenarios, max_workers=workers, parallel_min_cells=0 if workers > 1 else cells + 1)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers:<3} {elapsed:6.2f}s  {cells / elapsed / 1e6:6.1f}M valuations/s  "
+              f"{frame.memory_usage().sum() / 1024 ** 2:,.0f} MB frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,628 @@
+"""
+Streamlit session load test.
+
+How many concurrent users can one replica of main.py serve? This harness
+simulates N concurrent sessions, each opening one or more tickers and then
+moving the adjustment / WACC sliders. SEC EDGAR, yfinance and OpenAI are
+replaced by local stubs (OfflineServices) that answer after a configurable
+latency, so the run is fully offline and repeatable. It reports throughput,
+latency percentiles, memory growth and the hit rate of every cache layer:
+the results store, single-flight coalescing, the shared cache, the negative
+cache, and the upstream calls that got through anyway.
+
+Two targets:
+
+- pipeline  Each session runs on its own thread (like a Streamlit script run)
+            and makes the calls main.py makes: load_analysis / load_analyses
+            for the tickers, then one ValuationGraph per ticker for slider moves
+- app       Each session drives main.py through streamlit's AppTest, so every
+            ticker change and slider move is a full script rerun with widgets
+            and rendering included. Slower; use fewer sessions
+
+    python -m benchmarks.bench_sessions --users 32 --sessions 400
+    python -m benchmarks.bench_sessions --target app --users 8 --sessions 24
+    python -m benchmarks.bench_sessions --json load.json --max-p99-ms 3000 --max-rss-growth-mb 50
+
+With --max-p99-ms / --max-rss-growth-mb the exit status is 1 when a budget is
+exceeded, so the run can gate CI on scaling regressions.
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.ai.parser import LLM_FLIGHTS
+from src.cache.backends import MemoryCache, get_cache, set_cache
+from src.data import market_data, sec_fetcher
+from src.data.market_data import QUOTE_FLIGHTS
+from src.data.negative_cache import NEGATIVE_CACHE
+from src.data.results_store import ResultsStore
+from src.data.sec_fetcher import FETCH_FLIGHTS
+from src.finance.valuation_graph import ValuationGraph
+from src.pipeline import ANALYSIS_FLIGHTS, load_analyses, load_analysis
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+# main.py's ticker box starts on this ticker, so every app session loads it first
+LANDING_TICKER = "SHOP"
+
+# (graph input, app slider key prefix or label, low, high, step)
+SLIDERS = (
+    ("maintenance_sga_percent", "maint_sga_", 0.0, 1.0, 0.01),
+    ("maintenance_rnd_percent", "maint_rnd_", 0.0, 1.0, 0.01),
+    ("cost_of_capital", "Cost of Capital (WACC)", 0.05, 0.15, 0.005),
+)
+
+TICKER_MAP_URL = "https://www.sec.gov/files/company_tickers.json"
+SUBMISSIONS_PREFIX = "https://data.sec.gov/submissions/CIK"
+FILING_PREFIX = "https://www.sec.gov/Archives/edgar/data/"
+
+
+class OfflineServices:
+    """
+    Local stand-ins for SEC EDGAR, yfinance and OpenAI over a synthetic
+    universe. Tickers outside the universe are unknown to every service, like
+    a typo. Each request sleeps about `latency` seconds (LLM calls
+    `llm_latency`, spread over the streamed chunks), releasing the GIL like
+    real network I/O.
+
+        services = OfflineServices(["SHOP", "DDOG"], latency=0.05)
+        with services.installed(workdir):
+            load_analysis("DDOG")
+
+    Attributes:
+        calls (Counter): Upstream requests answered, by service
+    """
+
+    def __init__(self, universe, latency=0.05, llm_latency=0.8, seed=0):
+        self.ciks = {ticker: 1000 + i for i, ticker in enumerate(universe)}
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    @contextmanager
+    def installed(self, workdir):
+        """
+        Routes every external call to the stubs and points the caches and
+        stores at `workdir` for the duration of the block.
+        """
+        environ = {
+            "OPENAI_API_KEY": "offline-stub",
+            "FILING_ARCHIVE_DIR": os.path.join(workdir, "filings"),
+            "RESULTS_STORE_PATH": os.path.join(workdir, "results.db"),
+        }
+        openai = types.ModuleType("openai")
+        openai.OpenAI = self._openai_client
+        with ExitStack() as stack:
+            stack.enter_context(patch.dict(os.environ, environ))
+            os.environ.pop("FMP_API_KEY", None)
+            stack.enter_context(patch.dict(sys.modules, {"openai": openai}))
+            stack.enter_context(patch.object(sec_fetcher, "requests", types.SimpleNamespace(Session=self._sec_session)))
+            stack.enter_context(patch.object(sec_fetcher, "yf", types.SimpleNamespace(Ticker=self._yfinance_ticker)))
+            stack.enter_context(patch.object(market_data, "yf", types.SimpleNamespace(Ticker=self._yfinance_ticker)))
+            stack.enter_context(patch.object(sec_fetcher, "DEFAULT_INDEX_PATH", os.path.join(workdir, "edgar_index.db")))
+            previous_cache = set_cache(MemoryCache())
+            stack.callback(set_cache, previous_cache)
+            NEGATIVE_CACHE.clear()
+            stack.callback(NEGATIVE_CACHE.clear)
+            yield self
+
+    def company(self, ticker):
+        """
+        Deterministic synthetic fundamentals for a known ticker, None otherwise.
+        """
+        if ticker not in self.ciks:
+            return None
+        rng = random.Random(ticker)
+        revenue = rng.uniform(5e8, 2e10)
+        return {
+            "revenue": revenue, "prev_revenue": revenue / rng.uniform(1.0, 1.5), "cogs": revenue * 0.25,
+            "sga": revenue * rng.uniform(0.25, 0.45), "rnd": revenue * rng.uniform(0.1, 0.3),
+            "ebit": revenue * rng.uniform(-0.2, 0.3), "shares": rng.uniform(1e8, 2e9),
+            "price": rng.uniform(10, 400), "market_cap": revenue * rng.uniform(2, 15),
+            "nrr": rng.randint(100, 135),
+        }
+
+    # --- Internal helpers ---
+    def _wait(self, service, seconds):
+        with self._lock:
+            self.calls[service] += 1
+            jitter = self._rng.uniform(0.5, 1.5)
+        time.sleep(seconds * jitter)
+
+    def _yfinance_ticker(self, ticker):
+        return _StubStock(self, ticker)
+
+    def _sec_session(self):
+        return _StubSession(self)
+
+    def _openai_client(self, api_key=None):
+        services = self
+        completions = types.SimpleNamespace(create=lambda **request: services._completion(**request))
+        return types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+    def _completion(self, model, messages, stream=False, **kwargs):
+        # Any well-formed estimate will do; derive it from the prompt so it is stable per company
+        rng = random.Random(messages[-1]["content"])
+        text = json.dumps({
+            "maintenance_sga_percent": round(rng.uniform(0.3, 0.7), 2),
+            "maintenance_rnd_percent": round(rng.uniform(0.2, 0.6), 2),
+            "reasoning": "Offline stub estimate: retention-driven S&M, platform upkeep R&D.",
+        })
+        usage = {"prompt_tokens": sum(len(m["content"]) for m in messages) // 4, "completion_tokens": len(text) // 4}
+        if not stream:
+            self._wait("openai", self.llm_latency)
+            message = types.SimpleNamespace(content=text)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+        return self._stream(text, usage)
+
+    def _stream(self, text, usage):
+        chunks = [text[i:i + 24] for i in range(0, len(text), 24)]
+        self._wait("openai", self.llm_latency / (len(chunks) + 1))
+        for chunk in chunks:
+            time.sleep(self.llm_latency / (len(chunks) + 1))
+            delta = types.SimpleNamespace(content=chunk)
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+        yield types.SimpleNamespace(choices=[], usage=usage)
+
+
+class _StubStock:
+    # yfinance fetches each property lazily, one request apiece
+    def __init__(self, services, ticker):
+        self._services = services
+        self._company = services.company(ticker)
+        self._ticker = ticker
+
+    @property
+    def income_stmt(self):
+        self._services._wait("yfinance", self._services.latency)
+        c = self._company
+        if c is None:
+            return pd.DataFrame()
+        rows = ["Total Revenue", "Cost Of Revenue", "Selling General Administrative", "Research Development",
+                "Operating Income", "Tax Provision", "Pretax Income"]
+        latest = [c["revenue"], c["cogs"], c["sga"], c["rnd"], c["ebit"], abs(c["ebit"]) * 0.2, abs(c["ebit"])]
+        prior = [c["prev_revenue"]] + [value * c["prev_revenue"] / c["revenue"] for value in latest[1:]]
+        return pd.DataFrame({"2024-12-31": latest, "2023-12-31": prior}, index=rows)
+
+    financials = income_stmt
+
+    @property
+    def balance_sheet(self):
+        self._services._wait("yfinance", self._services.latency)
+        c = self._company
+        if c is None:
+            return pd.DataFrame()
+        rows = ["Cash And Cash Equivalents", "Total Debt", "Accounts Receivable", "Total Current Liabilities",
+                "Total Stockholder Equity"]
+        revenue = c["revenue"]
+        return pd.DataFrame({"2024-12-31": [revenue * 0.4, revenue * 0.15, revenue * 0.1, revenue * 0.3, revenue]},
+                            index=rows)
+
+    @property
+    def info(self):
+        self._services._wait("yfinance", self._services.latency)
+        c = self._company
+        if c is None:
+            return {"trailingPegRatio": None}
+        return {"currentPrice": c["price"], "marketCap": c["market_cap"], "sharesOutstanding": c["shares"],
+                "longName": f"{self._ticker} Inc.", "sector": "Technology"}
+
+
+class _StubResponse:
+    def __init__(self, url, payload=None, content=None):
+        self.url = url
+        self.status_code = 404 if payload is None and content is None else 200
+        self._payload = payload
+        self.content = content if content is not None else json.dumps(payload).encode()
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"{self.status_code} Client Error: Not Found for url: {self.url}")
+
+
+class _StubSession:
+    def __init__(self, services):
+        self._services = services
+        self.headers = {}
+
+    def get(self, url, timeout=None):
+        services = self._services
+        services._wait("sec", services.latency)
+        if url == TICKER_MAP_URL:
+            return _StubResponse(url, {
+                str(i): {"cik_str": cik, "ticker": ticker, "title": f"{ticker} Inc."}
+                for i, (ticker, cik) in enumerate(services.ciks.items())
+            })
+        tickers = {cik: ticker for ticker, cik in services.ciks.items()}
+        if url.startswith(SUBMISSIONS_PREFIX):
+            cik = int(url[len(SUBMISSIONS_PREFIX):].split(".")[0])
+            return _StubResponse(url, {"filings": {"recent": {
+                "form": ["10-Q", "10-K"],
+                "accessionNumber": [f"0000{cik}-25-000002", f"0000{cik}-25-000001"],
+                "primaryDocument": ["q3.htm", "annual.htm"],
+            }}} if cik in tickers else None)
+        if url.startswith(FILING_PREFIX):
+            ticker = tickers.get(int(url[len(FILING_PREFIX):].split("/")[0]))
+            return _StubResponse(url, content=_filing_html(ticker, services.company(ticker)).encode()
+                                 if ticker else None)
+        return _StubResponse(url)
+
+
+def _filing_html(ticker, company):
+    paragraph = (
+        f"<p>Net revenue retention for {ticker} was {company['nrr']}%, driven by expansion within existing "
+        "customers. We continue to invest in sales and marketing to enter new geographies, while research "
+        "and development focused on maintaining platform reliability and shipping new product modules.</p>\n"
+    )
+    return (
+        "<html><body><p>Item 7. Management's Discussion and Analysis of Financial Condition and Results of "
+        f"Operations</p>\n{paragraph * 12}<p>Item 7A. Quantitative and Qualitative Disclosures About Market "
+        "Risk</p></body></html>"
+    )
+
+
+# --- Workload ---
+def make_universe(size, rng):
+    # Known tickers have 4 letters (plus the landing ticker); unknown ones 5, so they never collide
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    universe = {LANDING_TICKER}
+    while len(universe) < size:
+        universe.add("".join(rng.choice(letters) for _ in range(4)))
+    universe = [LANDING_TICKER] + sorted(universe - {LANDING_TICKER})
+    unknown = sorted({"".join(rng.choice(letters) for _ in range(5)) for _ in range(max(size // 10, 1))})
+    return universe, unknown
+
+
+def make_sessions(universe, unknown, count, rng, interactions=5, multi=0.2, unknown_share=0.05):
+    """
+    Session plans: (tickers, moves), moves being (ticker, graph input, value).
+    Popularity is Zipf-like, so hot tickers are opened by many sessions at once.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(universe))]
+    sessions = []
+    for _ in range(count):
+        size = rng.randint(2, 3) if rng.random() < multi else 1
+        tickers = list(dict.fromkeys(rng.choices(universe, weights, k=size)))
+        if unknown and rng.random() < unknown_share:
+            tickers[0] = rng.choice(unknown)
+        moves = []
+        for _ in range(interactions):
+            name, _, low, high, step = rng.choice(SLIDERS)
+            value = round(low + round(rng.uniform(0, high - low) / step) * step, 3)
+            moves.append((rng.choice(tickers), name, value))
+        sessions.append((tickers, moves))
+    return sessions
+
+
+class Results:
+    """
+    Thread-safe tallies for one run.
+
+    Attributes:
+        opens (list[float]): Seconds from opening a session's tickers to all analyses loaded
+        interactions (list[float]): Seconds per slider move (graph recompute / script rerun)
+        ticker_loads (int): Tickers that had to be loaded (store lookup or pipeline run)
+        errors (Counter): Failed sessions by exception type / app error
+    """
+
+    def __init__(self):
+        self.opens = []
+        self.interactions = []
+        self.ticker_loads = 0
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, opens=(), interactions=(), ticker_loads=0, error=None):
+        with self._lock:
+            self.opens.extend(opens)
+            self.interactions.extend(interactions)
+            self.ticker_loads += ticker_loads
+            if error:
+                self.errors[error] += 1
+
+
+def run_pipeline_session(session, results, store, think):
+    tickers, moves = session
+    start = time.perf_counter()
+    if len(tickers) == 1:
+        # A single ticker streams its estimate in the UI, which takes the streaming LLM path
+        analyses = {tickers[0]: load_analysis(tickers[0], store=store, on_estimate=_ignore,
+                                              on_local_estimate=_ignore)}
+    else:
+        analyses = load_analyses(tickers, store=store)
+    graphs = {}
+    for ticker, analysis in analyses.items():
+        graphs[ticker] = ValuationGraph(analysis["financials"], analysis["market_data"], analysis["ai_estimates"])
+        graphs[ticker].summary()
+    opened = time.perf_counter() - start
+
+    latencies = []
+    for ticker, name, value in moves:
+        time.sleep(think)
+        start = time.perf_counter()
+        graph = graphs[ticker.upper()]
+        graph.set(**{name: value})
+        graph.summary()
+        latencies.append(time.perf_counter() - start)
+    results.add(opens=[opened], interactions=latencies, ticker_loads=len(tickers))
+
+
+def run_app_session(session, results, store, think):
+    from streamlit.testing.v1 import AppTest
+
+    tickers, moves = session
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    app.text_input[0].set_value(", ".join(tickers)).run()
+    opened = time.perf_counter() - start
+    if app.exception:
+        results.add(opens=[opened], ticker_loads=1, error="app exception")
+        return
+
+    latencies = []
+    for ticker, name, value in moves:
+        time.sleep(think)
+        target = next(key for graph_input, key, *_ in SLIDERS if graph_input == name)
+        if name == "cost_of_capital":
+            slider = next(s for s in app.slider if s.label == target)
+        else:
+            slider = app.slider(key=target + ticker.upper())
+        start = time.perf_counter()
+        slider.set_value(value).run()
+        latencies.append(time.perf_counter() - start)
+        if app.exception:
+            break
+    loaded = {t.upper() for t in tickers} | {LANDING_TICKER}
+    results.add(opens=[opened], interactions=latencies, ticker_loads=len(loaded),
+                error="app exception" if app.exception else None)
+
+
+TARGETS = {"pipeline": run_pipeline_session, "app": run_app_session}
+
+
+def run_sessions(sessions, users, services, target="pipeline", think=0.0, trace_memory=False):
+    """
+    Runs the session plans `users` at a time against the stubbed services.
+
+    Returns:
+        dict: Report fields (see `report`)
+    """
+    run_session = TARGETS[target]
+    results = Results()
+    memory = {"rss_start": rss_bytes()}
+    before = flight_counters()
+    if trace_memory:
+        tracemalloc.start()
+    snapshots = []
+
+    with tempfile.TemporaryDirectory(prefix="bench_sessions_") as workdir, services.installed(workdir):
+        store = ResultsStore(os.path.join(workdir, "results.db"))
+        if target == "app":
+            import streamlit as st
+            st.cache_resource.clear()  # main.py's store must open under workdir
+
+        def guarded(session):
+            try:
+                run_session(session, results, store, think)
+            except Exception as e:
+                results.add(error=type(e).__name__)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users, thread_name_prefix="session") as pool:
+            futures = [pool.submit(guarded, session) for session in sessions]
+            for done, _ in enumerate(as_completed(futures), 1):
+                if done == len(sessions) // 2:
+                    memory["rss_mid"] = rss_bytes()
+                    if trace_memory:
+                        snapshots.append(tracemalloc.take_snapshot())
+        elapsed = time.perf_counter() - start
+
+        memory["rss_end"] = rss_bytes()
+        memory.setdefault("rss_mid", memory["rss_end"])
+        if trace_memory:
+            snapshots.append(tracemalloc.take_snapshot())
+            memory["traced_peak"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if len(snapshots) == 2:
+                memory["growth_sites"] = [
+                    (str(stat.traceback[0]), stat.size_diff)
+                    for stat in snapshots[1].compare_to(snapshots[0], "lineno")[:5]
+                ]
+        cache_stats = get_cache().stats()
+        store.close()
+        if target == "app":
+            st.cache_resource.clear()
+
+    after = flight_counters()
+    flights = {name: after[name] - before[name] for name in after}
+    computed = flights["analysis_ran"] + flights["analysis_coalesced"]
+    return {
+        "target": target, "sessions": len(sessions), "users": users, "elapsed": elapsed,
+        "opens": results.opens, "interactions": results.interactions, "errors": dict(results.errors),
+        "memory": memory,
+        "caches": {
+            "results_store": _rate(results.ticker_loads - computed, computed),
+            "shared_cache": cache_stats,
+            "negative_cache": NEGATIVE_CACHE.stats(),
+            "flights": flights,
+        },
+        "upstream_calls": dict(services.calls),
+    }
+
+
+def flight_counters():
+    counters = {}
+    for name, flights in (("analysis", ANALYSIS_FLIGHTS), ("fetch", FETCH_FLIGHTS),
+                          ("quote", QUOTE_FLIGHTS), ("llm", LLM_FLIGHTS)):
+        counters[f"{name}_ran"] = flights.leaders
+        counters[f"{name}_coalesced"] = flights.shared
+    return counters
+
+
+def rss_bytes():
+    """
+    Current resident set size; peak RSS where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def latency_line(label, latencies):
+    if not latencies:
+        return f"{label:<14} (none)"
+    ms = [value * 1000 for value in latencies]
+    return (f"{label:<14} p50={percentile(ms, 50):.1f}ms  p90={percentile(ms, 90):.1f}ms  "
+            f"p99={percentile(ms, 99):.1f}ms  mean={statistics.mean(ms):.1f}ms  max={max(ms):.1f}ms")
+
+
+def report(result):
+    elapsed = result["elapsed"]
+    errors = sum(result["errors"].values())
+    print(f"target={result['target']}  sessions={result['sessions']}  users={result['users']}  "
+          f"elapsed={elapsed:.2f}s  throughput={result['sessions'] / elapsed:.1f} sessions/s, "
+          f"{len(result['interactions']) / elapsed:,.0f} interactions/s  errors={errors}")
+    if errors:
+        print("  " + ", ".join(f"{name}={count}" for name, count in sorted(result["errors"].items())))
+    print(latency_line("open", result["opens"]))
+    print(latency_line("interaction", result["interactions"]))
+
+    memory = result["memory"]
+    mb = 1024 ** 2
+    print(f"memory         rss start={memory['rss_start'] / mb:.0f}MB  mid={memory['rss_mid'] / mb:.0f}MB  "
+          f"end={memory['rss_end'] / mb:.0f}MB  (second half {(memory['rss_end'] - memory['rss_mid']) / mb:+.1f}MB)")
+    if "traced_peak" in memory:
+        print(f"               traced python peak={memory['traced_peak'] / mb:.1f}MB")
+        for site, size in memory.get("growth_sites", []):
+            print(f"               {size / 1024:+.0f}KB  {site}")
+
+    caches = result["caches"]
+    store, shared, negative = caches["results_store"], caches["shared_cache"], caches["negative_cache"]
+    print(f"results store  hits={store['hits']}  misses={store['misses']}  hit_rate={store['hit_rate']:.1%}")
+    print(f"shared cache   hits={shared['hits']}  misses={shared['misses']}  hit_rate={shared['hit_rate']:.1%}")
+    print(f"negative cache hits={negative['hits']}  records={negative['records']}")
+    flights = caches["flights"]
+    print("single-flight  " + "  ".join(
+        f"{name} ran={flights[f'{name}_ran']} coalesced={flights[f'{name}_coalesced']}"
+        for name in ("analysis", "fetch", "quote", "llm")
+    ))
+    print("upstream calls " + "  ".join(f"{name}={count}" for name, count in sorted(result["upstream_calls"].items())))
+
+
+def check_budgets(result, max_p99_ms=None, max_rss_growth_mb=None):
+    """
+    Returns the list of exceeded budgets (empty when the run is within them).
+    """
+    failures = []
+    if result["errors"]:
+        failures.append(f"{sum(result['errors'].values())} sessions failed")
+    if max_p99_ms is not None:
+        for label, latencies in (("open", result["opens"]), ("interaction", result["interactions"])):
+            p99 = percentile(latencies, 99) * 1000 if latencies else 0.0
+            if p99 > max_p99_ms:
+                failures.append(f"{label} p99 {p99:.0f}ms > {max_p99_ms:.0f}ms")
+    if max_rss_growth_mb is not None:
+        # The first half warms the caches; sustained growth after that is the leak signal
+        growth = (result["memory"]["rss_end"] - result["memory"]["rss_mid"]) / 1024 ** 2
+        if growth > max_rss_growth_mb:
+            failures.append(f"rss grew {growth:.1f}MB in the second half > {max_rss_growth_mb:.1f}MB")
+    return failures
+
+
+# --- Internal helpers ---
+def _ignore(*args):
+    pass
+
+
+@contextmanager
+def _silenced():
+    # Fallback warnings for unknown tickers and streamlit deprecation logs would bury the report
+    logging.disable(logging.WARNING)
+    try:
+        with redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _rate(hits, misses):
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), default="pipeline")
+    parser.add_argument("--sessions", type=int, default=200, help="Total simulated sessions")
+    parser.add_argument("--users", type=int, default=16, help="Sessions running at once")
+    parser.add_argument("--interactions", type=int, default=5, help="Slider moves per session")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause before each slider move")
+    parser.add_argument("--tickers", type=int, default=50, help="Size of the synthetic universe")
+    parser.add_argument("--unknown", type=float, default=0.05, help="Share of sessions opening an unknown ticker")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub SEC / yfinance latency per request")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Stub OpenAI latency per completion")
+    parser.add_argument("--trace-memory", action="store_true", help="Also trace Python allocations (slower)")
+    parser.add_argument("--json", default=None, help="Write the full report to this path")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail if open or interaction p99 exceeds this")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=None,
+                        help="Fail if RSS grows more than this over the second half of the run")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own warnings during the run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    universe, unknown = make_universe(args.tickers, rng)
+    sessions = make_sessions(universe, unknown, args.sessions, rng,
+                             interactions=args.interactions, unknown_share=args.unknown)
+    services = OfflineServices(universe, latency=args.latency_ms / 1000, llm_latency=args.llm_latency_ms / 1000,
+                               seed=args.seed)
+
+    with ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(_silenced())
+        result = run_sessions(sessions, args.users, services, target=args.target, think=args.think_ms / 1000,
+                              trace_memory=args.trace_memory)
+    report(result)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+    failures = check_budgets(result, args.max_p99_ms, args.max_rss_growth_mb)
+    for failure in failures:
+        print(f"⚠️ Budget exceeded: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
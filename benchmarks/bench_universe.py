@@ -0,0 +1,141 @@
+"""
+Universe screen benchmark.
+
+Fills a results store with a synthetic universe and times the peer screen's
+queries (sorted pages, filters, a deep page, the sector group-by) against the
+SQLite store, next to the same queries run with pyarrow.dataset over a
+Parquet export of that store.
+
+    python -m benchmarks.bench_universe --tickers 10000 50000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.data.export import write_export
+from src.data.results_store import ResultsStore
+from src.utils.lazy import lazy_import
+
+ds = lazy_import("pyarrow.dataset")
+pc = lazy_import("pyarrow.compute")
+
+SECTORS = ("Software", "Internet", "Fintech", "Healthcare IT", "Security", "Data", "Adtech", "Unknown")
+
+
+def make_record(i, rng):
+    equity_epv = rng.lognormvariate(21, 1.5)
+    market_cap = equity_epv * rng.uniform(0.3, 4.0)
+    is_mock = rng.random() < 0.02
+    return {
+        "ticker": f"T{i:05d}",
+        "financials": {"revenue": market_cap / rng.uniform(3, 15), "is_mock": is_mock, "source": "fmp"},
+        "mda": {"text": "", "is_mock": is_mock},
+        "market_data": {"company_name": f"Company {i}", "sector": rng.choice(SECTORS), "market_cap": market_cap,
+                        "is_mock": is_mock},
+        "ai_estimates": {"maintenance_sga_percent": 0.3, "maintenance_rnd_percent": 0.4, "source": "llm"},
+        "valuation": {
+            "equity_epv": equity_epv,
+            "market_cap": market_cap,
+            "epv_discount_pct": (equity_epv / market_cap - 1) * 100,
+            "rule_of_40_adj": rng.uniform(-40, 80),
+            "franchise_value_pct": rng.uniform(-50, 90),
+        },
+    }
+
+
+def fill_store(store, size, seed=0):
+    rng = random.Random(seed)
+    for i in range(size):
+        store.put(make_record(i, rng))
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def sqlite_queries(store, page_size):
+    _, total = store.query_universe(page_size=1)
+    last_page = max((total + page_size - 1) // page_size, 1)
+    return {
+        "default page": lambda: store.query_universe(page_size=page_size),
+        "sector + min R40": lambda: store.query_universe(sort_by="franchise_value_pct", sector="Software",
+                                                        min_rule_of_40=40, page_size=page_size),
+        "search": lambda: store.query_universe(search="pany 12", page_size=page_size),
+        "last page": lambda: store.query_universe(sort_by="market_cap", page=last_page, page_size=page_size),
+        "sector summary": store.sector_summary,
+    }
+
+
+def arrow_queries(path, page_size):
+    dataset = ds.dataset(path, format="parquet")
+    columns = ["ticker", "company_name", "sector", "market_cap", "equity_epv",
+               "epv_discount_pct", "rule_of_40_adj", "franchise_value_pct", "computed_at"]
+    not_mock = ~(pc.coalesce(pc.field("financials_is_mock"), False) | pc.coalesce(pc.field("market_is_mock"), False)
+                 | pc.coalesce(pc.field("mda_is_mock"), False))
+
+    def page(sort_by, filter=not_mock, last=False):
+        table = dataset.to_table(columns=columns, filter=filter)
+        order = pc.sort_indices(table, sort_keys=[(sort_by, "descending")])
+        offset = (table.num_rows - 1) // page_size * page_size if last else 0
+        return table.take(order.slice(offset, page_size)).to_pylist(), table.num_rows
+
+    def summary():
+        table = dataset.to_table(columns=["sector", "market_cap", "epv_discount_pct", "rule_of_40_adj",
+                                          "franchise_value_pct"], filter=not_mock)
+        return table.group_by("sector").aggregate([
+            ("sector", "count"), ("market_cap", "sum"), ("epv_discount_pct", "mean"),
+            ("rule_of_40_adj", "mean"), ("franchise_value_pct", "mean"),
+        ]).to_pylist()
+
+    search = pc.match_substring(pc.field("ticker"), "pany 12", ignore_case=True) | \
+        pc.match_substring(pc.field("company_name"), "pany 12", ignore_case=True)
+    return {
+        "default page": lambda: page("epv_discount_pct"),
+        "sector + min R40": lambda: page("franchise_value_pct", not_mock & (pc.field("sector") == "Software")
+                                         & (pc.field("rule_of_40_adj") >= 40)),
+        "search": lambda: page("epv_discount_pct", not_mock & search),
+        "last page": lambda: page("market_cap", last=True),
+        "sector summary": summary,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for size in args.tickers:
+        with tempfile.TemporaryDirectory() as workdir:
+            store = ResultsStore(os.path.join(workdir, "results.db"))
+            fill_store(store, size)
+            export_path = os.path.join(workdir, "universe.parquet")
+            write_export(export_path, store=store)
+            engines = {"sqlite": sqlite_queries(store, args.page_size),
+                       "arrow": arrow_queries(export_path, args.page_size)}
+            for query in ("default page", "sector + min R40", "search", "last page"):
+                # Both engines must answer the same question
+                (sqlite_rows, sqlite_total), (arrow_rows, arrow_total) = (engine[query]() for engine in engines.values())
+                assert sqlite_total == arrow_total and [r["ticker"] for r in sqlite_rows] == \
+                    [r["ticker"] for r in arrow_rows], query
+
+            print(f"{size:,} tickers, page size {args.page_size}, median of {args.repeat} (ms)")
+            print(f"{'query':<20}" + "".join(f"{name:>10}" for name in engines))
+            for query in engines["sqlite"]:
+                print(f"{query:<20}" + "".join(f"{time_ms(engine[query], args.repeat):>10.2f}"
+                                               for engine in engines.values()))
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,24 @@ Author: Financial Analysis Team
 Framework: Streamlit + Greenwald EPV Methodology
 """
 
+import time
+from collections import OrderedDict
+from datetime import datetime
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from src.finance.epv_model import GreenwaldEPV
-from src.ai.parser import analyze_growth_spend
-from src.data.sec_fetcher import SECFetcher
-from src.data.market_data import get_market_snapshot
+from src.utils.lazy import lazy_import
+from src.finance.valuation_graph import ValuationGraph
+from src.data.results_store import ResultsStore
+from src.pipeline import DEFAULT_MAX_AGE_SECONDS, load_analyses, load_analysis, metrics_history
+from src.ui.charts import earnings_figure, valuation_gap_figure
+from src.ui.fragments import record_timing, render_timings, timed_fragment
 from src.ui.styles import apply_ive_style
+from src.utils.profiling import profiled
+
+# Heavy dependencies load on first use (tables), not at app start
+pd = lazy_import("pandas")
 
+run_started = time.perf_counter()
 st.set_page_config(page_title="SaaS EPV Analyzer", layout="wide", initial_sidebar_state="expanded")
 apply_ive_style()
 
@@ -32,185 +41,301 @@ It reveals true earnings power by separating growth investments from maintenance
 st.markdown("")
 
 # --- CACHED HELPERS ---
-@st.cache_data(show_spinner=False)
-def load_financials(ticker: str):
-    return SECFetcher().get_financials(ticker)
-
-@st.cache_data(show_spinner=False)
-def load_mda_text(ticker: str):
-    return SECFetcher().get_mda_text(ticker)
+@st.cache_resource(show_spinner=False)
+def get_results_store():
+    return ResultsStore()
+
+def load_ticker_analysis(ticker: str, **callbacks):
+    # Single indexed read for precomputed tickers; full pipeline only on a miss
+    return load_analysis(ticker, store=get_results_store(), **callbacks)
+
+MAX_TICKERS = 8
+
+def parse_tickers(text):
+    """
+    Splits a comma/space separated ticker list into (valid, invalid) lists,
+    upper-cased and de-duplicated in input order.
+    """
+    tickers = list(dict.fromkeys(t for t in text.replace(",", " ").upper().split()))
+    valid = [t for t in tickers if 1 <= len(t) <= 5 and t.isalpha()]
+    return valid, [t for t in tickers if t not in valid]
+
+def session_analyses(tickers):
+    """
+    This session's loaded analyses, least recently viewed first. Entries older
+    than the results store's max age are dropped (with their valuation graph)
+    so a long-lived session recomputes them like any other request; `tickers`
+    are marked as viewed.
+    """
+    analyses = st.session_state.setdefault("analyses", OrderedDict())
+    graphs = st.session_state.setdefault("valuation_graphs", {})
+    now = time.time()
+    for ticker in [t for t, record in analyses.items() if now - record["computed_at"] > DEFAULT_MAX_AGE_SECONDS]:
+        del analyses[ticker]
+        graphs.pop(ticker, None)
+    for ticker in tickers:
+        if ticker in analyses:
+            analyses.move_to_end(ticker)
+    return analyses
+
+def evict_session_analyses(analyses, limit=MAX_TICKERS):
+    # Keeps the most recently viewed analyses; the open tickers are always the newest
+    graphs = st.session_state.setdefault("valuation_graphs", {})
+    while len(analyses) > limit:
+        ticker, _ = analyses.popitem(last=False)
+        graphs.pop(ticker, None)
+
+# --- PEER COMPARISON ---
+PEER_COLUMNS = {
+    "ticker": "Ticker",
+    "company_name": "Company",
+    "sector": "Sector",
+    "market_cap": "Market Cap ($B)",
+    "equity_epv": "Equity EPV ($B)",
+    "epv_discount_pct": "EPV Discount %",
+    "rule_of_40_adj": "Adj. Rule of 40 %",
+    "franchise_value_pct": "Franchise Value %",
+}
+PEER_PAGE_SIZE = 50
+
+def render_peer_screen():
+    """
+    Universe table: sorting, filtering and paging run inside the results store,
+    so only one page of rows is ever sent to the browser.
+    """
+    store = get_results_store()
+
+    st.header("Peer Comparison")
+    st.caption("Every precomputed ticker at default assumptions (10% WACC, AI maintenance estimates).")
+
+    f1, f2, f3, f4 = st.columns([2, 1.2, 1.2, 1])
+    search = f1.text_input("Search", placeholder="Ticker or company")
+    sector = f2.selectbox("Sector", ["All Sectors"] + store.sectors())
+    sort_labels = list(PEER_COLUMNS.values())
+    sort_label = f3.selectbox("Sort by", sort_labels, index=sort_labels.index("EPV Discount %"))
+    descending = f4.selectbox("Order", ["Descending", "Ascending"]) == "Descending"
+    min_rule_of_40 = st.slider("Minimum Adjusted Rule of 40", -100, 100, -100, 5)
+
+    query = {
+        "sort_by": next(col for col, label in PEER_COLUMNS.items() if label == sort_label),
+        "descending": descending,
+        "sector": None if sector == "All Sectors" else sector,
+        "search": search or None,
+        "min_rule_of_40": None if min_rule_of_40 <= -100 else min_rule_of_40,
+        "page_size": PEER_PAGE_SIZE,
+    }
+
+    # Clamp the requested page to the filtered result set before rendering the pager
+    _, total = store.query_universe(**dict(query, page_size=1))
+    pages = max((total + PEER_PAGE_SIZE - 1) // PEER_PAGE_SIZE, 1)
+    st.session_state["peer_page"] = min(st.session_state.get("peer_page", 1), pages)
+    rows, total = store.query_universe(**query, page=st.session_state["peer_page"])
+
+    if not total:
+        st.info("No precomputed tickers match. Run `python -m src.pipeline <TICKERS>` to populate the results store.")
+        return
+
+    page_df = pd.DataFrame(rows, columns=list(PEER_COLUMNS) + ["computed_at"]).drop(columns="computed_at")
+    page_df["market_cap"] = page_df["market_cap"] / 1e9
+    page_df["equity_epv"] = page_df["equity_epv"] / 1e9
+    st.dataframe(page_df.rename(columns=PEER_COLUMNS).round(1), hide_index=True, width='stretch')
+
+    p1, p2 = st.columns([1, 3])
+    p1.number_input("Page", min_value=1, max_value=pages, step=1, key="peer_page")
+    p2.caption(f"{total:,} companies • page {st.session_state['peer_page']} of {pages}")
+
+    st.markdown("## Sector Aggregates")
+    sector_df = pd.DataFrame(store.sector_summary())
+    sector_df["total_market_cap"] = sector_df["total_market_cap"] / 1e9
+    st.dataframe(
+        sector_df.rename(columns={
+            "sector": "Sector",
+            "companies": "Companies",
+            "total_market_cap": "Total Market Cap ($B)",
+            "avg_epv_discount_pct": "Avg EPV Discount %",
+            "avg_rule_of_40_adj": "Avg Adj. Rule of 40 %",
+            "avg_franchise_value_pct": "Avg Franchise Value %",
+            "undervalued": "Undervalued",
+        }).round(1),
+        hide_index=True,
+        width='stretch'
+    )
 
-@st.cache_data(show_spinner=False)
-def load_market_data(ticker: str):
-    return get_market_snapshot(ticker)
+# --- SIDEBAR ---
+with st.sidebar:
+    view = st.radio("View", ["Company Analysis", "Peer Comparison"], horizontal=True, label_visibility="collapsed")
 
-@st.cache_data(show_spinner=False)
-def get_ai_estimates(mda_text, financials):
-    return analyze_growth_spend(mda_text, financials)
+if view == "Peer Comparison":
+    render_peer_screen()
+    st.stop()
 
-# --- SIDEBAR ---
 with st.sidebar:
     st.markdown("## Analysis Parameters")
-    ticker_input = st.text_input("Ticker Symbol", value="SHOP", placeholder="e.g., AAPL, SHOP")
+    ticker_input = st.text_input(
+        "Ticker Symbols", value="SHOP", placeholder="e.g., SHOP, DDOG, SNOW",
+        help=f"Up to {MAX_TICKERS} tickers, separated by commas or spaces. Each opens in its own tab."
+    )
     cost_of_capital = st.slider("Cost of Capital (WACC)", 0.05, 0.15, 0.10, 0.005)
-    
-    st.markdown("")
-    st.markdown("## AI Adjustments")
-    st.markdown("")
 
     # Ticker Validation
-    ticker_clean = ticker_input.strip().upper()
-    if not ticker_clean or not (1 <= len(ticker_clean) <= 5) or not ticker_clean.isalpha():
-        st.error("Invalid Ticker. Please enter 1-5 letters (e.g., AAPL, SHOP).")
+    tickers, invalid = parse_tickers(ticker_input)
+    if invalid or not tickers:
+        st.error(
+            (f"Invalid Ticker: {', '.join(invalid)}. " if invalid else "Invalid Ticker. ")
+            + "Please enter 1-5 letters (e.g., AAPL, SHOP)."
+        )
         st.stop()
-    
-    # Fetch Data First to get AI defaults
-    with st.spinner("Analyzing financials & SEC filings..."):
-        financials = load_financials(ticker_clean)
-        mda_result = load_mda_text(ticker_clean)
-        market_data = load_market_data(ticker_clean)
-        
-        # Run AI (or get cached)
-        ai_result = get_ai_estimates(mda_result['text'], financials)
-    
-    # Interactive Sliders initialized with AI values
-    # Display current assumption overrides inline if possible
-    st.caption(f"AI Estimates: Maint S&M {float(ai_result['maintenance_sga_percent']):.1%} • Maint R&D {float(ai_result['maintenance_rnd_percent']):.1%}")
-    st.markdown("")
-
-    maint_sga = st.slider(
-        "Maintenance S&M %", 
-        0.0, 1.0, 
-        float(ai_result['maintenance_sga_percent']),
-        help="Portion of S&M used to retain existing customers."
-    )
+    if len(tickers) > MAX_TICKERS:
+        st.warning(f"Showing the first {MAX_TICKERS} tickers.")
+        tickers = tickers[:MAX_TICKERS]
+
+    # Loaded analyses live in session state (up to MAX_TICKERS, until they
+    # expire), so switching tabs or re-adding a ticker never reloads. Misses are
+    # read from the shared results store, or computed: one ticker streams its AI
+    # estimate, several load concurrently.
+    analyses = session_analyses(tickers)
+    missing = [t for t in tickers if t not in analyses]
+    ai_preview = st.empty()
+
+    if len(missing) == 1:
+        streamed = {}
+
+        def show_streamed_estimate(key, value):
+            # None retracts a value from an attempt that failed and is being retried
+            if value is None:
+                streamed.pop(key, None)
+            else:
+                streamed[key] = value
+            parts = [f"{label} {streamed[k]:.1%}" for k, label in
+                     (("maintenance_sga_percent", "Maint S&M"), ("maintenance_rnd_percent", "Maint R&D")) if k in streamed]
+            ai_preview.caption("AI Estimates (streaming): " + (" • ".join(parts) or "retrying..."))
+
+        def show_local_estimate(local):
+            ai_preview.caption(
+                f"Local Estimate: Maint S&M {local['maintenance_sga_percent']:.1%} • "
+                f"Maint R&D {local['maintenance_rnd_percent']:.1%} (AI refining...)"
+            )
+
+        with st.spinner("Analyzing financials & SEC filings..."):
+            analyses[missing[0]] = load_ticker_analysis(
+                missing[0], on_estimate=show_streamed_estimate, on_local_estimate=show_local_estimate
+            )
+    elif missing:
+        progress = ai_preview.progress(0.0, text=f"Analyzing {len(missing)} companies...")
+
+        def show_loaded(ticker, record):
+            analyses[ticker] = record
+            done = sum(t in analyses for t in missing)
+            progress.progress(done / len(missing), text=f"Loaded {ticker} ({done}/{len(missing)})")
+
+        load_analyses(missing, store=get_results_store(), on_loaded=show_loaded)
+    evict_session_analyses(analyses)
+    ai_preview.empty()
+
+# --- DASHBOARD FRAGMENTS ---
+# Each section is a timed fragment taking only the values it displays
+@timed_fragment
+def render_header(ticker, market_data, financials, mda_result, computed_at):
+    if market_data.get('company_name'):
+        col_title, col_badge = st.columns([3, 1])
+        with col_title:
+            st.header(f"{market_data['company_name']}")
+
+            # Market Data Freshness
+            price_suffix = " (Demo values)" if market_data.get("is_mock") else f" (As of {datetime.fromtimestamp(computed_at).strftime('%H:%M')})"
+            st.caption(f"{ticker} • Current Price: ${market_data['price']:.2f}{price_suffix}")
+
+        with col_badge:
+            # Status Badges
+            status_text = "Mock Data" if (market_data.get("is_mock") or financials.get("is_mock")) else "Live Data"
+            st.caption(status_text)
+
+            if mda_result.get("is_mock"):
+                st.caption("Using Mock MD&A (SEC Fetch Failed)")
 
-    maint_rnd = st.slider(
-        "Maintenance R&D %", 
-        0.0, 1.0, 
-        float(ai_result['maintenance_rnd_percent']),
-        help="Portion of R&D required to maintain the platform."
-    )
-    
-
-# --- MAIN APP LOGIC ---
-if market_data.get('company_name'):
-    col_title, col_badge = st.columns([3, 1])
-    with col_title:
-        st.header(f"{market_data['company_name']}")
-        
-        # Market Data Freshness
-        price_suffix = " (Demo values)" if market_data.get("is_mock") else f" (As of {pd.Timestamp.now().strftime('%H:%M')})"
-        st.caption(f"{ticker_clean} • Current Price: ${market_data['price']:.2f}{price_suffix}")
-        
-    with col_badge:
-        # Status Badges
-        status_text = "Mock Data" if (market_data.get("is_mock") or financials.get("is_mock")) else "Live Data"
-        st.caption(status_text)
-        
-        if mda_result.get("is_mock"):
-            st.caption("Using Mock MD&A (SEC Fetch Failed)")
-
-else:
-    st.header(f"Analysis for {ticker_clean}")
-
-# Run Financial Model
-model = GreenwaldEPV()
-current_adjustments = {
-    "maintenance_sga_percent": maint_sga,
-    "maintenance_rnd_percent": maint_rnd
-}
-
-results = model.calculate_normalized_earnings(financials, current_adjustments)
-epv_value = model.get_epv(results['nopat'], cost_of_capital)
-
-# Rule of 40 Calcs
-prev_revenue = financials['prev_revenue'] or 1  # guard against divide-by-zero
-rev_growth = (financials['revenue'] - prev_revenue) / prev_revenue * 100
-gaap_margin = financials['ebit'] / financials['revenue'] * 100
-adj_margin = results['nopat'] / financials['revenue'] * 100
-
-rule_40_gaap = model.calculate_rule_of_40(rev_growth, gaap_margin)
-rule_40_adj = model.calculate_rule_of_40(rev_growth, adj_margin)
-
-# --- DISPLAY COLUMNS ---
-col1, col2 = st.columns([1, 1.2], gap="large")
+    else:
+        st.header(f"Analysis for {ticker}")
 
-with col1:
+@timed_fragment
+def render_gaap(valuation):
     st.markdown("## GAAP")
-    st.metric(label="Reported EBIT", value=f"${financials['ebit']/1e9:.1f}B", delta_color="off")
-    st.metric(label="Rule of 40", value=f"{rule_40_gaap:.1f}%")
+    st.metric(label="Reported EBIT", value=f"${valuation['reported_ebit']/1e9:.1f}B", delta_color="off")
+    st.metric(label="Rule of 40", value=f"{valuation['rule_of_40_gaap']:.1f}%")
+
+@timed_fragment
+def render_valuation_metrics(valuation):
+    rev_growth = valuation['rev_growth']
+    adj_margin = valuation['adj_margin']
+    rule_40_gaap = valuation['rule_of_40_gaap']
+    rule_40_adj = valuation['rule_of_40_adj']
 
-with col2:
     st.markdown("## Adjusted")
-    
+
     # Metrics Grid
     c1, c2 = st.columns(2)
-    c1.metric(label="Normalized EBIT", value=f"${results['normalized_ebit']/1e9:.1f}B", delta=f"+${(results['normalized_ebit'] - financials['ebit'])/1e9:.1f}B")
+    c1.metric(label="Normalized EBIT", value=f"${valuation['normalized_ebit']/1e9:.1f}B", delta=f"+${(valuation['normalized_ebit'] - valuation['reported_ebit'])/1e9:.1f}B")
     c2.metric(label="Adjusted Rule of 40", value=f"{rule_40_adj:.1f}%", delta=f"{rule_40_adj - rule_40_gaap:.1f}% Upgrade")
-    
+
     if rule_40_adj >= 40:
         st.success(f"Rule of 40: {rule_40_adj:.1f}% (Growth {rev_growth:.1f}% + Margin {adj_margin:.1f}%)")
     else:
         st.info(f"Rule of 40: {rule_40_adj:.1f}% (Growth {rev_growth:.1f}% + Margin {adj_margin:.1f}%)")
-    
-    # EPV vs Market Cap
-    mcap_billions = market_data['market_cap'] / 1e9
-    
-    # Calculate Equity Value (Firm EPV + Cash - Debt)
-    firm_epv = epv_value
-    cash = financials.get('cash', 0)
-    debt = financials.get('debt', 0)
-    shares = financials.get('shares_outstanding', 1)
-    
-    equity_epv = model.calculate_equity_value(firm_epv, cash, debt)
-    epv_per_share = equity_epv / shares
-    
-    # Calculate Reproduction Value (Operating Assets, ex-cash) to avoid cash double-count
-    repro_value = model.calculate_reproduction_value(financials)
-    franchise_value = firm_epv - repro_value
-    
+
+    # Equity Value (Firm EPV + Cash - Debt)
+    firm_epv = valuation['firm_epv']
+    equity_epv = valuation['equity_epv']
+    epv_per_share = valuation['epv_per_share']
+
     st.markdown("## Valuation")
-    
+
     # Metrics Row
     m1, m2, m3 = st.columns(3)
     m1.metric(label="Firm EPV", value=f"${firm_epv/1e9:.1f}B", help="Operations Value (Zero Growth)")
-    m2.metric(label="Net Cash", value=f"${(cash - debt)/1e9:.1f}B", help="Cash - Debt")
+    m2.metric(label="Net Cash", value=f"${valuation['net_cash']/1e9:.1f}B", help="Cash - Debt")
     m3.metric(label="Equity EPV", value=f"${equity_epv/1e9:.1f}B", help="Target Market Cap")
-    
+
     # Footnote for EPV
     st.caption("Note: Firm EPV assumes zero growth. It is the steady-state earnings power capitalized at WACC.")
-    
+
     st.markdown("### Per Share")
-    
+
     # Per Share Metrics
     ps1, ps2, ps3 = st.columns(3)
     ps1.metric(label="Target Price (EPV)", value=f"${epv_per_share:.2f}")
-    ps2.metric(label="Current Price", value=f"${market_data['price']:.2f}")
-    
-    upside = (epv_per_share - market_data['price']) / market_data['price'] * 100
+    ps2.metric(label="Current Price", value=f"${valuation['price']:.2f}")
+
+    upside = valuation['upside_pct']
     if upside > 0:
         ps3.metric(label="Upside", value=f"{upside:.1f}%", delta=f"+{upside:.1f}%")
     else:
         ps3.metric(label="Downside", value=f"{upside:.1f}%", delta=f"{upside:.1f}%")
-    
+
+@timed_fragment
+def render_moat(valuation):
+    # Reproduction Value (Operating Assets, ex-cash) vs Firm EPV
+    firm_epv = valuation['firm_epv']
+    equity_epv = valuation['equity_epv']
+    repro_value = valuation['reproduction_value']
+    franchise_value = valuation['franchise_value']
+    market_cap = valuation['market_cap']
+
     st.markdown("## Moat & Durability")
-    
+
     d1, d2 = st.columns(2)
     d1.metric(label="Reproduction Value (Assets)", value=f"${repro_value/1e9:.1f}B", help="Cost to replicate the platform (Book Equity + R&D Adj)")
-    
+
     moat_delta_color = "normal" if franchise_value > 0 else "inverse"
     d2.metric(
-        label="Franchise Value (Moat)", 
-        value=f"${franchise_value/1e9:.1f}B", 
-        delta=f"${franchise_value/1e9:.1f}B", 
+        label="Franchise Value (Moat)",
+        value=f"${franchise_value/1e9:.1f}B",
+        delta=f"${franchise_value/1e9:.1f}B",
         delta_color=moat_delta_color,
         help="EPV - Reproduction Value"
     )
-    
+
     # Footnote for Moat
     st.caption("Note: Reproduction Value excludes cash to avoid double-counting and capitalizes current R&D over 3 years as a proxy for product/platform replacement.")
-    
+
     if franchise_value > 0:
         st.success(f"**Wide Moat:** The business generates returns significantly above the cost to replicate its assets. (Franchise Value is {franchise_value/firm_epv*100:.0f}% of Firm EPV)")
     else:
@@ -218,86 +343,151 @@ with col2:
 
     st.markdown("---")
 
-    if equity_epv > market_data['market_cap']:
-        discount = (equity_epv - market_data['market_cap']) / equity_epv * 100
+    if equity_epv > market_cap:
+        discount = (equity_epv - market_cap) / equity_epv * 100
         st.success(f"**Undervalued:** Trading at a **{discount:.1f}% discount** to Equity EPV.")
     else:
-        premium = (market_data['market_cap'] - equity_epv) / equity_epv * 100
+        premium = (market_cap - equity_epv) / equity_epv * 100
         st.error(f"**Overvalued:** Trading at a **{premium:.1f}% premium** to Equity EPV.")
-    
-    st.metric(label="Current Market Cap", value=f"${mcap_billions:.1f}B")
 
-st.markdown("")
-
-# --- CHARTING ---
-st.markdown("## Earnings Analysis")
-
-# Create two charts side-by-side
-chart_col1, chart_col2 = st.columns(2)
-
-with chart_col1:
-    st.caption("Earnings Impact ($B)")
-    earnings_df = pd.DataFrame({
-        "Metric": ["Reported EBIT", "Normalized EBIT"],
-        "Amount ($B)": [financials['ebit'] / 1e9, results['normalized_ebit'] / 1e9]
-    })
-    fig_earnings = px.bar(
-        earnings_df, 
-        x="Metric", 
-        y="Amount ($B)", 
-        color="Metric",
-        color_discrete_map={"Reported EBIT": "#FF3B30", "Normalized EBIT": "#007AFF"},
-        text_auto='.1f'
-    )
-    fig_earnings.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font_family="-apple-system, BlinkMacSystemFont, sans-serif",
-        showlegend=False,
-        margin=dict(l=20, r=20, t=30, b=20),
-        yaxis=dict(showgrid=True, gridcolor="#E5E5E5"),
-        xaxis=dict(showgrid=False)
+    st.metric(label="Current Market Cap", value=f"${market_cap/1e9:.1f}B")
+
+# Figures are cached by their plotted values (rounded to $1M), so a WACC change
+# rebuilds the valuation gap chart but reuses the earnings chart
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_earnings_figure(reported_ebit_b, normalized_ebit_b):
+    return earnings_figure(reported_ebit_b, normalized_ebit_b)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_valuation_gap_figure(market_cap_b, equity_epv_b):
+    return valuation_gap_figure(market_cap_b, equity_epv_b)
+
+@timed_fragment
+def render_charts(ticker, valuation):
+    st.markdown("## Earnings Analysis")
+
+    # Create two charts side-by-side
+    chart_col1, chart_col2 = st.columns(2)
+
+    with chart_col1:
+        st.caption("Earnings Impact ($B)")
+        fig_earnings = cached_earnings_figure(
+            round(valuation['reported_ebit'] / 1e9, 3), round(valuation['normalized_ebit'] / 1e9, 3)
+        )
+        st.plotly_chart(fig_earnings, use_container_width=True, width='stretch', key=f"earnings_chart_{ticker}")
+
+    with chart_col2:
+        st.caption("Valuation Gap ($B)")
+        fig_val = cached_valuation_gap_figure(
+            round(valuation['market_cap'] / 1e9, 3), round(valuation['equity_epv'] / 1e9, 3)
+        )
+        st.plotly_chart(fig_val, use_container_width=True, width='stretch', key=f"valuation_chart_{ticker}")
+
+@timed_fragment
+def render_rule_of_40_history(ticker, adjustments):
+    # Fiscal years collected by past stored analyses; nothing to chart until there are two
+    history = metrics_history([ticker], store=get_results_store(), adjustments={ticker: adjustments}).frame(
+        metrics=("rule_of_40_gaap", "rule_of_40_adj")
     )
-    st.plotly_chart(fig_earnings, use_container_width=True, width='stretch')
-
-with chart_col2:
-    st.caption("Valuation Gap ($B)")
-    val_df = pd.DataFrame({
-        "Metric": ["Market Cap", "Equity EPV"],
-        "Value ($B)": [mcap_billions, equity_epv / 1e9]
-    })
-    fig_val = px.bar(
-        val_df,
-        x="Metric",
-        y="Value ($B)",
-        color="Metric",
-        color_discrete_map={"Market Cap": "#8E8E93", "Equity EPV": "#34C759"},
-        text_auto='.1f'
+    if len(history) < 2:
+        return
+    st.markdown("## Rule of 40 History")
+    chart = history.set_index(history["period"].astype(str))[["rule_of_40_gaap", "rule_of_40_adj"]]
+    st.line_chart(chart.rename(columns={"rule_of_40_gaap": "GAAP", "rule_of_40_adj": "Adjusted"}))
+
+@timed_fragment
+def render_reasoning(ai_result, adjustments):
+    # AI Reasoning Section
+    st.markdown("## Analysis Details")
+    with st.expander("See Detailed Analysis", expanded=False):
+        if "⚠️" in ai_result['reasoning']:
+            st.warning(ai_result['reasoning'])
+        else:
+            st.info(ai_result['reasoning'])
+
+        st.markdown("### Detailed Adjustments")
+        st.json(adjustments)
+
+@timed_fragment
+def render_company(ticker, analysis, cost_of_capital):
+    # Per-ticker adjustments live inside the tab, so moving them reruns only this fragment
+    financials = analysis['financials']
+    market_data = analysis['market_data']
+    ai_result = analysis['ai_estimates']
+
+    render_header(ticker, market_data, financials, analysis['mda'], analysis['computed_at'])
+
+    # Interactive Sliders initialized with AI values
+    estimate_label = "Local Estimates" if ai_result.get("source") == "local" else "AI Estimates"
+    st.markdown("## AI Adjustments")
+    st.caption(f"{estimate_label}: Maint S&M {float(ai_result['maintenance_sga_percent']):.1%} • Maint R&D {float(ai_result['maintenance_rnd_percent']):.1%}")
+
+    s1, s2 = st.columns(2)
+    maint_sga = s1.slider(
+        "Maintenance S&M %",
+        0.0, 1.0,
+        float(ai_result['maintenance_sga_percent']),
+        key=f"maint_sga_{ticker}",
+        help="Portion of S&M used to retain existing customers."
     )
-    fig_val.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font_family="-apple-system, BlinkMacSystemFont, sans-serif",
-        showlegend=False,
-        margin=dict(l=20, r=20, t=30, b=20),
-        yaxis=dict(showgrid=True, gridcolor="#E5E5E5"),
-        xaxis=dict(showgrid=False)
+    maint_rnd = s2.slider(
+        "Maintenance R&D %",
+        0.0, 1.0,
+        float(ai_result['maintenance_rnd_percent']),
+        key=f"maint_rnd_{ticker}",
+        help="Portion of R&D required to maintain the platform."
     )
-    st.plotly_chart(fig_val, use_container_width=True, width='stretch')
+    st.markdown("")
 
-st.markdown("")
+    # Run Financial Model
+    current_adjustments = {
+        "maintenance_sga_percent": maint_sga,
+        "maintenance_rnd_percent": maint_rnd
+    }
+
+    # One memoized graph per ticker: a slider change only recomputes the nodes downstream of it
+    graphs = st.session_state.setdefault("valuation_graphs", {})
+    graph = graphs.get(ticker)
+    if graph is None:
+        graph = graphs[ticker] = ValuationGraph(financials, market_data, current_adjustments, cost_of_capital)
+    graph.set(financials=financials, market_data=market_data, cost_of_capital=cost_of_capital)
+    graph.set_adjustments(current_adjustments)
+    valuation = graph.summary()
+
+    # --- DISPLAY COLUMNS ---
+    col1, col2 = st.columns([1, 1.2], gap="large")
+
+    with col1:
+        render_gaap(valuation)
+
+    with col2:
+        render_valuation_metrics(valuation)
+        render_moat(valuation)
+
+    st.markdown("")
+
+    # --- CHARTING ---
+    render_charts(ticker, valuation)
+
+    st.markdown("")
+
+    render_rule_of_40_history(ticker, current_adjustments)
 
-# AI Reasoning Section
-st.markdown("## Analysis Details")
-with st.expander("See Detailed Analysis", expanded=False):
-    if "⚠️" in ai_result['reasoning']:
-        st.warning(ai_result['reasoning'])
+    render_reasoning(ai_result, current_adjustments)
+
+    # Summary Chip
+    summary_text = f"{estimate_label[:-1]}: {ai_result['maintenance_sga_percent']*100:.0f}% Maint S&M, {ai_result['maintenance_rnd_percent']*100:.0f}% Maint R&D"
+    st.caption(f"Summary: {summary_text}")
+
+# --- MAIN APP LOGIC ---
+# Tabs switch client-side: every loaded ticker is already rendered
+with profiled("ui-render"):
+    if len(tickers) == 1:
+        render_company(tickers[0], analyses[tickers[0]], cost_of_capital)
     else:
-        st.info(ai_result['reasoning'])
-    
-    st.markdown("### Detailed Adjustments")
-    st.json(current_adjustments)
-
-# Summary Chip
-summary_text = f"AI Estimate: {ai_result['maintenance_sga_percent']*100:.0f}% Maint S&M, {ai_result['maintenance_rnd_percent']*100:.0f}% Maint R&D"
-st.caption(f"Summary: {summary_text}")
+        for ticker, tab in zip(tickers, st.tabs(tickers)):
+            with tab:
+                render_company(ticker, analyses[ticker], cost_of_capital)
+
+record_timing("script", time.perf_counter() - run_started)
+render_timings()
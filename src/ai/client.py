@@ -1,5 +1,17 @@
 # src/ai/client.py
 import os
+import time
+
+from src.ai.telemetry import finish_call, start_call
+
+SIMULATED_RESPONSE = """
+        {
+            "maintenance_sga_percent": 0.40,
+            "maintenance_rnd_percent": 0.30,
+            "reasoning": "Simulated Analysis: Strong Net Revenue Retention (120%+) implies majority of S&M is for expansion. R&D is heavily weighted towards new product modules."
+        }
+        """
+FALLBACK_MODEL = "gpt-4o"
 
 def get_llm_response(system_prompt, user_content):
     """
@@ -11,16 +23,14 @@ def get_llm_response(system_prompt, user_content):
     api_key = os.getenv("OPENAI_API_KEY")
     model_name = os.getenv("OPENAI_MODEL", "gpt-5.1")
     reasoning_effort = os.getenv("OPENAI_REASONING", "high")
+    call = start_call(model_name)
     
     if not api_key:
         # Simulated response for demo/testing purposes
-        return """
-        {
-            "maintenance_sga_percent": 0.40,
-            "maintenance_rnd_percent": 0.30,
-            "reasoning": "Simulated Analysis: Strong Net Revenue Retention (120%+) implies majority of S&M is for expansion. R&D is heavily weighted towards new product modules."
-        }
-        """
+        call.simulated = True
+        call.estimate_usage(system_prompt + user_content, SIMULATED_RESPONSE)
+        finish_call(call)
+        return SIMULATED_RESPONSE
     
     try:
         from openai import OpenAI
@@ -40,21 +50,102 @@ def get_llm_response(system_prompt, user_content):
                 request_kwargs["reasoning"] = {"effort": reasoning_effort}
 
             response = client.chat.completions.create(**request_kwargs)
-            return response.choices[0].message.content
         except Exception as first_error:
             # Fallback to gpt-4o if the requested model is unavailable
+            call.fallback = True
+            call.model_used = FALLBACK_MODEL
             try:
-                fallback_model = "gpt-4o"
                 response = client.chat.completions.create(
-                    model=fallback_model,
+                    model=FALLBACK_MODEL,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_content}
                     ],
                     temperature=0.0
                 )
-                return response.choices[0].message.content
             except Exception as second_error:
-                return f"Error calling OpenAI: {first_error}; fallback error: {second_error}"
+                message = f"Error calling OpenAI: {first_error}; fallback error: {second_error}"
+                finish_call(call, error=message)
+                return message
+        content = response.choices[0].message.content
+        call.set_usage(getattr(response, "usage", None))
+        finish_call(call)
+        return content
     except Exception as e:
+        finish_call(call, error=e)
         return f"Error calling OpenAI: {e}"
+
+
+def stream_llm_response(system_prompt, user_content):
+    """
+    Streaming variant of get_llm_response: yields text chunks as the model
+    produces them. Falls back to gpt-4o if the requested model fails before
+    streaming starts. Unlike get_llm_response, errors are raised rather than
+    returned as text, so callers can retry immediately.
+
+    Closing the generator early (e.g. on malformed output) closes the HTTP stream.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    model_name = os.getenv("OPENAI_MODEL", "gpt-5.1")
+    reasoning_effort = os.getenv("OPENAI_REASONING", "high")
+
+    call = start_call(model_name, streamed=True)
+    if not api_key:
+        # Simulated response, chunked like a real stream
+        call.simulated = True
+        call.estimate_usage(system_prompt + user_content, SIMULATED_RESPONSE)
+        call.time_to_first_token_s = 0.0
+        finish_call(call)
+        for i in range(0, len(SIMULATED_RESPONSE), 16):
+            yield SIMULATED_RESPONSE[i:i + 16]
+        return
+
+    error = None
+    completion = []
+    try:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+        # include_usage: the final chunk carries the token counts
+        request_kwargs = {"model": model_name, "messages": messages, "temperature": 0.0, "stream": True,
+                          "stream_options": {"include_usage": True}}
+        if reasoning_effort:
+            request_kwargs["reasoning"] = {"effort": reasoning_effort}
+
+        try:
+            stream = client.chat.completions.create(**request_kwargs)
+        except Exception:
+            # Fallback to gpt-4o if the requested model is unavailable
+            call.fallback = True
+            call.model_used = FALLBACK_MODEL
+            stream = client.chat.completions.create(
+                model=FALLBACK_MODEL, messages=messages, temperature=0.0, stream=True,
+                stream_options={"include_usage": True}
+            )
+
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    call.set_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if call.time_to_first_token_s is None:
+                        call.time_to_first_token_s = time.perf_counter() - call._started
+                    completion.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+    except GeneratorExit:
+        # Caller closed the stream early (e.g. malformed output)
+        error = "closed early"
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if not call.prompt_tokens and not call.completion_tokens:
+            call.estimate_usage(system_prompt + user_content, "".join(completion))
+        finish_call(call, error=error)
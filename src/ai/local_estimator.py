@@ -0,0 +1,275 @@
+"""
+Local Maintenance Spend Estimator
+
+Offline, millisecond-latency alternative to the LLM step. It reads the same
+signals the EPV prompt asks the model to weigh:
+
+- Net Revenue Retention / net dollar expansion rate (NRR > 100% → most S&M is growth)
+- Churn / gross retention (high churn → more maintenance S&M)
+- Language cues for customer acquisition vs retention spend, and for new
+  products vs keeping the platform running
+
+Features are extracted with precompiled regexes and fed to a small linear
+model per output. The built-in coefficients encode the prompt heuristics;
+`LocalEstimator.fit` re-trains them (ridge regression) on labelled examples,
+typically LLM estimates already sitting in the results store, and `save` /
+`load` persist the trained coefficients as JSON.
+
+Use it as a fast first answer while the LLM runs, as the default when no API
+key is configured, or as the batch estimator for full-universe screens.
+"""
+
+import json
+import math
+import os
+import re
+
+from src.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+DEFAULT_MODEL_PATH = os.getenv("LOCAL_ESTIMATOR_PATH", os.path.join(".cache", "local_estimator.json"))
+
+_PCT = r'(\d{1,3}(?:\.\d+)?)\s*%'
+_NRR_RE = re.compile(
+    r'(?:net\s+(?:revenue|dollar|dollar-based|expansion)\s+(?:retention|expansion)(?:\s+rate)?|\bnrr\b|\bndr\b)'
+    r'[^.%]{0,80}?' + _PCT,
+    re.IGNORECASE
+)
+_GROSS_RETENTION_RE = re.compile(r'gross\s+(?:revenue\s+|dollar\s+)?retention(?:\s+rate)?[^.%]{0,80}?' + _PCT, re.IGNORECASE)
+_CHURN_RE = re.compile(r'churn(?:\s+rate)?[^.%]{0,60}?' + _PCT, re.IGNORECASE)
+
+_CUES = {
+    "growth_sm": re.compile(
+        r'new (?:customers?|logos?|markets?|geograph\w+|regions?|verticals?)|customer acquisition|'
+        r'expan\w+ into|market share|go-to-market|sales capacity|hir\w+ (?:additional )?sales|aggressive\w*|brand awareness',
+        re.IGNORECASE
+    ),
+    "retention_sm": re.compile(
+        r'retain\w*|retention|renewals?|customer success|account management|reduce churn|existing customers',
+        re.IGNORECASE
+    ),
+    "growth_rnd": re.compile(
+        r'new (?:products?|features?|modules?|offerings?|platform)|launch\w*|innovation|'
+        r'artificial intelligence|\bai\b|machine learning|next[- ]generation|roadmap',
+        re.IGNORECASE
+    ),
+    "maint_rnd": re.compile(
+        r'maintain\w*|maintenance|reliability|security|bug fix\w*|technical debt|'
+        r'infrastructure|uptime|compliance|sustaining engineering',
+        re.IGNORECASE
+    ),
+}
+
+FEATURES = (
+    "bias",
+    "nrr_excess",          # NRR - 100%, 0 when not disclosed
+    "nrr_disclosed",
+    "churn",               # annual churn as a fraction (or 1 - gross retention)
+    "churn_disclosed",
+    "growth_sm_cues",      # log(1 + matches), per cue family
+    "retention_sm_cues",
+    "growth_rnd_cues",
+    "maint_rnd_cues",
+    "revenue_growth",      # y/y revenue growth from financials, clipped to [-1, 2]
+)
+
+OUTPUTS = ("maintenance_sga_percent", "maintenance_rnd_percent")
+
+# Priors: hand-set from the EPV prompt heuristics (mature SaaS ~30% maintenance,
+# strong NRR pushes S&M maintenance down, churn pushes it up)
+DEFAULT_COEFFICIENTS = {
+    "maintenance_sga_percent": {
+        "bias": 0.35, "nrr_excess": -0.6, "nrr_disclosed": -0.05, "churn": 1.2, "churn_disclosed": 0.02,
+        "growth_sm_cues": -0.04, "retention_sm_cues": 0.04, "growth_rnd_cues": 0.0, "maint_rnd_cues": 0.0,
+        "revenue_growth": -0.2,
+    },
+    "maintenance_rnd_percent": {
+        "bias": 0.32, "nrr_excess": -0.1, "nrr_disclosed": 0.0, "churn": 0.2, "churn_disclosed": 0.0,
+        "growth_sm_cues": 0.0, "retention_sm_cues": 0.0, "growth_rnd_cues": -0.05, "maint_rnd_cues": 0.05,
+        "revenue_growth": -0.15,
+    },
+}
+
+# Keep estimates inside the plausible band rather than at the 0/1 extremes
+MIN_PERCENT, MAX_PERCENT = 0.05, 0.95
+
+
+def extract_features(mda_text, financials=None):
+    """
+    Returns a {feature name: value} dict for one MD&A text.
+    """
+    text = mda_text or ""
+    features = dict.fromkeys(FEATURES, 0.0)
+    features["bias"] = 1.0
+
+    nrr = _first_percent(_NRR_RE, text, low=50, high=250)
+    if nrr is not None:
+        features["nrr_excess"] = nrr - 1.0
+        features["nrr_disclosed"] = 1.0
+
+    churn = _first_percent(_CHURN_RE, text, low=0, high=60)
+    if churn is None:
+        gross_retention = _first_percent(_GROSS_RETENTION_RE, text, low=40, high=100)
+        churn = None if gross_retention is None else 1.0 - gross_retention
+    if churn is not None:
+        features["churn"] = churn
+        features["churn_disclosed"] = 1.0
+
+    for name, pattern in _CUES.items():
+        features[f"{name}_cues"] = math.log1p(len(pattern.findall(text)))
+
+    if financials:
+        revenue = financials.get("revenue") or 0
+        prev_revenue = financials.get("prev_revenue") or 0
+        if revenue and prev_revenue:
+            features["revenue_growth"] = min(max(revenue / prev_revenue - 1, -1.0), 2.0)
+    return features
+
+
+def _first_percent(pattern, text, low, high):
+    for match in pattern.finditer(text):
+        value = float(match.group(1))
+        if low <= value <= high:
+            return value / 100
+    return None
+
+
+class LocalEstimator:
+    def __init__(self, coefficients=None):
+        self.coefficients = coefficients or DEFAULT_COEFFICIENTS
+
+    def estimate(self, mda_text, financials=None):
+        """
+        Returns:
+            dict: Same shape as analyze_growth_spend ('maintenance_sga_percent',
+                  'maintenance_rnd_percent', 'reasoning')
+        """
+        features = extract_features(mda_text, financials)
+        result = {}
+        for output in OUTPUTS:
+            weights = self.coefficients[output]
+            value = sum(weights.get(name, 0.0) * features[name] for name in FEATURES)
+            result[output] = round(min(max(value, MIN_PERCENT), MAX_PERCENT), 3)
+        result["reasoning"] = _explain(features, result)
+        result["source"] = "local"
+        return result
+
+    def estimate_many(self, mda_texts, financials_list=None):
+        """
+        Batch mode for universe screens.
+        """
+        financials_list = financials_list or [None] * len(mda_texts)
+        return [self.estimate(text, fin) for text, fin in zip(mda_texts, financials_list)]
+
+    # --- Training ---
+    @classmethod
+    def fit(cls, mda_texts, financials_list, targets, l2=0.1):
+        """
+        Ridge-regresses coefficients from labelled examples.
+
+        Args:
+            mda_texts (list[str]): MD&A texts
+            financials_list (list): Matching financials (or None)
+            targets (list[dict]): Labels with 'maintenance_sga_percent' / 'maintenance_rnd_percent'
+            l2 (float): Ridge penalty; shrinks toward the default priors
+        """
+        X = np.array([
+            [extract_features(text, fin)[name] for name in FEATURES]
+            for text, fin in zip(mda_texts, financials_list)
+        ])
+        penalty = l2 * np.eye(len(FEATURES))
+        coefficients = {}
+        for output in OUTPUTS:
+            y = np.array([float(t[output]) for t in targets])
+            prior = np.array([DEFAULT_COEFFICIENTS[output][name] for name in FEATURES])
+            # argmin |Xw - y|^2 + l2 |w - prior|^2
+            w = np.linalg.solve(X.T @ X + penalty, X.T @ y + penalty @ prior)
+            coefficients[output] = dict(zip(FEATURES, (float(v) for v in w)))
+        return cls(coefficients)
+
+    @classmethod
+    def from_results_store(cls, store, **fit_kwargs):
+        """
+        Trains on the LLM estimates stored alongside real (non-mock) MD&A texts.
+        """
+        texts, financials_list, targets = [], [], []
+        for ticker in store.tickers():
+            record = store.get(ticker)
+            mda = record.get("mda") or {}
+            ai = record.get("ai_estimates") or {}
+            if mda.get("is_mock") or "⚠️" in ai.get("reasoning", "") or ai.get("source") in ("local", "simulated", "defaults"):
+                continue
+            texts.append(mda.get("text", ""))
+            financials_list.append(record.get("financials"))
+            targets.append(ai)
+        if not targets:
+            raise ValueError("No LLM-labelled analyses in the results store to train on")
+        return cls.fit(texts, financials_list, targets, **fit_kwargs)
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as fh:
+            json.dump(self.coefficients, fh, indent=2)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        """
+        Loads trained coefficients, or the built-in priors if none were saved.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as fh:
+            return cls(json.load(fh))
+
+
+def _explain(features, result):
+    signals = []
+    if features["nrr_disclosed"]:
+        signals.append(f"NRR {100 * (1 + features['nrr_excess']):.0f}%")
+    if features["churn_disclosed"]:
+        signals.append(f"churn {100 * features['churn']:.0f}%")
+    for name, label in (("growth_sm", "acquisition"), ("retention_sm", "retention"),
+                        ("growth_rnd", "new-product"), ("maint_rnd", "maintenance")):
+        count = round(math.expm1(features[f"{name}_cues"]))
+        if count:
+            signals.append(f"{count} {label} cue{'s' if count != 1 else ''}")
+    basis = ", ".join(signals) if signals else "no retention or spend disclosures found (SaaS priors)"
+    return (
+        f"Local Estimate: {basis}. Maintenance S&M {result['maintenance_sga_percent']:.0%}, "
+        f"Maintenance R&D {result['maintenance_rnd_percent']:.0%}."
+    )
+
+
+_default_estimator = None
+
+
+def estimate_maintenance(mda_text, financials=None):
+    """
+    Module-level convenience using the saved (or default) coefficients.
+    """
+    global _default_estimator
+    if _default_estimator is None:
+        _default_estimator = LocalEstimator.load()
+    return _default_estimator.estimate(mda_text, financials)
+
+
+def main(argv=None):
+    import argparse
+    from src.data.results_store import ResultsStore
+
+    parser = argparse.ArgumentParser(description="Train the local estimator on LLM analyses in the results store.")
+    parser.add_argument("--store", default=None, help="Path to the results database")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="Where to write the trained coefficients")
+    parser.add_argument("--l2", type=float, default=0.1, help="Ridge penalty toward the built-in priors")
+    args = parser.parse_args(argv)
+
+    estimator = LocalEstimator.from_results_store(ResultsStore(args.store), l2=args.l2)
+    estimator.save(args.output)
+    print(f"✓ Saved local estimator coefficients to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,10 +14,89 @@ This enables the EPV model to normalize earnings by distinguishing between
 maintenance capex (required to sustain business) and growth capex (for expansion).
 """
 
+import hashlib
 import json
-import time
+import os
+import re
 from src.ai.prompts import EPV_ANALYSIS_SYSTEM_PROMPT
-from src.ai.client import get_llm_response
+from src.ai.client import SIMULATED_RESPONSE, get_llm_response, stream_llm_response
+from src.ai.telemetry import TELEMETRY, llm_context
+from src.cache.backends import get_cache
+from src.utils.retry import RetryPolicy, retry_also
+from src.utils.singleflight import SingleFlight
+
+CONSERVATIVE_DEFAULTS = {
+    # Bias toward growth-heavy spend when the AI is unavailable to avoid underestimating EPV
+    "maintenance_sga_percent": 0.20,
+    "maintenance_rnd_percent": 0.20,
+    "reasoning": "⚠️ AI Unavailable - Using Conservative Defaults (80% Growth / 20% Maintenance). Check API keys or connection.",
+    "source": "defaults",
+}
+
+MAX_RETRIES = 3
+PERCENT_KEYS = ("maintenance_sga_percent", "maintenance_rnd_percent")
+REQUIRED_KEYS = PERCENT_KEYS + ("reasoning",)
+
+# Identical prompts in flight at the same time share one LLM call
+LLM_FLIGHTS = SingleFlight()
+# Completed estimates are shared across replicas through the cache backend
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 30 * 24 * 60 * 60))
+# Malformed answers are worth another attempt, but not for longer than a user will wait
+LLM_RETRY = RetryPolicy(
+    name="LLM estimate", max_attempts=MAX_RETRIES, base_delay=1.0,
+    deadline=float(os.getenv("LLM_RETRY_DEADLINE", 90)),
+    # A malformed or out-of-range answer (ValueError) is worth another sample
+    classify=retry_also(ValueError),
+)
+
+
+def _build_user_content(mda_text, financials_json):
+    return f"Financials: {json.dumps(dict(financials_json))}\n\nMD&A Text:\n{mda_text[:5000]}..." # Truncate for token limits
+
+
+def _prompt_key(user_content):
+    # Prompt + model: a changed system prompt or model never reuses old answers
+    model_name = os.getenv("OPENAI_MODEL", "gpt-5.1")
+    digest = hashlib.sha256(f"{model_name}\0{EPV_ANALYSIS_SYSTEM_PROMPT}\0{user_content}".encode())
+    return digest.hexdigest()
+
+
+def _is_model_estimate(result):
+    # Only real model answers are cached: defaults and the keyless simulation are retried next time
+    return result.get("source") == "llm"
+
+
+def _with_source(result, response_text):
+    # "simulated" when the client answered without an API key, else "llm"
+    result["source"] = "simulated" if response_text == SIMULATED_RESPONSE else "llm"
+    return result
+
+
+def _parse_response(response_text):
+    """
+    Strips markdown code fences, parses the JSON and validates keys and ranges.
+    """
+    cleaned_text = response_text.strip()
+    if cleaned_text.startswith("```json"):
+        cleaned_text = cleaned_text[7:]
+    elif cleaned_text.startswith("```"):
+        cleaned_text = cleaned_text[3:]
+    if cleaned_text.endswith("```"):
+        cleaned_text = cleaned_text[:-3]
+
+    data = json.loads(cleaned_text.strip())
+
+    # Validate keys
+    if not isinstance(data, dict) or not all(key in data for key in REQUIRED_KEYS):
+        raise ValueError("Missing required keys in LLM response")
+    if not all(isinstance(data[key], (int, float)) for key in PERCENT_KEYS):
+        raise ValueError("Percentages must be numbers")
+
+    # Validate value ranges (0.0 to 1.0)
+    if not (0 <= data['maintenance_sga_percent'] <= 1 and 0 <= data['maintenance_rnd_percent'] <= 1):
+        raise ValueError("Percentages must be between 0 and 1")
+
+    return data
 
 
 def analyze_growth_spend(mda_text, financials_json):
@@ -27,56 +106,193 @@ def analyze_growth_spend(mda_text, financials_json):
     
     Args:
         mda_text (str): The Management Discussion & Analysis text
-        financials_json (dict): Financial data context
+        financials_json (Mapping): Financial data context (dict or Financials record)
         
     Returns:
         dict: Contains 'maintenance_sga_percent', 'maintenance_rnd_percent', 'reasoning'
+              and 'source' ("llm", "simulated" without an API key, or "defaults")
     """
-    
-    CONSERVATIVE_DEFAULTS = {
-        # Bias toward growth-heavy spend when the AI is unavailable to avoid underestimating EPV
-        "maintenance_sga_percent": 0.20,
-        "maintenance_rnd_percent": 0.20,
-        "reasoning": "⚠️ AI Unavailable - Using Conservative Defaults (80% Growth / 20% Maintenance). Check API keys or connection."
-    }
-    
-    MAX_RETRIES = 3
-    user_content = f"Financials: {json.dumps(financials_json)}\n\nMD&A Text:\n{mda_text[:5000]}..." # Truncate for token limits
-    
-    for attempt in range(MAX_RETRIES):
-        try:
+    user_content = _build_user_content(mda_text, financials_json)
+    key = _prompt_key(user_content)
+    return LLM_FLIGHTS.do(key, lambda: get_cache().get_or_set(
+        f"llm:{key}", lambda: _request_estimate(user_content), LLM_CACHE_TTL, cacheable=_is_model_estimate,
+    ))
+
+
+def _request_estimate(user_content):
+    attempt = 0
+
+    def attempt_once():
+        nonlocal attempt
+        attempt += 1
+        with llm_context(operation="analyze_growth_spend", attempt=attempt):
             response_text = get_llm_response(
-                system_prompt=EPV_ANALYSIS_SYSTEM_PROMPT, 
+                system_prompt=EPV_ANALYSIS_SYSTEM_PROMPT,
                 user_content=user_content
             )
-            
-            # Clean potential markdown code blocks
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```json"):
-                cleaned_text = cleaned_text[7:]
-            elif cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text[3:]
-            if cleaned_text.endswith("```"):
-                cleaned_text = cleaned_text[:-3]
-                
-            cleaned_text = cleaned_text.strip()
-            
-            data = json.loads(cleaned_text)
-            
-            # Validate keys
-            required_keys = ["maintenance_sga_percent", "maintenance_rnd_percent", "reasoning"]
-            if not all(key in data for key in required_keys):
-                raise ValueError("Missing required keys in LLM response")
-                
-            # Validate value ranges (0.0 to 1.0)
-            if not (0 <= data['maintenance_sga_percent'] <= 1 and 0 <= data['maintenance_rnd_percent'] <= 1):
-                raise ValueError("Percentages must be between 0 and 1")
-
-            return data
-            
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            time.sleep(1) # Backoff
-            
-    # If all retries fail, return defaults
-    return CONSERVATIVE_DEFAULTS
+        result = _with_source(_parse_response(response_text), response_text)
+        TELEMETRY.record_outcome("analyze_growth_spend", attempt, "ok")
+        return result
+
+    try:
+        return LLM_RETRY.call(attempt_once)
+    except Exception as e:
+        # If all retries fail, return defaults
+        print(f"⚠️ LLM estimate failed: {e}. Using conservative defaults.")
+        TELEMETRY.record_outcome("analyze_growth_spend", attempt, "defaults")
+        return dict(CONSERVATIVE_DEFAULTS)
+
+
+class MalformedStreamError(ValueError):
+    """Raised as soon as a streamed response can no longer become valid JSON output."""
+
+
+_NUMBER = r'(-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)'
+_COMPLETE_PERCENT_RE = {
+    key: re.compile(rf'"{key}"\s*:\s*{_NUMBER}\s*[,}}\s]') for key in PERCENT_KEYS
+}
+_NON_NUMERIC_PERCENT_RE = {
+    key: re.compile(rf'"{key}"\s*:\s*[^\s\d.\-]') for key in PERCENT_KEYS
+}
+_PARTIAL_REASONING_RE = re.compile(r'"reasoning"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+
+class EstimateStreamParser:
+    """
+    Incrementally inspects a streamed LLM response.
+
+    feed() returns each maintenance percentage the moment its number is
+    complete, so the UI can show it while the reasoning is still streaming,
+    and raises MalformedStreamError as soon as the output is unrecoverable
+    (not a JSON object, a non-numeric or out-of-range percentage, or no
+    percentages within `max_chars_without_estimates`).
+    """
+
+    def __init__(self, max_chars_without_estimates=4000):
+        self.max_chars_without_estimates = max_chars_without_estimates
+        self.text = ""
+        self.estimates = {}
+
+    def feed(self, chunk):
+        self.text += chunk
+        body = self.text.lstrip()
+        if body.startswith("```"):
+            body = body[7:] if body.startswith("```json") else body[3:]
+            body = body.lstrip()
+        if body and not body.startswith("{"):
+            raise MalformedStreamError(f"Response does not start with a JSON object: {body[:40]!r}")
+
+        completed = {}
+        for key in PERCENT_KEYS:
+            if key in self.estimates:
+                continue
+            if _NON_NUMERIC_PERCENT_RE[key].search(body):
+                raise MalformedStreamError(f"{key} is not a number")
+            match = _COMPLETE_PERCENT_RE[key].search(body)
+            if match:
+                value = float(match.group(1))
+                if not 0 <= value <= 1:
+                    raise MalformedStreamError(f"{key}={value} is outside 0-1")
+                self.estimates[key] = completed[key] = value
+
+        if len(self.estimates) < len(PERCENT_KEYS) and len(body) > self.max_chars_without_estimates:
+            raise MalformedStreamError("No maintenance percentages in the first "
+                                       f"{self.max_chars_without_estimates} characters")
+        return completed
+
+    def partial_reasoning(self):
+        """
+        The reasoning string received so far (best effort, escapes decoded).
+        """
+        match = _PARTIAL_REASONING_RE.search(self.text)
+        if not match:
+            return ""
+        raw = match.group(1)
+        if raw.endswith("\\") and not raw.endswith("\\\\"):
+            raw = raw[:-1]  # drop a dangling escape until its partner arrives
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
+
+    def result(self):
+        return _parse_response(self.text)
+
+
+def analyze_growth_spend_streaming(mda_text, financials_json, on_estimate=None, on_reasoning=None):
+    """
+    Streaming version of analyze_growth_spend with the same return value.
+
+    Args:
+        mda_text (str): The Management Discussion & Analysis text
+        financials_json (Mapping): Financial data context
+        on_estimate (callable, optional): Called as on_estimate(key, value) the
+            moment each maintenance percentage is complete; value None retracts
+            a percentage shown by an attempt that then failed
+        on_reasoning (callable, optional): Called with the reasoning text so far
+            as it streams ("" when a failed attempt's reasoning is retracted)
+
+    Malformed output aborts the stream immediately, retracts whatever that
+    attempt had shown and the next attempt starts without waiting for the rest
+    of the completion. Shares the single-flight and cache key with
+    analyze_growth_spend; a cached or coalesced estimate is replayed through the
+    callbacks.
+    """
+    user_content = _build_user_content(mda_text, financials_json)
+    key = _prompt_key(user_content)
+    streamed = []
+    result = LLM_FLIGHTS.do(key, lambda: get_cache().get_or_set(
+        f"llm:{key}", lambda: _stream_estimate(user_content, on_estimate, on_reasoning, streamed),
+        LLM_CACHE_TTL, cacheable=_is_model_estimate,
+    ))
+    if not streamed and result.get("source") != "defaults":
+        # Answered by the cache or another caller's request
+        if on_estimate:
+            for k in PERCENT_KEYS:
+                on_estimate(k, result[k])
+        if on_reasoning:
+            on_reasoning(result["reasoning"])
+    return result
+
+
+def _stream_estimate(user_content, on_estimate, on_reasoning, streamed):
+    # Marks `streamed` so the caller knows the callbacks already saw the answer
+    streamed.append(True)
+    attempt = 0
+
+    def attempt_once():
+        # Malformed output raises out of the loop, closing the stream early
+        nonlocal attempt
+        attempt += 1
+        parser = EstimateStreamParser()
+        shown_reasoning = False
+        stream = stream_llm_response(system_prompt=EPV_ANALYSIS_SYSTEM_PROMPT, user_content=user_content)
+        try:
+            with llm_context(operation="analyze_growth_spend_streaming", attempt=attempt):
+                for chunk in stream:
+                    for key, value in parser.feed(chunk).items():
+                        if on_estimate:
+                            on_estimate(key, value)
+                    if on_reasoning and len(parser.estimates) == len(PERCENT_KEYS):
+                        shown_reasoning = True
+                        on_reasoning(parser.partial_reasoning())
+            result = _with_source(parser.result(), parser.text)
+        except Exception:
+            # Nothing from a failed attempt may stay on screen
+            if on_estimate:
+                for key in parser.estimates:
+                    on_estimate(key, None)
+            if shown_reasoning:
+                on_reasoning("")
+            raise
+        finally:
+            stream.close()
+        TELEMETRY.record_outcome("analyze_growth_spend_streaming", attempt, "ok")
+        return result
+
+    try:
+        return LLM_RETRY.call(attempt_once)
+    except Exception as e:
+        print(f"⚠️ LLM estimate failed: {e}. Using conservative defaults.")
+        TELEMETRY.record_outcome("analyze_growth_spend_streaming", attempt, "defaults")
+        return dict(CONSERVATIVE_DEFAULTS)
@@ -0,0 +1,422 @@
+"""
+LLM Call Telemetry
+
+Every chat completion made through src.ai.client is recorded as one LLMCall:
+model requested and used, whether the gpt-4o fallback or the simulated
+(no API key) path answered, prompt / completion tokens, latency, time to first
+token for streams, estimated cost, and which parser operation and retry attempt
+made it. Calls are:
+
+- Aggregated in-process into counters and histograms (TELEMETRY.snapshot())
+- Appended as JSON lines to LLM_TELEMETRY_PATH (default .cache/llm_calls.jsonl;
+  "off" disables), so batch runs in separate processes can be reported on
+  together. Past LLM_TELEMETRY_MAX_BYTES (default 20 MB) the log rotates to
+  llm_calls.jsonl.1, keeping one previous file
+
+Parser operations additionally report their outcome (answered, fell back to
+conservative defaults) and how many attempts the retry loop needed.
+
+    python -m src.ai.telemetry                      # summary of the JSONL log
+    python -m src.ai.telemetry --since 2024-05-01 --budget-usd 50
+
+Prices are USD per million tokens (input, output) from MODEL_PRICES; override
+or extend them with LLM_PRICES='{"gpt-5.1": [1.25, 10.0]}'. Token counts come
+from the API's usage block; the simulated path estimates them (~4 characters
+per token) and marks the call `tokens_estimated`.
+"""
+
+import argparse
+import bisect
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+DEFAULT_LOG_PATH = os.path.join(".cache", "llm_calls.jsonl")
+# The log is rotated to <path>.1 once it reaches this size
+MAX_LOG_BYTES = int(os.getenv("LLM_TELEMETRY_MAX_BYTES", 20 * 1024 * 1024))
+
+# USD per 1M tokens: (input, output)
+MODEL_PRICES = {
+    "gpt-5.1": (1.25, 10.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Parser operation / retry attempt for calls made inside llm_context()
+_context = contextvars.ContextVar("llm_context", default={})
+
+
+@dataclass
+class LLMCall:
+    model_requested: str
+    model_used: str = None
+    operation: str = None
+    attempt: int = 1
+    streamed: bool = False
+    fallback: bool = False
+    simulated: bool = False
+    status: str = "ok"
+    error: str = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    latency_s: float = 0.0
+    time_to_first_token_s: float = None
+    cost_usd: float = None
+    started_at: float = field(default_factory=time.time)
+
+    def set_usage(self, usage):
+        """
+        Copies token counts from an OpenAI `usage` block (object or dict).
+        """
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+        self.prompt_tokens = int(get("prompt_tokens") or 0)
+        self.completion_tokens = int(get("completion_tokens") or 0)
+        self.tokens_estimated = False
+
+    def estimate_usage(self, prompt_text, completion_text):
+        self.prompt_tokens = estimate_tokens(prompt_text)
+        self.completion_tokens = estimate_tokens(completion_text)
+        self.tokens_estimated = True
+
+
+def estimate_tokens(text):
+    return (len(text or "") + 3) // 4
+
+
+def model_prices():
+    """
+    MODEL_PRICES merged with the LLM_PRICES environment override. Each distinct
+    override is parsed once; an invalid one is ignored with a warning.
+    """
+    global _parsed_prices
+    override = os.getenv("LLM_PRICES")
+    parsed_for, prices = _parsed_prices
+    if override == parsed_for:
+        return prices
+    prices = dict(MODEL_PRICES)
+    if override:
+        try:
+            prices.update({model: (float(pair[0]), float(pair[1])) for model, pair in json.loads(override).items()})
+        except (ValueError, AttributeError, TypeError, IndexError, KeyError) as e:
+            print(f"⚠️ Ignoring invalid LLM_PRICES: {e}")
+    _parsed_prices = (override, prices)
+    return prices
+
+
+_parsed_prices = (None, dict(MODEL_PRICES))
+
+
+def call_cost(call, prices=None):
+    """
+    USD cost of a call, or None for models without a price (simulated calls cost 0).
+    """
+    if call.simulated:
+        return 0.0
+    prices = prices or model_prices()
+    price = prices.get(call.model_used or call.model_requested)
+    if price is None:
+        return None
+    return (call.prompt_tokens * price[0] + call.completion_tokens * price[1]) / 1_000_000
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; quantiles interpolate within the bucket.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: > max bound
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = self.bounds[i - 1] if i > 0 else min(self.min, self.bounds[0])
+                high = self.bounds[i] if i < len(self.bounds) else self.max
+                low, high = max(low, self.min), min(high, self.max)
+                return low + (high - low) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class Telemetry:
+    """
+    Thread-safe aggregation of LLM calls and parser outcomes, with an
+    optional JSONL sink.
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_LOG_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.cost_usd = 0.0
+            self.unpriced_calls = 0
+
+    def record_call(self, call):
+        """
+        Aggregates one finished call and appends it to the log.
+        """
+        if call.cost_usd is None:
+            call.cost_usd = call_cost(call)
+        model = call.model_used or call.model_requested
+        with self._lock:
+            self._count("calls", model)
+            if call.status != "ok":
+                self._count("errors", model)
+            if call.fallback:
+                self._count("fallbacks", model)
+            if call.simulated:
+                self._count("simulated", model)
+            if call.attempt > 1:
+                self._count("retry_calls", model)
+            self._count("prompt_tokens", model, call.prompt_tokens)
+            self._count("completion_tokens", model, call.completion_tokens)
+            self._observe("latency_s", model, call.latency_s, LATENCY_BUCKETS)
+            self._observe("completion_tokens", model, call.completion_tokens, TOKEN_BUCKETS)
+            if call.time_to_first_token_s is not None:
+                self._observe("time_to_first_token_s", model, call.time_to_first_token_s, LATENCY_BUCKETS)
+            if call.cost_usd is None:
+                self.unpriced_calls += 1
+            else:
+                self.cost_usd += call.cost_usd
+        self._write({"type": "call", **asdict(call)})
+
+    def record_outcome(self, operation, attempts, outcome):
+        """
+        One parser operation finished after `attempts` LLM calls; outcome is
+        "ok" or "defaults" (every attempt failed).
+        """
+        with self._lock:
+            self._count("operations", operation)
+            self._count(f"outcome_{outcome}", operation)
+            self._count("retries", operation, attempts - 1)
+        self._write({"type": "outcome", "operation": operation, "attempts": attempts,
+                     "outcome": outcome, "at": time.time()})
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'counters': {name: {label: value}}, 'histograms': {name: {label: summary}},
+                   'cost_usd': float, 'unpriced_calls': int}
+        """
+        with self._lock:
+            return {
+                "counters": {name: dict(values) for name, values in self.counters.items()},
+                "histograms": {
+                    name: {label: hist.summary() for label, hist in by_label.items()}
+                    for name, by_label in self.histograms.items()
+                },
+                "cost_usd": self.cost_usd,
+                "unpriced_calls": self.unpriced_calls,
+            }
+
+    # --- Internal helpers ---
+    def _count(self, name, label, amount=1):
+        values = self.counters.setdefault(name, {})
+        values[label] = values.get(label, 0) + amount
+
+    def _observe(self, name, label, value, bounds):
+        by_label = self.histograms.setdefault(name, {})
+        if label not in by_label:
+            by_label[label] = Histogram(bounds)
+        by_label[label].observe(value)
+
+    def _write(self, event):
+        if not self.path:
+            return
+        line = json.dumps(event, default=str) + "\n"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a") as fh:
+                    fh.write(line)
+        except OSError as e:
+            print(f"⚠️ Could not write LLM telemetry to {self.path}: {e}")
+
+
+def _default_path():
+    path = os.getenv("LLM_TELEMETRY_PATH", DEFAULT_LOG_PATH)
+    return None if path.strip().lower() in ("", "off", "0", "false") else path
+
+
+TELEMETRY = Telemetry(_default_path())
+
+
+@contextlib.contextmanager
+def llm_context(**fields):
+    """
+    Tags LLM calls made inside the block, e.g.
+    `with llm_context(operation="analyze_growth_spend", attempt=2):`.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def start_call(model_name, streamed=False):
+    """
+    New LLMCall carrying the current llm_context tags; finish it with finish_call.
+    """
+    context = _context.get()
+    call = LLMCall(
+        model_requested=model_name,
+        operation=context.get("operation"),
+        attempt=context.get("attempt", 1),
+        streamed=streamed,
+    )
+    call._started = time.perf_counter()
+    return call
+
+
+def finish_call(call, error=None):
+    call.latency_s = time.perf_counter() - call._started
+    if error is not None:
+        call.status = "error"
+        call.error = str(error)[:500]
+    call.model_used = call.model_used or call.model_requested
+    try:
+        TELEMETRY.record_call(call)
+    except Exception as e:
+        # Telemetry must never fail the call it measures
+        print(f"⚠️ Could not record LLM telemetry: {e}")
+    return call
+
+
+# --- Report ---
+def load_events(path, since=None):
+    """
+    Reads telemetry JSONL logs (one path or a list, oldest first) into a
+    fresh (non-writing) Telemetry.
+    """
+    telemetry = Telemetry(path=None)
+    for log in ([path] if isinstance(path, str) else path):
+        with open(log) as fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from a concurrent writer
+                at = event.get("started_at", event.get("at", 0))
+                if since is not None and at < since:
+                    continue
+                if event.get("type") == "call":
+                    fields = {k: v for k, v in event.items() if k in LLMCall.__dataclass_fields__}
+                    telemetry.record_call(LLMCall(**fields))
+                elif event.get("type") == "outcome":
+                    telemetry.record_outcome(event["operation"], event["attempts"], event["outcome"])
+    return telemetry
+
+
+def format_report(snapshot, budget_usd=None):
+    counters, histograms = snapshot["counters"], snapshot["histograms"]
+    lines = []
+    models = sorted(counters.get("calls", {}))
+    if not models:
+        return "No LLM calls recorded."
+
+    lines.append(f"{'model':<14}{'calls':>7}{'errors':>8}{'fallback':>10}{'simulated':>11}"
+                 f"{'prompt tok':>12}{'compl tok':>11}{'p50 s':>8}{'p90 s':>8}{'p99 s':>8}")
+    for model in models:
+        latency = histograms.get("latency_s", {}).get(model, {})
+        lines.append(
+            f"{model:<14}{counters['calls'][model]:>7}"
+            f"{counters.get('errors', {}).get(model, 0):>8}"
+            f"{counters.get('fallbacks', {}).get(model, 0):>10}"
+            f"{counters.get('simulated', {}).get(model, 0):>11}"
+            f"{counters.get('prompt_tokens', {}).get(model, 0):>12,}"
+            f"{counters.get('completion_tokens', {}).get(model, 0):>11,}"
+            f"{_seconds(latency.get('p50'))}{_seconds(latency.get('p90'))}{_seconds(latency.get('p99'))}"
+        )
+
+    ttft = histograms.get("time_to_first_token_s", {})
+    for model, summary in sorted(ttft.items()):
+        lines.append(f"streaming {model}: time to first token p50 {summary['p50']:.2f}s, p90 {summary['p90']:.2f}s")
+
+    for operation, count in sorted(counters.get("operations", {}).items()):
+        retries = counters.get("retries", {}).get(operation, 0)
+        defaults = counters.get("outcome_defaults", {}).get(operation, 0)
+        lines.append(f"{operation}: {count} runs, {retries} retries, {defaults} fell back to defaults")
+
+    cost = f"${snapshot['cost_usd']:.4f}"
+    if snapshot["unpriced_calls"]:
+        cost += f" (+{snapshot['unpriced_calls']} calls with no price in MODEL_PRICES / LLM_PRICES)"
+    lines.append(f"Estimated spend: {cost}")
+    if budget_usd:
+        lines.append(f"Budget: {snapshot['cost_usd'] / budget_usd:.1%} of ${budget_usd:,.2f} used")
+    return "\n".join(lines)
+
+
+def _seconds(value):
+    return f"{value:>8.2f}" if value is not None else f"{'-':>8}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize LLM call telemetry (tokens, cost, latency, retries).")
+    parser.add_argument("--path", default=None, help="Telemetry log (default: $LLM_TELEMETRY_PATH or .cache/llm_calls.jsonl)")
+    parser.add_argument("--since", default=None, help="Only calls on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--budget-usd", type=float, default=None, help="Show spend against this budget")
+    parser.add_argument("--json", action="store_true", help="Print the raw counters and histograms as JSON")
+    args = parser.parse_args(argv)
+
+    path = args.path or _default_path() or DEFAULT_LOG_PATH
+    logs = [log for log in (path + ".1", path) if os.path.exists(log)]
+    if not logs:
+        parser.error(f"No telemetry log at {path}")
+    since = None
+    if args.since:
+        since = datetime.fromisoformat(args.since).replace(tzinfo=timezone.utc).timestamp()
+
+    snapshot = load_events(logs, since=since).snapshot()
+    print(json.dumps(snapshot, indent=2) if args.json else format_report(snapshot, args.budget_usd))
+
+
+if __name__ == "__main__":
+    main()
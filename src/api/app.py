@@ -0,0 +1,310 @@
+"""
+EPV HTTP API
+
+Lightweight ASGI service (Starlette) that serves the same analyses as the
+Streamlit app to other systems:
+
+- GET  /valuation/{ticker}        One company. Optional ?wacc=,
+                                  ?maintenance_sga_percent=, ?maintenance_rnd_percent=
+- GET  /valuations?tickers=A,B    Batch, loaded concurrently
+- POST /scenarios                 Tickers x scenarios sweep (src.finance.scenarios)
+- GET  /health
+
+Analyses come from the results store (the full SECFetcher / market snapshot /
+AI / GreenwaldEPV pipeline runs on a miss) on worker threads, so the event
+loop never blocks on network or LLM calls. Concurrent identical requests
+share one computation, successful responses are cached for API_CACHE_TTL
+seconds, and every response carries an ETag: clients that send it back in
+If-None-Match get a 304 with no body.
+
+    uvicorn src.api.app:app --port 8000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.data.results_store import ResultsStore
+from src.finance.financials import Financials
+from src.finance.scenarios import DEFAULT_OUTPUTS, Scenario, run_scenarios
+from src.finance.valuation import DEFAULT_COST_OF_CAPITAL, value_company
+from src.pipeline import load_analysis
+from src.utils.singleflight import SingleFlight
+
+DEFAULT_CACHE_TTL = float(os.getenv("API_CACHE_TTL", 60))
+MAX_BATCH_TICKERS = 50
+MAX_SCENARIO_CELLS = 100_000
+
+_TICKER_RE = re.compile(r"^[A-Z]{1,5}$")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ResponseCache:
+    """
+    Small LRU of serialized responses with a fixed time-to-live.
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_entries=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, body, etag)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key, body, etag):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, body, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ValuationService:
+    """
+    Request handling state shared by the routes: results store, response
+    cache and the in-flight computations being coalesced.
+    """
+
+    def __init__(self, store=None, cache_ttl=DEFAULT_CACHE_TTL):
+        self._store = store
+        self.cache = ResponseCache(ttl=cache_ttl)
+        self._flights = SingleFlight()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = ResultsStore()
+        return self._store
+
+    @property
+    def coalesced(self):
+        # Requests that joined an in-flight computation instead of starting one
+        return self._flights.shared
+
+    # --- Routes ---
+    async def valuation(self, request):
+        ticker = _parse_ticker(request.path_params["ticker"])
+        wacc, adjustments = _parse_overrides(request.query_params)
+        return await self._respond(request, lambda: self._valuation_payload(ticker, wacc, adjustments))
+
+    async def valuations(self, request):
+        tickers = [_parse_ticker(t) for t in request.query_params.get("tickers", "").replace(",", " ").split()]
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            raise ApiError(400, "Pass ?tickers=AAA,BBB")
+        if len(tickers) > MAX_BATCH_TICKERS:
+            raise ApiError(400, f"At most {MAX_BATCH_TICKERS} tickers per request")
+        wacc, adjustments = _parse_overrides(request.query_params)
+
+        async def payload():
+            results = await asyncio.gather(
+                *(self._valuation_payload(t, wacc, adjustments) for t in tickers), return_exceptions=True
+            )
+            valuations = [r for r in results if not isinstance(r, BaseException)]
+            errors = {t: str(r) for t, r in zip(tickers, results) if isinstance(r, BaseException)}
+            return {"valuations": valuations, "errors": errors}
+
+        return await self._respond(request, payload)
+
+    async def scenarios(self, request):
+        try:
+            spec = await request.json()
+        except ValueError:
+            raise ApiError(400, "Body must be JSON")
+        if not isinstance(spec, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        tickers = list(dict.fromkeys(_parse_ticker(t) for t in spec.get("tickers") or []))
+        raw_scenarios = spec.get("scenarios") or []
+        if not tickers or not raw_scenarios:
+            raise ApiError(400, "Body needs non-empty 'tickers' and 'scenarios'")
+        if len(tickers) * len(raw_scenarios) > MAX_SCENARIO_CELLS:
+            raise ApiError(400, f"At most {MAX_SCENARIO_CELLS} ticker x scenario cells per request")
+
+        try:
+            scenarios = [Scenario(**s) for s in raw_scenarios]
+        except TypeError as e:
+            raise ApiError(400, f"Invalid scenario: {e}")
+        outputs = tuple(spec.get("outputs") or DEFAULT_OUTPUTS)
+
+        async def payload():
+            records = await asyncio.gather(*(self._analysis(t) for t in tickers))
+            frame = await asyncio.to_thread(_run_scenarios, records, scenarios, outputs)
+            return {"columns": list(frame.columns), "rows": frame.astype({"ticker": str, "scenario": str}).values.tolist()}
+
+        return await self._respond(request, payload, body_key=hashlib.sha256(await request.body()).hexdigest())
+
+    async def health(self, request):
+        return Response(json.dumps({
+            "status": "ok",
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "coalesced": self.coalesced,
+        }), media_type="application/json")
+
+    # --- Internal helpers ---
+    async def _respond(self, request, compute, body_key=""):
+        key = f"{request.method} {request.url.path}?{request.url.query}#{body_key}"
+        cached = self.cache.get(key)
+        if cached is None:
+            try:
+                cached = await self._flights.do_async(f"response:{key}", self._render, key, compute)
+            except ValueError as e:
+                raise ApiError(400, str(e))
+        body, etag = cached
+
+        headers = {"ETag": etag, "Cache-Control": f"max-age={int(self.cache.ttl)}"}
+        if etag in _parse_if_none_match(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def _render(self, key, compute):
+        body = json.dumps(await compute(), default=_json_default, separators=(",", ":")).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.cache.put(key, body, etag)
+        return body, etag
+
+    async def _analysis(self, ticker):
+        # Blocking pipeline runs go to a worker thread
+        return await self._flights.do_async(f"analysis:{ticker}", load_analysis, ticker, store=self.store)
+
+    async def _valuation_payload(self, ticker, wacc, adjustments):
+        record = await self._analysis(ticker)
+        ai_estimates = record["ai_estimates"]
+        if wacc is None and not adjustments:
+            valuation = record["valuation"]
+        else:
+            valuation = value_company(
+                record["financials"], record["market_data"], dict(ai_estimates, **adjustments),
+                DEFAULT_COST_OF_CAPITAL if wacc is None else wacc,
+            )
+        market_data = record["market_data"]
+        return {
+            "ticker": record["ticker"],
+            "company_name": market_data.get("company_name"),
+            "sector": market_data.get("sector"),
+            "computed_at": record.get("computed_at"),
+            "is_mock": bool(market_data.get("is_mock") or record["financials"].get("is_mock")),
+            "ai_estimates": ai_estimates,
+            "valuation": valuation,
+        }
+
+
+def _run_scenarios(records, scenarios, outputs):
+    return run_scenarios(
+        [Financials.from_dict(dict(r["financials"], ticker=r["ticker"])) for r in records],
+        scenarios,
+        adjustments=[r["ai_estimates"] for r in records],
+        market_data=[r["market_data"] for r in records],
+        outputs=outputs,
+        max_workers=1,
+    )
+
+
+def _json_default(value):
+    # NumPy scalars from scenario frames
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _parse_ticker(value):
+    ticker = str(value).strip().upper()
+    if not _TICKER_RE.match(ticker):
+        raise ApiError(400, f"Invalid ticker {value!r}: expected 1-5 letters")
+    return ticker
+
+
+def _parse_overrides(params):
+    def number(name, low, high):
+        if name not in params:
+            return None
+        try:
+            value = float(params[name])
+        except ValueError:
+            raise ApiError(400, f"{name} must be a number")
+        if not low <= value <= high:
+            raise ApiError(400, f"{name} must be between {low} and {high}")
+        return value
+
+    wacc = number("wacc", 0.001, 1.0)
+    adjustments = {}
+    for name in ("maintenance_sga_percent", "maintenance_rnd_percent"):
+        value = number(name, 0.0, 1.0)
+        if value is not None:
+            adjustments[name] = value
+    return wacc, adjustments
+
+
+def _parse_if_none_match(header):
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def create_app(store=None, cache_ttl=DEFAULT_CACHE_TTL):
+    """
+    Builds the ASGI app. The results store is opened on first use.
+    """
+    service = ValuationService(store=store, cache_ttl=cache_ttl)
+
+    def route(handler):
+        async def endpoint(request: Request):
+            try:
+                return await handler(request)
+            except ApiError as e:
+                return Response(json.dumps({"error": e.message}), status_code=e.status, media_type="application/json")
+        return endpoint
+
+    app = Starlette(routes=[
+        Route("/valuation/{ticker}", route(service.valuation), methods=["GET"]),
+        Route("/valuations", route(service.valuations), methods=["GET"]),
+        Route("/scenarios", route(service.scenarios), methods=["POST"]),
+        Route("/health", route(service.health), methods=["GET"]),
+    ])
+    app.state.service = service
+    return app
+
+
+app = create_app()
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve EPV valuations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
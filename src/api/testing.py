@@ -0,0 +1,62 @@
+"""
+In-process ASGI Client
+
+Drives an ASGI app directly (no socket, no extra HTTP client dependency) for
+the API tests and the load-test harness:
+
+    status, headers, body = await asgi_request(app, "GET", "/valuation/SHOP")
+"""
+
+import json
+from urllib.parse import urlsplit
+
+
+async def asgi_request(app, method, url, headers=None, body=b""):
+    """
+    Sends one HTTP request to an ASGI app.
+
+    Args:
+        app: ASGI application
+        method (str): HTTP method
+        url (str): Path with optional query string
+        headers (dict, optional): Request headers
+        body (bytes | dict): Request body; dicts are sent as JSON
+
+    Returns:
+        tuple: (status code, response headers dict, body bytes)
+    """
+    headers = dict(headers or {})
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+        headers.setdefault("content-type", "application/json")
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "root_path": "",
+        "query_string": parts.query.encode(),
+        "headers": [(k.lower().encode(), str(v).encode()) for k, v in headers.items()]
+                   + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        return pending.pop(0) if pending else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
@@ -0,0 +1,422 @@
+"""
+Shared Cache Backends
+
+Fetch, LLM and analysis results are cached through one small interface so
+several analyzer replicas can share a single cache instead of each repeating
+the same SEC fetch and LLM call:
+
+- NullCache     Caching disabled (the default)
+- MemoryCache   In-process LRU; one replica, or a stand-in for tests
+- SQLiteCache   On-disk; shared by every process on one host
+- RedisCache    Any Redis-protocol server; shared by every replica
+
+Values go through src.cache.codec (compact binary, compressed when large) and
+each key carries its own TTL. Backend errors never fail a request: a broken
+cache reads as a miss.
+
+Pick the process-wide backend with CACHE_BACKEND:
+
+    CACHE_BACKEND=memory
+    CACHE_BACKEND=sqlite                     # CACHE_PATH, default .cache/shared_cache.db
+    CACHE_BACKEND=redis://cache.internal:6379/0
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from src.cache import codec
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "shared_cache.db")
+KEY_PREFIX = "epv:"
+
+
+class CacheBackend:
+    """
+    Interface shared by every backend. Subclasses implement _get_bytes /
+    _set_bytes / _delete; values are encoded and counted here.
+
+    Attributes:
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that found nothing (or hit a backend error)
+        errors (int): Backend failures and entries that could not be encoded / decoded
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key):
+        """
+        Returns the cached value, or None on a miss / expiry / backend error /
+        corrupt entry.
+        """
+        try:
+            data = self._get_bytes(key)
+            value = None if data is None else codec.loads(data)
+        except (OSError, sqlite3.Error, RedisError, codec.CodecError, ValueError, RuntimeError) as e:
+            print(f"⚠️ {self.name} cache read failed: {e}")
+            self._count("errors")
+            value = None
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value for `ttl` seconds (None = until evicted). None values
+        are not cacheable: they would read back as a miss.
+        """
+        if value is None:
+            return
+        try:
+            self._set_bytes(key, codec.dumps(value), ttl)
+        except (OSError, sqlite3.Error, RedisError, codec.CodecError) as e:
+            print(f"⚠️ {self.name} cache write failed: {e}")
+            self._count("errors")
+
+    def delete(self, key):
+        try:
+            self._delete(key)
+        except (OSError, sqlite3.Error, RedisError) as e:
+            print(f"⚠️ {self.name} cache delete failed: {e}")
+            self._count("errors")
+
+    def get_or_set(self, key, fn, ttl=None, cacheable=None):
+        """
+        Returns the cached value for `key`, or computes fn(), caches it when
+        `cacheable(value)` allows (e.g. skip mock fallbacks) and returns it.
+        """
+        value = self.get(key)
+        if value is None:
+            value = fn()
+            if cacheable is None or cacheable(value):
+                self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        lookups = hits + misses
+        return {
+            "backend": self.name,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        pass
+
+    def _count(self, counter):
+        # Backends are shared by every request thread; += on an attribute is not atomic
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # --- Backend hooks ---
+    def _get_bytes(self, key):
+        raise NotImplementedError
+
+    def _set_bytes(self, key, data, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    name = "none"
+
+    def _get_bytes(self, key):
+        return None
+
+    def _set_bytes(self, key, data, ttl):
+        pass
+
+    def _delete(self, key):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    Thread-safe in-process LRU. Values are stored encoded, so callers get a
+    fresh copy on every read exactly as with the remote backends.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries=4096, clock=time.monotonic):
+        super().__init__()
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at or None, data)
+
+    def _get_bytes(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _set_bytes(self, key, data, ttl):
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Key/value table in a WAL-mode SQLite file, shared by every process that
+    opens the same path. Expired rows are skipped on read and purged every
+    `purge_every` writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=None, purge_every=500, clock=time.time):
+        super().__init__()
+        self.path = path or os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.purge_every = purge_every
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get_bytes(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, self._clock())
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def _set_bytes(self, key, data, ttl):
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, None if ttl is None else now + ttl, data)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def _delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class _RespConnection:
+    # One socket speaking RESP2, the Redis wire protocol
+    def __init__(self, host, port, timeout):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile("rb")
+
+    def command(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("Redis server closed the connection")
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self._read_reply() for _ in range(size)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+
+class RedisCache(CacheBackend):
+    """
+    Minimal client for Redis (or any RESP-compatible server: Valkey, KeyDB,
+    Dragonfly). Keeps a small pool of idle connections so threads don't share
+    a socket; a connection that errors is dropped rather than reused.
+
+    Args:
+        url (str): redis://[:password@]host[:port][/db]
+        timeout (float): Connect / read timeout in seconds
+        prefix (str): Namespace prepended to every key
+    """
+
+    name = "redis"
+
+    def __init__(self, url="redis://localhost:6379/0", timeout=1.0, prefix=KEY_PREFIX, max_idle=8):
+        super().__init__()
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL {url!r}: expected redis://")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.timeout = timeout
+        self.prefix = prefix
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def command(self, *args):
+        conn = self._acquire()
+        try:
+            reply = conn.command(*args)
+        except RedisError:
+            self._release(conn)
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn)
+        return reply
+
+    def _get_bytes(self, key):
+        return self.command("GET", self.prefix + key)
+
+    def _set_bytes(self, key, data, ttl):
+        if ttl is None:
+            self.command("SET", self.prefix + key, data)
+        else:
+            self.command("SET", self.prefix + key, data, "PX", max(1, int(ttl * 1000)))
+
+    def _delete(self, key):
+        self.command("DEL", self.prefix + key)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # --- Internal helpers ---
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        conn = _RespConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                conn.command("AUTH", self.password)
+            if self.db:
+                conn.command("SELECT", self.db)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+def create_cache(spec=None):
+    """
+    Builds a backend from a CACHE_BACKEND-style spec: "none", "memory",
+    "sqlite" (or "sqlite:///path/to/cache.db") or a redis:// URL.
+    """
+    spec = (spec if spec is not None else os.getenv("CACHE_BACKEND", "none")).strip()
+    if spec in ("", "none"):
+        return NullCache()
+    if spec == "memory":
+        return MemoryCache()
+    if spec == "sqlite":
+        return SQLiteCache()
+    if spec.startswith("sqlite:///"):
+        return SQLiteCache(spec[len("sqlite:///"):])
+    if spec.startswith("redis://"):
+        return RedisCache(spec)
+    raise ValueError(f"Unknown CACHE_BACKEND {spec!r}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Process-wide backend selected by CACHE_BACKEND (created on first use).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
+
+
+def set_cache(cache):
+    """
+    Replaces the process-wide backend (tests, or apps that configure it in code).
+    Returns the previous backend.
+    """
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+    return previous
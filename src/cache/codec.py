@@ -0,0 +1,183 @@
+"""
+Compact Binary Cache Codec
+
+Cache values (financials, MD&A, market snapshots, LLM estimates, analysis
+records) are JSON-shaped, so they are serialized with a small tagged binary
+format instead of pickle: nothing executable ever comes back out of a cache
+shared between replicas, and numbers cost 1-9 bytes instead of their decimal
+text.
+
+- Tags cover None, bools, ints (zigzag varints, any size), float64, str,
+  bytes, lists (tuples encode as lists) and dicts; Mappings such as Financials
+  encode as dicts and NumPy scalars as their Python value
+- Payloads over COMPRESS_MIN_BYTES are zstd-compressed (zlib when zstandard is
+  not installed); the one-byte header records which
+- Any failure to encode a value or to decode bytes (unsupported type,
+  truncated or corrupt entry) raises CodecError
+"""
+
+import struct
+import zlib
+from collections.abc import Mapping
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_MIN_BYTES = 1024
+
+# Header byte
+_RAW, _ZSTD, _ZLIB = 0x01, 0x02, 0x03
+
+# Value tags
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _DICT = range(9)
+
+_DOUBLE = struct.Struct("<d")
+
+# How truncated or corrupt bytes fail inside _loads (TypeError: a list decoded as a dict key)
+_DECODE_ERRORS = (IndexError, struct.error, zlib.error, UnicodeDecodeError, TypeError, ValueError) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+class CodecError(ValueError):
+    """A value that cannot be encoded, or bytes that are not a valid cache entry."""
+
+
+def dumps(value):
+    """
+    Serializes a JSON-shaped value to bytes.
+    """
+    out = bytearray()
+    try:
+        _encode(value, out)
+    except (TypeError, ValueError, RecursionError) as e:
+        raise CodecError(f"Cannot encode cache value: {e}") from e
+    if len(out) < COMPRESS_MIN_BYTES:
+        return bytes([_RAW]) + out
+    if zstandard is not None:
+        return bytes([_ZSTD]) + zstandard.ZstdCompressor(level=3).compress(bytes(out))
+    return bytes([_ZLIB]) + zlib.compress(bytes(out), 6)
+
+
+def loads(data):
+    """
+    Inverse of dumps.
+    """
+    try:
+        return _loads(data)
+    except CodecError:
+        raise
+    except _DECODE_ERRORS as e:
+        raise CodecError(f"Corrupt cache value: {e!r}") from e
+
+
+# --- Internal helpers ---
+def _loads(data):
+    header, body = data[0], memoryview(data)[1:]
+    if header == _ZSTD:
+        if zstandard is None:
+            raise CodecError("Cache value was written with zstd but the zstandard package is not installed")
+        body = memoryview(zstandard.ZstdDecompressor().decompress(body))
+    elif header == _ZLIB:
+        body = memoryview(zlib.decompress(body))
+    elif header != _RAW:
+        raise CodecError(f"Unknown cache codec header {header:#x}")
+    value, end = _decode(body, 0)
+    if end != len(body):
+        raise CodecError("Trailing bytes after cache value")
+    return value
+
+
+def _write_varint(n, out):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode(value, out):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _write_varint(value * 2 if value >= 0 else -value * 2 - 1, out)  # zigzag
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out.append(_STR)
+        _write_varint(len(data), out)
+        out += data
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.append(_BYTES)
+        _write_varint(len(value), out)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(len(value), out)
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, Mapping):
+        out.append(_DICT)
+        _write_varint(len(value), out)
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif hasattr(value, "item"):
+        # NumPy scalars from yfinance / pandas frames
+        _encode(value.item(), out)
+    else:
+        raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+
+def _decode(buf, pos):
+    tag = buf[pos]
+    pos += 1
+    if tag == _NONE:
+        return None, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _INT:
+        n, pos = _read_varint(buf, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    if tag in (_STR, _BYTES):
+        size, pos = _read_varint(buf, pos)
+        data = bytes(buf[pos:pos + size])
+        return (data.decode() if tag == _STR else data), pos + size
+    if tag == _LIST:
+        size, pos = _read_varint(buf, pos)
+        items = []
+        for _ in range(size):
+            item, pos = _decode(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        size, pos = _read_varint(buf, pos)
+        result = {}
+        for _ in range(size):
+            key, pos = _decode(buf, pos)
+            result[key], pos = _decode(buf, pos)
+        return result, pos
+    raise CodecError(f"Unknown cache value tag {tag:#x}")
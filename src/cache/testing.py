@@ -0,0 +1,122 @@
+"""
+In-process Redis-protocol server for tests and local development.
+
+Speaks enough RESP2 for RedisCache (PING, AUTH, SELECT, GET, SET with EX/PX,
+DEL, EXISTS, DBSIZE, FLUSHDB) and keeps everything in one dict, so tests can
+point several RedisCache clients (stand-ins for separate replicas) at one
+shared cache without a real Redis:
+
+    with FakeRedisServer() as server:
+        cache = RedisCache(server.url)
+"""
+
+import socketserver
+import threading
+import time
+
+
+class FakeRedisServer:
+    """
+    Attributes:
+        commands (list[str]): Command names received, in order
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, clock=time.monotonic):
+        self._data = {}  # key bytes -> (value bytes, expires_at or None)
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.commands = []
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    args = _read_command(self.rfile)
+                    if args is None:
+                        return
+                    if not args:
+                        continue
+                    self.wfile.write(server._execute(args))
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Internal helpers ---
+    def _execute(self, args):
+        name = args[0].decode().upper()
+        with self._lock:
+            self.commands.append(name)
+            now = self._clock()
+            if name == "PING":
+                return b"+PONG\r\n"
+            if name in ("AUTH", "SELECT"):
+                return b"+OK\r\n"
+            if name == "GET":
+                entry = self._live(args[1], now)
+                return b"$-1\r\n" if entry is None else b"$%d\r\n%s\r\n" % (len(entry), entry)
+            if name == "SET":
+                expires_at = None
+                options = [a.decode().upper() for a in args[3::2]]
+                for option, value in zip(options, args[4::2]):
+                    if option == "PX":
+                        expires_at = now + int(value) / 1000
+                    elif option == "EX":
+                        expires_at = now + int(value)
+                self._data[args[1]] = (args[2], expires_at)
+                return b"+OK\r\n"
+            if name in ("DEL", "EXISTS"):
+                found = sum(self._live(key, now) is not None for key in args[1:])
+                if name == "DEL":
+                    for key in args[1:]:
+                        self._data.pop(key, None)
+                return b":%d\r\n" % found
+            if name == "DBSIZE":
+                return b":%d\r\n" % sum(self._live(key, now) is not None for key in list(self._data))
+            if name == "FLUSHDB":
+                self._data.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+
+def _read_command(reader):
+    line = reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command (e.g. typed into telnet)
+        return line.split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        size = int(reader.readline()[1:-2])
+        args.append(reader.read(size + 2)[:-2])
+    return args
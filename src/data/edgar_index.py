@@ -0,0 +1,328 @@
+"""
+EDGAR Full-Index Ingestion
+
+EDGAR publishes one `master.idx` per quarter listing every filing (CIK,
+company, form type, date filed, path). Ingesting those files into a local,
+indexed SQLite table turns "which companies filed a new 10-K?" and "what is
+this company's latest 10-K?" into local queries instead of one
+data.sec.gov/submissions request per company:
+
+- Index files are parsed as a stream of lines and inserted in batches, so a
+  full quarter (hundreds of thousands of rows) never sits in memory
+- Re-ingesting a quarter is idempotent; the current quarter's index grows
+  daily, so re-run it on a schedule to pick up new filings
+- The primary document of a filing (not in master.idx) is resolved once per
+  accession and remembered in the table
+
+    python -m src.data.edgar_index 2023Q1 2023Q2 2023Q3 2023Q4 2024Q1
+    python -m src.data.edgar_index --file master.idx --quarter 2024Q1
+    python -m src.data.edgar_index --new-since 2024-02-01
+
+SECFetcher uses the index for 10-K lookups when one exists (EDGAR_INDEX_PATH,
+default .cache/edgar_index.db) and is fresh: the current quarter was ingested
+within EDGAR_INDEX_MAX_AGE_DAYS (default 7). A stale index (the scheduled
+re-ingest stopped) and companies the index does not cover fall back to the
+submissions API.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from src.data.filing_archive import normalize_accession
+from src.utils.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+DEFAULT_INDEX_PATH = os.getenv("EDGAR_INDEX_PATH", os.path.join(".cache", "edgar_index.db"))
+FULL_INDEX_URL = "https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx"
+FILING_DIRECTORY_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/index.json"
+FILING_DOCUMENT_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{name}"
+SEC_USER_AGENT = "SaaS EPV Analyzer (research contact: engineering@example.com)"
+
+# An index whose current quarter was last ingested longer ago than this is not trusted
+MAX_AGE_DAYS = float(os.getenv("EDGAR_INDEX_MAX_AGE_DAYS", 7))
+
+ANNUAL_REPORT_FORMS = ("10-K",)
+INSERT_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    cik INTEGER NOT NULL,
+    accession TEXT NOT NULL,
+    company_name TEXT,
+    form TEXT NOT NULL,
+    date_filed TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    primary_document TEXT,
+    PRIMARY KEY (cik, accession)
+);
+CREATE INDEX IF NOT EXISTS idx_filings_cik_form_date ON filings (cik, form, date_filed);
+CREATE INDEX IF NOT EXISTS idx_filings_form_date ON filings (form, date_filed);
+CREATE TABLE IF NOT EXISTS quarters (
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (year, quarter)
+);
+"""
+
+_ACCESSION_RE = re.compile(r"(\d{10}-?\d{2}-?\d{6})\.txt$")
+_NON_PRIMARY_RE = re.compile(r"(?:^|[_\-.])ex(?:hibit)?[-_]?\d|index|^R\d+\.htm", re.IGNORECASE)
+_QUARTER_RE = re.compile(r"^(\d{4})-?Q([1-4])$", re.IGNORECASE)
+
+
+def parse_master_index(lines):
+    """
+    Streams rows out of a master.idx file.
+
+    Args:
+        lines (iterable): Lines of the file, as bytes or str
+
+    Yields:
+        tuple: (cik, company_name, form, date_filed, filename, accession)
+    """
+    in_body = False
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("latin-1")
+        line = line.rstrip("\r\n")
+        if not in_body:
+            # Free-text header, then the column line, then a rule of dashes
+            in_body = line.startswith("-----")
+            continue
+        parts = line.split("|")
+        if len(parts) != 5 or not parts[0].isdigit():
+            continue
+        cik, company_name, form, date_filed, filename = parts
+        match = _ACCESSION_RE.search(filename)
+        if match is None:
+            continue
+        yield (int(cik), company_name.strip(), form.strip(), date_filed.strip(), filename.strip(),
+               normalize_accession(match.group(1)))
+
+
+def parse_quarter(value):
+    """
+    "2024Q1" / "2024-q1" -> (2024, 1)
+    """
+    match = _QUARTER_RE.match(value.strip())
+    if match is None:
+        raise ValueError(f"Expected a quarter like 2024Q1, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def primary_document(items):
+    """
+    Picks a filing's primary document from its directory listing
+    (Archives/edgar/data/{cik}/{accession}/index.json 'item' entries): the
+    largest HTML file that is not an exhibit, index page or XBRL viewer page.
+    """
+    candidates = [
+        item for item in items
+        if item.get("name", "").lower().endswith((".htm", ".html"))
+        and not _NON_PRIMARY_RE.search(item["name"])
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda item: int(item.get("size") or 0))["name"]
+
+
+class EdgarIndex:
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_INDEX_PATH
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # --- Ingestion ---
+    def ingest(self, lines, year=None, quarter=None, forms=None, batch_size=INSERT_BATCH_SIZE):
+        """
+        Loads one master.idx into the table.
+
+        Args:
+            lines (iterable): File lines (an open file, or streamed response lines)
+            year, quarter (int, optional): Quarter the file covers, recorded in `quarters`
+            forms (tuple, optional): Keep only these form types (default: all)
+            batch_size (int): Rows per executemany
+
+        Returns:
+            int: Rows read from the file (after the form filter)
+        """
+        wanted = set(forms) if forms else None
+        rows = 0
+        batch = []
+        try:
+            # Lock per batch, not per file, so lookups keep working during a long download
+            for cik, company_name, form, date_filed, filename, accession in parse_master_index(lines):
+                if wanted is not None and form not in wanted:
+                    continue
+                batch.append((cik, accession, company_name, form, date_filed, filename))
+                if len(batch) >= batch_size:
+                    self._insert(batch)
+                    rows += len(batch)
+                    batch = []
+            if batch:
+                self._insert(batch)
+                rows += len(batch)
+            with self._lock:
+                if year is not None and quarter is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO quarters (year, quarter, rows, ingested_at) VALUES (?, ?, ?, ?)",
+                        (year, quarter, rows, time.time())
+                    )
+                self._conn.commit()
+        except BaseException:
+            with self._lock:
+                self._conn.rollback()
+            raise
+        return rows
+
+    def ingest_file(self, path, year=None, quarter=None, forms=None):
+        with open(path, "rb") as fh:
+            return self.ingest(fh, year=year, quarter=quarter, forms=forms)
+
+    def ingest_quarter(self, year, quarter, forms=None, session=None):
+        """
+        Downloads and ingests EDGAR's master.idx for one quarter, streaming the
+        response straight into the table.
+        """
+        session = session or _sec_session()
+        url = FULL_INDEX_URL.format(year=year, quarter=quarter)
+        with session.get(url, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            return self.ingest(resp.iter_lines(), year=year, quarter=quarter, forms=forms)
+
+    def _insert(self, batch):
+        # Keeps a primary document already resolved for the accession
+        with self._lock:
+            self._conn.executemany(
+            "INSERT INTO filings (cik, accession, company_name, form, date_filed, filename) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (cik, accession) DO UPDATE SET company_name = excluded.company_name, "
+                "form = excluded.form, date_filed = excluded.date_filed, filename = excluded.filename",
+                batch
+            )
+
+    # --- Queries ---
+    def latest_filing(self, cik, forms=ANNUAL_REPORT_FORMS):
+        """
+        Returns the most recent filing of one of `forms` for a CIK as a dict,
+        or None if the index has none.
+        """
+        marks = ", ".join("?" * len(forms))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT cik, accession, company_name, form, date_filed, filename, primary_document "
+                f"FROM filings WHERE cik = ? AND form IN ({marks}) "
+                f"ORDER BY date_filed DESC, accession DESC LIMIT 1",
+                (int(cik), *forms)
+            )
+            row = cursor.fetchone()
+            columns = [col[0] for col in cursor.description]
+        return dict(zip(columns, row)) if row else None
+
+    def filings_since(self, since, forms=ANNUAL_REPORT_FORMS):
+        """
+        Companies with a filing of one of `forms` on or after `since`, newest
+        filing per company, most recent first. This is the "who filed a new
+        10-K?" universe discovery query.
+        """
+        since = since.isoformat() if isinstance(since, date) else str(since)
+        marks = ", ".join("?" * len(forms))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT cik, accession, company_name, form, MAX(date_filed) AS date_filed "
+                f"FROM filings WHERE form IN ({marks}) AND date_filed >= ? "
+                f"GROUP BY cik ORDER BY date_filed DESC, cik",
+                (*forms, since)
+            )
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def set_primary_document(self, cik, accession, name):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE filings SET primary_document = ? WHERE cik = ? AND accession = ?",
+                (name, int(cik), normalize_accession(accession))
+            )
+            self._conn.commit()
+
+    def quarters(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT year, quarter, rows, ingested_at FROM quarters ORDER BY year, quarter"
+            ).fetchall()
+
+    def is_fresh(self, max_age_days=MAX_AGE_DAYS, now=None):
+        """
+        True when the current calendar quarter has been ingested within the
+        last `max_age_days`, i.e. the index can answer "latest 10-K" without
+        missing recent filings.
+        """
+        now = time.time() if now is None else now
+        today = datetime.fromtimestamp(now, timezone.utc)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ingested_at FROM quarters WHERE year = ? AND quarter = ?",
+                (today.year, (today.month - 1) // 3 + 1)
+            ).fetchone()
+        return row is not None and now - row[0] <= max_age_days * 24 * 60 * 60
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM filings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _sec_session():
+    session = requests.Session()
+    session.headers.update({"User-Agent": SEC_USER_AGENT})
+    return session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest EDGAR quarterly master.idx files into a local index.")
+    parser.add_argument("quarters", nargs="*", help="Quarters to download and ingest, e.g. 2024Q1")
+    parser.add_argument("--index", default=None, help="Path to the index database")
+    parser.add_argument("--file", default=None, help="Ingest a local master.idx instead of downloading")
+    parser.add_argument("--quarter", default=None, help="Quarter the --file covers, e.g. 2024Q1")
+    parser.add_argument("--forms", default=None, help="Comma-separated form types to keep (default: all)")
+    parser.add_argument("--new-since", default=None, help="List companies with a 10-K filed on/after this date")
+    args = parser.parse_args(argv)
+
+    index = EdgarIndex(args.index)
+    forms = tuple(f.strip() for f in args.forms.split(",")) if args.forms else None
+    if args.file:
+        year, quarter = parse_quarter(args.quarter) if args.quarter else (None, None)
+        rows = index.ingest_file(args.file, year=year, quarter=quarter, forms=forms)
+        print(f"✓ Ingested {rows} filings from {args.file}")
+    for value in args.quarters:
+        year, quarter = parse_quarter(value)
+        rows = index.ingest_quarter(year, quarter, forms=forms)
+        print(f"✓ Ingested {rows} filings for {year}Q{quarter}")
+    if args.new_since:
+        for row in index.filings_since(args.new_since):
+            print(f"{row['date_filed']}  {row['cik']:>10}  {row['form']:<6} {row['company_name']}")
+    if not (args.file or args.quarters or args.new_since):
+        parser.error("Nothing to do: give quarters, --file or --new-since")
+
+
+if __name__ == "__main__":
+    main()
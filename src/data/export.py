@@ -0,0 +1,208 @@
+"""
+Results Export
+
+Gets analyses out of the results store as columnar files:
+
+- One flat row per ticker: identity, financial inputs, AI maintenance
+  estimates and every valuation output (see COLUMNS)
+- Parquet, Arrow IPC (.arrow / .feather) or CSV, written one record batch
+  (row group) at a time while records stream out of SQLite, so exports of the
+  whole universe never sit in memory
+- arrow_table() / read_arrow() hand an Arrow table to notebooks without
+  copying; `table.to_pandas()` or `polars.from_arrow(table)` from there
+
+    python -m src.data.export exports/epv.parquet SHOP DDOG SNOW
+
+    # notebooks/02_epv_scratchpad.ipynb
+    from src.data.export import arrow_table
+    df = arrow_table(["SHOP", "DDOG"]).to_pandas()
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+
+from src.data.results_store import ResultsStore
+from src.finance.financials import NUMERIC_FIELDS
+from src.finance.valuation_graph import SUMMARY_KEYS
+from src.utils.lazy import lazy_import
+
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pa_ipc = lazy_import("pyarrow.ipc")
+pq = lazy_import("pyarrow.parquet")
+
+DEFAULT_BATCH_SIZE = 1024
+
+FORMATS = ("parquet", "arrow", "csv")
+_SUFFIX_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow",
+                   ".ipc": "arrow", ".csv": "csv"}
+
+# (column, Arrow type name) in file order; valuation outputs follow
+_IDENTITY_COLUMNS = (
+    ("ticker", "string"),
+    ("company_name", "string"),
+    ("sector", "string"),
+    ("computed_at", "timestamp"),
+)
+_ESTIMATE_COLUMNS = (
+    ("maintenance_sga_percent", "float64"),
+    ("maintenance_rnd_percent", "float64"),
+    ("ai_source", "string"),
+    ("ai_reasoning", "string"),
+)
+_FLAG_COLUMNS = (
+    ("financials_source", "string"),
+    ("financials_is_mock", "bool"),
+    ("market_is_mock", "bool"),
+    ("mda_is_mock", "bool"),
+)
+COLUMNS = (
+    _IDENTITY_COLUMNS
+    + tuple((name, "float64") for name in NUMERIC_FIELDS)
+    + _ESTIMATE_COLUMNS
+    + tuple((name, "float64") for name in SUMMARY_KEYS)
+    + _FLAG_COLUMNS
+)
+
+
+def schema(include_mda=False):
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+    }
+    fields = [pa.field(name, types[kind]) for name, kind in COLUMNS]
+    if include_mda:
+        fields.append(pa.field("mda_text", pa.large_string()))
+    return pa.schema(fields)
+
+
+def flatten_record(record, include_mda=False):
+    """
+    Flattens one results-store record into an export row.
+    """
+    financials = record.get("financials") or {}
+    market_data = record.get("market_data") or {}
+    ai_estimates = record.get("ai_estimates") or {}
+    valuation = record.get("valuation") or {}
+    mda = record.get("mda") or {}
+    computed_at = record.get("computed_at")
+
+    row = {
+        "ticker": record.get("ticker"),
+        "company_name": market_data.get("company_name"),
+        "sector": market_data.get("sector"),
+        "computed_at": datetime.fromtimestamp(computed_at, tz=timezone.utc) if computed_at else None,
+        "maintenance_sga_percent": ai_estimates.get("maintenance_sga_percent"),
+        "maintenance_rnd_percent": ai_estimates.get("maintenance_rnd_percent"),
+        "ai_source": ai_estimates.get("source", "unknown"),
+        "ai_reasoning": ai_estimates.get("reasoning"),
+        "financials_source": financials.get("source"),
+        "financials_is_mock": financials.get("is_mock"),
+        "market_is_mock": market_data.get("is_mock"),
+        "mda_is_mock": mda.get("is_mock"),
+    }
+    for name in NUMERIC_FIELDS:
+        row[name] = financials.get(name)
+    for name in SUMMARY_KEYS:
+        row[name] = valuation.get(name)
+    if include_mda:
+        row["mda_text"] = mda.get("text")
+    return row
+
+
+def record_batches(records, batch_size=DEFAULT_BATCH_SIZE, include_mda=False):
+    """
+    Yields Arrow record batches of up to `batch_size` flattened records.
+    """
+    batch_schema = schema(include_mda)
+    rows = []
+    for record in records:
+        rows.append(flatten_record(record, include_mda))
+        if len(rows) >= batch_size:
+            yield pa.RecordBatch.from_pylist(rows, schema=batch_schema)
+            rows = []
+    if rows:
+        yield pa.RecordBatch.from_pylist(rows, schema=batch_schema)
+
+
+def arrow_table(tickers=None, store=None, include_mda=False):
+    """
+    Returns the stored analyses for `tickers` (default: all) as one Arrow table.
+    """
+    store = store or ResultsStore()
+    batches = record_batches(store.iter_records(tickers), include_mda=include_mda)
+    return pa.Table.from_batches(list(batches), schema=schema(include_mda))
+
+
+def write_export(path, tickers=None, store=None, format=None, batch_size=DEFAULT_BATCH_SIZE, include_mda=False):
+    """
+    Streams stored analyses to a Parquet, Arrow IPC or CSV file.
+
+    Args:
+        path (str): Output file
+        tickers (list[str], optional): Tickers to export (default: every stored ticker)
+        format (str, optional): One of FORMATS; inferred from the file suffix if omitted
+        batch_size (int): Rows per record batch / Parquet row group
+        include_mda (bool): Also export the full MD&A text
+
+    Returns:
+        int: Number of rows written
+    """
+    format = format or _SUFFIX_FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format for {path!r}; use one of {FORMATS}")
+
+    store = store or ResultsStore()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    file_schema = schema(include_mda)
+    if format == "parquet":
+        writer = pq.ParquetWriter(path, file_schema, compression="zstd")
+    elif format == "arrow":
+        writer = pa_ipc.new_file(path, file_schema)
+    else:
+        writer = pa_csv.CSVWriter(path, file_schema)
+
+    rows = 0
+    try:
+        for batch in record_batches(store.iter_records(tickers), batch_size, include_mda):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def read_arrow(path):
+    """
+    Memory-maps an Arrow IPC export; the returned table references the file
+    pages directly instead of copying them into memory.
+    """
+    # The mapping stays open for as long as the table's buffers reference it
+    return pa_ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored EPV analyses to Parquet, Arrow IPC or CSV.")
+    parser.add_argument("path", help="Output file (.parquet, .arrow/.feather or .csv)")
+    parser.add_argument("tickers", nargs="*", help="Tickers to export (default: all stored tickers)")
+    parser.add_argument("--store", default=None, help="Path to the results database")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Override the format implied by the suffix")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per row group")
+    parser.add_argument("--include-mda", action="store_true", help="Include the MD&A text column")
+    args = parser.parse_args(argv)
+
+    rows = write_export(
+        args.path, tickers=args.tickers or None, store=ResultsStore(args.store), format=args.format,
+        batch_size=args.batch_size, include_mda=args.include_mda,
+    )
+    print(f"✓ Exported {rows} analyses to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Local 10-K Filing Archive
+
+Raw 10-K HTML runs to several MB per filing and rarely changes once filed, so
+re-downloading it from EDGAR on every cache miss is wasted bandwidth and SEC
+rate-limit budget. FilingArchive keeps every downloaded filing on local disk:
+
+- Documents are compressed (zstd when the `zstandard` package is installed,
+  zlib otherwise) and appended to append-only pack files that roll over at
+  `max_pack_bytes`, so tens of thousands of filings fit on one disk
+- A SQLite index maps (CIK, accession) to a content digest, and each digest to
+  its (pack, offset, length), so identical documents are stored once
+- Reads memory-map the pack and decompress only the requested slice; the
+  whole pack is never loaded into memory
+
+Appends take an exclusive file lock, so several processes can share one archive.
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on the in-process lock only
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_DIR = os.path.join(".cache", "filings")
+DEFAULT_MAX_PACK_BYTES = 2 * 1024 ** 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    pack_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_length INTEGER NOT NULL,
+    codec TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filings (
+    cik INTEGER NOT NULL,
+    accession TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs (digest),
+    url TEXT,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (cik, accession)
+);
+"""
+
+
+def _compress(raw):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Filing was archived with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown filing codec {codec!r}")
+
+
+def normalize_accession(accession):
+    return accession.replace("-", "")
+
+
+class FilingArchive:
+    def __init__(self, directory=None, max_pack_bytes=DEFAULT_MAX_PACK_BYTES):
+        self.directory = directory or os.getenv("FILING_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+        self.max_pack_bytes = max_pack_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._maps = {}  # pack_id -> mmap of the pack as of the last read
+        self._conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # --- Public API ---
+    def get(self, cik, accession):
+        """
+        Returns the raw filing bytes, or None if the filing is not archived.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.pack_id, b.offset, b.length, b.codec FROM filings f "
+                "JOIN blobs b ON b.digest = f.digest WHERE f.cik = ? AND f.accession = ?",
+                (int(cik), normalize_accession(accession))
+            ).fetchone()
+            if row is None:
+                return None
+            pack_id, offset, length, codec = row
+            mapped = self._map(pack_id, offset + length)
+            compressed = mapped[offset:offset + length]
+        return _decompress(codec, compressed)
+
+    def put(self, cik, accession, raw, url=None):
+        """
+        Archives a filing. Identical documents (by SHA-256) share one stored blob.
+
+        Returns:
+            str: Content digest of the filing
+        """
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not exists:
+                codec, compressed = _compress(raw)
+                pack_id, offset = self._append(compressed)
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (digest, pack_id, offset, length, raw_length, codec) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, pack_id, offset, len(compressed), len(raw), codec)
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO filings (cik, accession, digest, url, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (int(cik), normalize_accession(accession), digest, url, time.time())
+            )
+            self._conn.commit()
+        return digest
+
+    def __contains__(self, key):
+        cik, accession = key
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM filings WHERE cik = ? AND accession = ?",
+                (int(cik), normalize_accession(accession))
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM filings").fetchone()[0]
+
+    def stats(self):
+        """
+        Returns counts and sizes: filings, unique blobs, raw vs stored bytes.
+        """
+        with self._lock:
+            filings = self._conn.execute("SELECT COUNT(*) FROM filings").fetchone()[0]
+            blobs, raw_bytes, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_length), 0), COALESCE(SUM(length), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "filings": filings,
+            "unique_documents": blobs,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._conn.close()
+
+    # --- Internal helpers ---
+    def _pack_path(self, pack_id):
+        return os.path.join(self.directory, f"pack-{pack_id:05d}.bin")
+
+    def _append(self, data):
+        # Caller holds self._lock; the file lock serializes other processes
+        pack_id = self._conn.execute("SELECT COALESCE(MAX(pack_id), 0) FROM blobs").fetchone()[0]
+        path = self._pack_path(pack_id)
+        if os.path.exists(path) and os.path.getsize(path) + len(data) > self.max_pack_bytes:
+            pack_id += 1
+            path = self._pack_path(pack_id)
+
+        with open(path, "ab") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0, os.SEEK_END)
+                offset = fh.tell()
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+        return pack_id, offset
+
+    def _map(self, pack_id, min_size):
+        # Caller holds self._lock; remap when the pack has grown past our mapping
+        mapped = self._maps.get(pack_id)
+        if mapped is None or len(mapped) < min_size:
+            if mapped is not None:
+                mapped.close()
+            with open(self._pack_path(pack_id), "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[pack_id] = mapped
+        return mapped
@@ -0,0 +1,141 @@
+"""
+10-K Filing Parser
+
+Extracts the MD&A (Item 7) section from raw 10-K HTML. The regex scan and tag
+stripping are pure CPU work that holds the GIL, so batch jobs that fetch many
+filings on threads would serialize on parsing. FilingParserPool moves parsing
+onto a process pool:
+
+- Raw filing bytes are written once into a memory-mapped spill file and each
+  worker reads only its (offset, length) slice, so multi-MB documents are never
+  pickled through the pool's pipes
+- Workers return only the extracted MD&A text
+
+Single documents (and max_workers=1) are parsed inline without a pool.
+"""
+
+import mmap
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+
+_MDA_START_RE = re.compile(r'item\s+7\.?\s*(management|[^<]{0,80}discussion)')
+_MDA_END_RE = re.compile(r'item\s+7a\.?|item\s+8\.?')
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# If the first Item 7A/8 is closer than this (e.g., table of contents), use a fixed window
+_MIN_SECTION_CHARS = 2000
+_FALLBACK_WINDOW_CHARS = 8000
+
+
+def extract_mda_section(html_text):
+    """
+    Extracts the MD&A (Item 7) section from the filing HTML by locating Item 7 and ending at Item 7A or 8.
+    """
+    lower = html_text.lower()
+
+    best_snippet = ""
+    for match in _MDA_START_RE.finditer(lower):
+        start_idx = match.start()
+        end_match = _MDA_END_RE.search(lower, start_idx)
+
+        if end_match and end_match.start() - start_idx > _MIN_SECTION_CHARS:
+            end_idx = end_match.start()
+        else:
+            end_idx = start_idx + _FALLBACK_WINDOW_CHARS
+
+        raw = html_text[start_idx:end_idx]
+        cleaned = _TAG_RE.sub(' ', raw)  # strip tags
+        cleaned = _WHITESPACE_RE.sub(' ', cleaned).strip()
+        cleaned = unescape(cleaned)
+
+        if len(cleaned) > len(best_snippet):
+            best_snippet = cleaned
+
+    return best_snippet or None
+
+
+def decode_filing(raw):
+    """
+    Decodes raw filing bytes; EDGAR documents are mostly UTF-8 with stray Latin-1.
+    """
+    return raw.decode("utf-8", errors="replace")
+
+
+def _extract_from_spill(path, offset, length):
+    # Runs in a worker process: map the spill file and decode only our slice
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        html_text = decode_filing(mapped[offset:offset + length])
+    return extract_mda_section(html_text)
+
+
+class FilingParserPool:
+    """
+    Process pool for MD&A extraction. Reuse one pool across batches to amortize
+    worker start-up:
+
+        with FilingParserPool(max_workers=8) as pool:
+            sections = pool.parse(raw_documents)
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+
+    def parse(self, documents):
+        """
+        Args:
+            documents (list[bytes]): Raw filing HTML documents
+
+        Returns:
+            list: Extracted MD&A text (or None) for each document, in input order
+        """
+        documents = list(documents)
+        if self.max_workers <= 1 or len(documents) <= 1:
+            return [extract_mda_section(decode_filing(doc)) for doc in documents]
+
+        executor = self._get_executor()
+        with tempfile.NamedTemporaryFile(prefix="filings-", suffix=".spill") as spill:
+            slices = []
+            for doc in documents:
+                slices.append((spill.tell(), len(doc)))
+                spill.write(doc)
+            spill.flush()
+
+            futures = [
+                executor.submit(_extract_from_spill, spill.name, offset, length)
+                for offset, length in slices
+            ]
+            return [future.result() for future in futures]
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: never fork a process that may be running Streamlit/fetch threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_filings(documents, max_workers=None):
+    """
+    One-shot helper: parses a batch of raw filings on a temporary process pool.
+    """
+    with FilingParserPool(max_workers=max_workers) as pool:
+        return pool.parse(documents)
@@ -2,90 +2,131 @@
 Market Data Retrieval Module
 
 Fetches real-time market data (prices, market cap, company names) from multiple sources.
-Prioritizes Financial Modeling Prep API if available, falls back to yfinance, and 
-finally uses mock data if both fail.
+Prioritizes Financial Modeling Prep API if available, hedges to yfinance when FMP is
+slow or failing (see source_router), and finally uses mock data if both fail.
 
 This module ensures the application always has market data for valuation comparisons,
 even when external APIs are temporarily unavailable.
 """
 
 import os
-import time
-import requests
-import yfinance as yf
-import pandas as pd
+
+from src.cache.backends import get_cache
+from src.data.negative_cache import NEGATIVE_CACHE, PROVIDER_NO_DATA
+from src.data.source_router import ProviderNoData, ProvidersExhausted, SourceRouter
+from src.utils.lazy import lazy_import
+from src.utils.retry import RetryPolicy
+from src.utils.singleflight import SingleFlight
+
+requests = lazy_import("requests")
+yf = lazy_import("yfinance")
+
+
+# Shared so provider health (latency, errors, circuit state) persists across calls
+MARKET_ROUTER = SourceRouter("market_data")
+# Concurrent snapshot requests for the same ticker share one quote fetch
+QUOTE_FLIGHTS = SingleFlight()
+# Quotes go stale quickly; replicas share them for a few minutes at most
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", 300))
+# Transient yfinance failures are retried with backoff; unknown tickers fail on the first attempt
+YFINANCE_RETRY = RetryPolicy(
+    name="yfinance quote", max_attempts=3, base_delay=1.0,
+    deadline=float(os.getenv("FETCH_RETRY_DEADLINE", 20)),
+)
 
 
 def get_market_snapshot(ticker):
     """
-    Fetches current market data for a given ticker using yfinance.
-    Falls back to mock data if yfinance fails or ticker is invalid.
+    Fetches current market data for a given ticker.
+    Routes FMP (if keyed) → yfinance through the shared SourceRouter and falls
+    back to mock data if every provider fails or the ticker is invalid.
     
     Args:
         ticker (str): Stock ticker symbol
         
     Returns:
-        dict: Contains 'price', 'market_cap', 'company_name'
+        dict: Contains 'price', 'market_cap', 'company_name', 'sector'
     """
-    api_key = os.getenv("FMP_API_KEY")
-    last_error = None
+    return QUOTE_FLIGHTS.do(ticker, lambda: get_cache().get_or_set(
+        f"quote:{ticker}", lambda: _load_market_snapshot(ticker), QUOTE_CACHE_TTL,
+        cacheable=lambda snapshot: not snapshot.get("is_mock"),
+    ))
+
+
+def _load_market_snapshot(ticker):
+    # A ticker no provider knew a moment ago is answered without any network call
+    if NEGATIVE_CACHE.check(PROVIDER_NO_DATA, f"quote:{ticker}") is None:
+        providers = []
+        api_key = os.getenv("FMP_API_KEY")
+        if api_key:
+            providers.append(("fmp", lambda: _fetch_fmp_quote(ticker, api_key)))
+        providers.append(("yfinance", lambda: _fetch_yfinance_quote(ticker)))
 
-    # Try FMP first if API key is present
-    if api_key:
-        try:
-            url = f"https://financialmodelingprep.com/api/v3/quote/{ticker}?apikey={api_key}"
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            if data:
-                q = data[0]
-                price = q.get("price")
-                market_cap = q.get("marketCap")
-                name = q.get("name") or ticker
-                if price is not None and market_cap is not None:
-                    return {
-                        "price": price,
-                        "market_cap": market_cap,
-                        "company_name": name,
-                        "is_mock": False,
-                        "source": "fmp"
-                    }
-        except Exception as e:
-            last_error = e
-            # fall through to yfinance
-
-    for attempt in range(3):
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # yfinance info dictionary usually contains these keys
-            price = info.get('currentPrice') or info.get('regularMarketPrice')
-            market_cap = info.get('marketCap')
-            name = info.get('longName') or info.get('shortName') or ticker
-            
-            if price is None or market_cap is None:
-                 raise ValueError("Missing price or market cap data")
-             
-            return {
-                "price": price,
-                "market_cap": market_cap,
-                "company_name": name,
-                "is_mock": False,
-                "source": "yfinance"
-            }
-            
-        except Exception as e:
-            last_error = e
-            if attempt < 2:
-                time.sleep(1 * (attempt + 1))
-                continue
-    
-    print(f"⚠️ Market Data Error for {ticker}: {last_error}. Using mock fallback.")
+            snapshot, _ = MARKET_ROUTER.call(providers)
+            return snapshot
+        except ProvidersExhausted as e:
+            print(f"⚠️ Market Data Error for {ticker}: {e}. Using mock fallback.")
+            if e.no_data:
+                NEGATIVE_CACHE.record(PROVIDER_NO_DATA, f"quote:{ticker}", str(e))
+
     return {
         "price": 75.50,
         "market_cap": 98_000_000_000, # $98B
         "company_name": f"{ticker} (Mock)",
+        "sector": None,
         "is_mock": True,
         "source": "mock"
     }
+
+
+def _fetch_fmp_quote(ticker, api_key):
+    url = f"https://financialmodelingprep.com/api/v3/quote/{ticker}?apikey={api_key}"
+    resp = requests.get(url, timeout=10)
+    resp.raise_for_status()
+    data = resp.json()
+    if not data:
+        raise ProviderNoData("Empty quote from FMP")
+
+    q = data[0]
+    price = q.get("price")
+    market_cap = q.get("marketCap")
+    name = q.get("name") or ticker
+    if price is None or market_cap is None:
+        raise ProviderNoData("Missing price or market cap data from FMP")
+
+    return {
+        "price": price,
+        "market_cap": market_cap,
+        "company_name": name,
+        "sector": q.get("sector"),
+        "is_mock": False,
+        "source": "fmp"
+    }
+
+
+def _fetch_yfinance_quote(ticker):
+    return YFINANCE_RETRY.call(_load_yfinance_quote, ticker)
+
+
+def _load_yfinance_quote(ticker):
+    stock = yf.Ticker(ticker)
+    info = stock.info
+
+    # yfinance info dictionary usually contains these keys
+    price = info.get('currentPrice') or info.get('regularMarketPrice')
+    market_cap = info.get('marketCap')
+    name = info.get('longName') or info.get('shortName') or ticker
+
+    if price is None or market_cap is None:
+        # Unknown tickers come back as an almost empty info dict
+        raise ProviderNoData(f"yfinance has no price or market cap for {ticker}")
+
+    return {
+        "price": price,
+        "market_cap": market_cap,
+        "company_name": name,
+        "sector": info.get('sector'),
+        "is_mock": False,
+        "source": "yfinance"
+    }
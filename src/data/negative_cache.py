@@ -0,0 +1,181 @@
+"""
+Negative Cache
+
+Remembers lookups that came back empty so a bad ticker doesn't pay for the
+full provider chain (FMP, yfinance, SEC ticker map, submissions API) on every
+request. Each outcome kind has its own short TTL:
+
+- ticker_unknown     Not in the SEC ticker map (no CIK)            1 hour
+- no_10k             CIK known, but no 10-K filed (40-F/20-F filers)  6 hours
+- provider_no_data   Every financials/quote provider had no data   15 minutes
+
+Override with NEGATIVE_CACHE_TTLS='{"provider_no_data": 60}'.
+
+Entries live in a process-local LRU dict (at most NEGATIVE_CACHE_MAX_ENTRIES;
+expired entries are swept on every record), so a repeat lookup costs a dict
+probe, and are written through to the shared cache backend (src.cache.backends)
+so other replicas learn about the bad ticker too. A subject the backend has no
+entry for is remembered locally for NEGATIVE_CACHE_MISS_TTL seconds, so lookups
+of good tickers don't round-trip to the backend every time; another replica's
+record can take that long to be seen here.
+
+    if NEGATIVE_CACHE.check(PROVIDER_NO_DATA, f"quote:{ticker}"):
+        return mock_quote
+    ...
+    NEGATIVE_CACHE.record(PROVIDER_NO_DATA, f"quote:{ticker}", str(error))
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.cache.backends import get_cache
+
+TICKER_UNKNOWN = "ticker_unknown"
+NO_10K = "no_10k"
+PROVIDER_NO_DATA = "provider_no_data"
+
+DEFAULT_TTLS = {
+    TICKER_UNKNOWN: 60 * 60,
+    NO_10K: 6 * 60 * 60,
+    PROVIDER_NO_DATA: 15 * 60,
+}
+
+# Process-local entries kept (least recently used dropped first)
+MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", 10_000))
+# How long a subject the shared backend had no entry for skips the backend
+MISS_TTL = float(os.getenv("NEGATIVE_CACHE_MISS_TTL", 5))
+
+
+def negative_ttls():
+    """
+    DEFAULT_TTLS merged with the NEGATIVE_CACHE_TTLS environment override.
+    """
+    ttls = dict(DEFAULT_TTLS)
+    override = os.getenv("NEGATIVE_CACHE_TTLS")
+    if override:
+        try:
+            ttls.update({kind: float(ttl) for kind, ttl in json.loads(override).items()})
+        except (ValueError, AttributeError, TypeError) as e:
+            print(f"⚠️ Ignoring invalid NEGATIVE_CACHE_TTLS: {e}")
+    return ttls
+
+
+class NegativeCache:
+    """
+    Attributes:
+        hits (int): Lookups answered from the negative cache
+        records (int): Outcomes recorded
+    """
+
+    def __init__(self, ttls=None, shared=True, clock=time.time, max_entries=MAX_ENTRIES, miss_ttl=MISS_TTL):
+        self.ttls = ttls if ttls is not None else negative_ttls()
+        self.shared = shared
+        self.max_entries = max_entries
+        self.miss_ttl = miss_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (kind, subject) -> (expires_at, reason), least recently used first
+        self._misses = OrderedDict()  # (kind, subject) -> time until which the shared backend isn't asked again
+        self.hits = 0
+        self.records = 0
+
+    def check(self, kind, subject):
+        """
+        Returns the recorded reason if `subject` is known to have no data for
+        `kind`, else None.
+        """
+        entry_key = (kind, _normalize(subject))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[entry_key]
+                entry = None
+            elif entry is not None:
+                self._entries.move_to_end(entry_key)
+            ask_shared = entry is None and self.shared and self._misses.get(entry_key, 0) <= now
+        if ask_shared:
+            value = get_cache().get(_shared_key(*entry_key))
+            with self._lock:
+                if value is not None and value["expires_at"] > now:
+                    entry = (value["expires_at"], value["reason"])
+                    self._remember(entry_key, entry)
+                else:
+                    self._misses.pop(entry_key, None)
+                    self._misses[entry_key] = now + self.miss_ttl
+                    _trim(self._misses, self.max_entries)
+        if entry is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry[1] or kind
+
+    def record(self, kind, subject, reason="", ttl=None):
+        """
+        Remembers that `subject` has no data for `kind` for `ttl` seconds
+        (default: the kind's TTL).
+        """
+        ttl = self.ttls[kind] if ttl is None else ttl
+        entry_key = (kind, _normalize(subject))
+        now = self._clock()
+        expires_at = now + ttl
+        with self._lock:
+            self._sweep(now)
+            self._remember(entry_key, (expires_at, reason))
+            self.records += 1
+        if self.shared:
+            get_cache().set(_shared_key(*entry_key), {"expires_at": expires_at, "reason": reason}, ttl)
+
+    def forget(self, kind, subject):
+        entry_key = (kind, _normalize(subject))
+        with self._lock:
+            self._entries.pop(entry_key, None)
+            self._misses.pop(entry_key, None)
+        if self.shared:
+            get_cache().delete(_shared_key(*entry_key))
+
+    def clear(self):
+        """
+        Drops the process-local entries (shared entries expire on their own).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._misses.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "records": self.records}
+
+    # --- Internal helpers (callers hold self._lock) ---
+    def _remember(self, entry_key, entry):
+        self._entries.pop(entry_key, None)
+        self._entries[entry_key] = entry
+        self._misses.pop(entry_key, None)
+        _trim(self._entries, self.max_entries)
+
+    def _sweep(self, now):
+        for entry_key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[entry_key]
+        for entry_key in [key for key, until in self._misses.items() if until <= now]:
+            del self._misses[entry_key]
+
+
+# --- Internal helpers ---
+def _trim(entries, max_entries):
+    while len(entries) > max_entries:
+        entries.popitem(last=False)
+
+
+def _normalize(subject):
+    return str(subject).strip().upper()
+
+
+def _shared_key(kind, subject):
+    return f"negative:{kind}:{subject}"
+
+
+# Process-wide instance used by SECFetcher and market_data
+NEGATIVE_CACHE = NegativeCache()
@@ -0,0 +1,322 @@
+"""
+Precomputed Results Store
+
+Persists the latest computed analysis for each ticker (financials, MD&A source,
+market snapshot, AI estimates and the EPV valuation summary) in a local SQLite
+database so the Streamlit UI can serve a ticker with a single primary-key read
+instead of re-fetching SEC/market data and re-running the LLM per session.
+
+Headline metrics are also stored as plain, indexed columns so screens over the
+whole universe (see query_universe / sector_summary) sort, filter, paginate and
+aggregate inside SQLite and only the requested page leaves the database.
+
+Each stored analysis also files its fiscal year's income statement lines in a
+history table that outlives the record, so later fiscal years accumulate into
+the multi-year series MetricsEngine scores (see history).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "results.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ticker TEXT PRIMARY KEY,
+    computed_at REAL NOT NULL,
+    company_name TEXT,
+    epv_discount_pct REAL,
+    rule_of_40_adj REAL,
+    franchise_value_pct REAL,
+    payload TEXT NOT NULL
+)
+"""
+
+_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    ticker TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    revenue REAL,
+    ebit REAL,
+    sga REAL,
+    rnd REAL,
+    tax_rate REAL,
+    PRIMARY KEY (ticker, period)
+)
+"""
+
+# Income statement lines kept per fiscal year (MetricsEngine INPUT_FIELDS)
+HISTORY_FIELDS = ("revenue", "ebit", "sga", "rnd", "tax_rate")
+
+# Headline columns added after the initial schema (migrated in place on open)
+_EXTRA_COLUMNS = {
+    "sector": "TEXT",
+    "market_cap": "REAL",
+    "equity_epv": "REAL",
+    "is_mock": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Columns the universe screen may sort on; anything else is rejected
+SORTABLE_COLUMNS = (
+    "ticker", "company_name", "sector", "market_cap", "equity_epv",
+    "epv_discount_pct", "rule_of_40_adj", "franchise_value_pct",
+)
+
+_INDEXED_COLUMNS = ("sector", "epv_discount_pct", "rule_of_40_adj", "franchise_value_pct")
+
+_UNIVERSE_COLUMNS = ", ".join(SORTABLE_COLUMNS) + ", computed_at"
+
+# Flags rows written before the is_mock column existed
+_BACKFILL_MOCK = (
+    "UPDATE results SET is_mock = 1 WHERE json_extract(payload, '$.financials.is_mock') "
+    "OR json_extract(payload, '$.mda.is_mock') OR json_extract(payload, '$.market_data.is_mock')"
+)
+
+
+def _json_default(value):
+    # Financials records serialize as their legacy dict shape
+    if isinstance(value, Mapping):
+        return dict(value)
+    # numpy/pandas scalars sneak in from yfinance frames
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def is_mock_record(record):
+    """
+    True when any part of an analysis record (financials, MD&A, market data)
+    is a mock fallback rather than provider data.
+    """
+    return any((record.get(part) or {}).get("is_mock") for part in ("financials", "mda", "market_data"))
+
+
+class ResultsStore:
+    def __init__(self, path=None):
+        self.path = path or os.getenv("RESULTS_STORE_PATH", DEFAULT_STORE_PATH)
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_HISTORY_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        for column, column_type in _EXTRA_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE results ADD COLUMN {column} {column_type}")
+        if "is_mock" not in existing:
+            self._conn.execute(_BACKFILL_MOCK)
+        for column in _INDEXED_COLUMNS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_results_{column} ON results ({column})")
+        self._conn.commit()
+
+    def get(self, ticker, max_age=None):
+        """
+        Returns the stored analysis record for a ticker, or None on a miss.
+
+        Args:
+            ticker (str): Stock ticker symbol
+            max_age (float, optional): Treat records older than this many seconds as missing
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT computed_at, payload FROM results WHERE ticker = ?",
+                (ticker.upper(),)
+            ).fetchone()
+        if row is None:
+            return None
+
+        computed_at, payload = row
+        if max_age is not None and time.time() - computed_at > max_age:
+            return None
+        return json.loads(payload)
+
+    def put(self, record):
+        """
+        Inserts or replaces the analysis record for record['ticker'], and
+        files its financials under their fiscal year in the history table
+        (records without a fiscal year, or built on mock data, add no history).
+        """
+        ticker = record["ticker"].upper()
+        record = dict(record, ticker=ticker)
+        record.setdefault("computed_at", time.time())
+        valuation = record.get("valuation") or {}
+        market_data = record.get("market_data") or {}
+        financials = record.get("financials") or {}
+        is_mock = is_mock_record(record)
+
+        payload = json.dumps(record, default=_json_default)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(ticker, computed_at, company_name, sector, market_cap, equity_epv, "
+                "epv_discount_pct, rule_of_40_adj, franchise_value_pct, is_mock, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ticker,
+                    record["computed_at"],
+                    market_data.get("company_name"),
+                    market_data.get("sector") or "Unknown",
+                    market_data.get("market_cap"),
+                    valuation.get("equity_epv"),
+                    valuation.get("epv_discount_pct"),
+                    valuation.get("rule_of_40_adj"),
+                    valuation.get("franchise_value_pct"),
+                    int(is_mock),
+                    payload,
+                )
+            )
+            if financials.get("fiscal_year") and not is_mock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO history (ticker, period, {', '.join(HISTORY_FIELDS)}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(HISTORY_FIELDS))})",
+                    (ticker, int(financials["fiscal_year"]), *(financials.get(name) for name in HISTORY_FIELDS))
+                )
+            self._conn.commit()
+        return record
+
+    def delete(self, ticker):
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE ticker = ?", (ticker.upper(),))
+            self._conn.commit()
+
+    def tickers(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT ticker FROM results ORDER BY ticker").fetchall()
+        return [row[0] for row in rows]
+
+    def iter_records(self, tickers=None, page_size=500):
+        """
+        Streams stored analysis records in ticker order, one page of rows per
+        query, so exports over the whole universe never hold it all in memory.
+
+        Args:
+            tickers (list[str], optional): Restrict to these tickers (default: all)
+            page_size (int): Rows fetched per query
+        """
+        wanted = sorted({t.upper() for t in tickers}) if tickers is not None else None
+        last = ""
+        while True:
+            if wanted is None:
+                query = "SELECT ticker, payload FROM results WHERE ticker > ? ORDER BY ticker LIMIT ?"
+                params = (last, page_size)
+            else:
+                chunk = [t for t in wanted if t > last][:page_size]
+                if not chunk:
+                    return
+                query = (f"SELECT ticker, payload FROM results WHERE ticker IN ({', '.join('?' * len(chunk))}) "
+                         "ORDER BY ticker")
+                params = chunk
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            for _, payload in rows:
+                yield json.loads(payload)
+            if wanted is None:
+                if len(rows) < page_size:
+                    return
+                last = rows[-1][0]
+            else:
+                last = chunk[-1]
+
+    def history(self, tickers=None):
+        """
+        Stored fiscal-year rows, in the shape MetricsEngine.extend takes.
+
+        Args:
+            tickers (list[str], optional): Restrict to these tickers (default: all)
+
+        Returns:
+            list[dict]: 'ticker', 'period' (fiscal year) and HISTORY_FIELDS, by ticker then period
+        """
+        columns = ("ticker", "period") + HISTORY_FIELDS
+        query, params = f"SELECT {', '.join(columns)} FROM history", []
+        if tickers is not None:
+            params = sorted({t.upper() for t in tickers})
+            query += f" WHERE ticker IN ({', '.join('?' * len(params))})"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY ticker, period", params).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def query_universe(self, sort_by="epv_discount_pct", descending=True, sector=None,
+                       search=None, min_rule_of_40=None, page=1, page_size=50, include_mock=False):
+        """
+        Server-side sorted, filtered and paginated view of the stored universe.
+
+        Args:
+            sort_by (str): One of SORTABLE_COLUMNS
+            descending (bool): Sort direction (NULLs always sort last)
+            sector (str, optional): Exact sector filter
+            search (str, optional): Case-insensitive ticker/company substring filter
+            min_rule_of_40 (float, optional): Minimum adjusted Rule of 40
+            page (int): 1-based page number
+            page_size (int): Rows per page
+            include_mock (bool): Also list records built on mock fallback data
+
+        Returns:
+            tuple: (list of row dicts for the requested page, total matching row count)
+        """
+        if sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+
+        clauses, params = ([] if include_mock else ["NOT is_mock"]), []
+        if sector:
+            clauses.append("sector = ?")
+            params.append(sector)
+        if search:
+            clauses.append("(ticker LIKE ? OR company_name LIKE ?)")
+            params.extend([f"%{search.strip()}%"] * 2)
+        if min_rule_of_40 is not None:
+            clauses.append("rule_of_40_adj >= ?")
+            params.append(min_rule_of_40)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        direction = "DESC" if descending else "ASC"
+        page = max(int(page), 1)
+        offset = (page - 1) * page_size
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()[0]
+            cursor = self._conn.execute(
+                f"SELECT {_UNIVERSE_COLUMNS} FROM results {where} "
+                f"ORDER BY {sort_by} IS NULL, {sort_by} {direction}, ticker "
+                f"LIMIT ? OFFSET ?",
+                params + [page_size, offset]
+            )
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return rows, total
+
+    def sector_summary(self):
+        """
+        Per-sector aggregates over the whole universe in a single GROUP BY
+        (records built on mock fallback data are left out).
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT sector, COUNT(*) AS companies, SUM(market_cap) AS total_market_cap, "
+                "AVG(epv_discount_pct) AS avg_epv_discount_pct, "
+                "AVG(rule_of_40_adj) AS avg_rule_of_40_adj, "
+                "AVG(franchise_value_pct) AS avg_franchise_value_pct, "
+                "SUM(CASE WHEN epv_discount_pct > 0 THEN 1 ELSE 0 END) AS undervalued "
+                "FROM results WHERE NOT is_mock GROUP BY sector ORDER BY companies DESC, sector"
+            )
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def sectors(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT sector FROM results WHERE NOT is_mock ORDER BY sector").fetchall()
+        return [row[0] for row in rows if row[0]]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
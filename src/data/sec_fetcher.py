@@ -13,17 +13,48 @@ The fetcher gracefully handles API failures and provides mock data when live
 data is unavailable, ensuring the application always has data to analyze.
 """
 
+import math
 import os
-import re
-import time
-import requests
-import pandas as pd
-import yfinance as yf
-from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache.backends import get_cache
+from src.data.edgar_index import (
+    DEFAULT_INDEX_PATH, FILING_DIRECTORY_URL, FILING_DOCUMENT_URL, EdgarIndex, primary_document,
+)
+from src.data.filing_archive import FilingArchive
+from src.data.filing_parser import FilingParserPool, decode_filing, extract_mda_section
+from src.data.negative_cache import NEGATIVE_CACHE, NO_10K, PROVIDER_NO_DATA, TICKER_UNKNOWN
+from src.data.source_router import ProviderNoData, ProvidersExhausted, SourceRouter
+from src.finance.financials import Financials
+from src.utils.lazy import lazy_import
+from src.utils.retry import RetryPolicy
+from src.utils.singleflight import SingleFlight
+
+# Loaded on first use: the SEC/FMP paths never touch yfinance
+requests = lazy_import("requests")
+yf = lazy_import("yfinance")
+
+# Shared across fetcher instances so provider health persists between requests
+FINANCIALS_ROUTER = SourceRouter("financials")
+# Concurrent requests for the same ticker (any fetcher instance) share one fetch
+FETCH_FLIGHTS = SingleFlight()
+# Transient yfinance failures are retried with backoff; unknown tickers fail on the first attempt
+YFINANCE_RETRY = RetryPolicy(
+    name="yfinance financials", max_attempts=3, base_delay=1.0,
+    deadline=float(os.getenv("FETCH_RETRY_DEADLINE", 20)),
+)
+
+# Shared-cache lifetimes (see src.cache.backends); mock fallbacks are never cached
+FINANCIALS_CACHE_TTL = 24 * 60 * 60
+MDA_CACHE_TTL = 7 * 24 * 60 * 60
+
 
 class SECFetcher:
-    def __init__(self):
+    def __init__(self, archive=None, edgar_index=None):
         self._ticker_map_cache = None
+        self._archive = archive  # opened on first filing fetch if not given
+        # Local EDGAR full-index; opened on first 10-K lookup if one has been ingested
+        self._edgar_index = edgar_index
         self._session = requests.Session()
         self._session.headers.update({
             "User-Agent": "SaaS EPV Analyzer (research contact: engineering@example.com)"
@@ -32,137 +63,166 @@ class SECFetcher:
     def get_financials(self, ticker):
         """
         Fetches financial data for the given ticker.
+
+        Returns:
+            Financials: Record (also usable as the legacy dict via its Mapping interface)
         """
-        fallback = {
-            "ticker": ticker,
-            "revenue": 7_000_000_000,
-            "cogs": 2_000_000_000,
-            "prev_revenue": 5_600_000_000, # 25% Growth
-            "ebit": -1_200_000_000,
-            "sga": 2_500_000_000,
-            "rnd": 1_800_000_000,
-            "tax_rate": 0.21,
-            "shares_outstanding": 1_300_000_000,
-            "cash": 5_000_000_000,
-            "debt": 2_000_000_000,
-            "accounts_receivable": 600_000_000,
-            "pp_and_e": 300_000_000,
-            "other_assets": 200_000_000,
-            "total_current_liabilities": 1_500_000_000,
-            "book_value_equity": 6_000_000_000,
-            "is_mock": True,
-            "source": "mock"
-        }
+        return FETCH_FLIGHTS.do(("financials", ticker), self._shared_financials, ticker)
+
+    def _shared_financials(self, ticker):
+        cached = get_cache().get(f"financials:{ticker}")
+        if cached is not None:
+            return Financials.from_dict(cached)
+        financials = self._load_financials(ticker)
+        if not financials.is_mock:
+            get_cache().set(f"financials:{ticker}", financials.to_dict(), FINANCIALS_CACHE_TTL)
+        return financials
+
+    def _load_financials(self, ticker):
+        fallback = Financials(
+            ticker=ticker,
+            revenue=7_000_000_000,
+            cogs=2_000_000_000,
+            prev_revenue=5_600_000_000, # 25% Growth
+            ebit=-1_200_000_000,
+            sga=2_500_000_000,
+            rnd=1_800_000_000,
+            tax_rate=0.21,
+            shares_outstanding=1_300_000_000,
+            cash=5_000_000_000,
+            debt=2_000_000_000,
+            accounts_receivable=600_000_000,
+            pp_and_e=300_000_000,
+            other_assets=200_000_000,
+            total_current_liabilities=1_500_000_000,
+            book_value_equity=6_000_000_000,
+            is_mock=True,
+            source="mock"
+        )
+
+        if NEGATIVE_CACHE.check(PROVIDER_NO_DATA, f"financials:{ticker}") is not None:
+            return fallback
+
+        # FMP (if keyed) → yfinance, hedged and circuit-broken by the shared router
+        providers = []
+        fmp_key = os.getenv("FMP_API_KEY")
+        if fmp_key:
+            providers.append(("fmp", lambda: self._fetch_fmp_financials(ticker, fmp_key)))
+        providers.append(("yfinance", lambda: self._fetch_yfinance_financials(ticker, fallback)))
 
+        try:
+            financials, _ = FINANCIALS_ROUTER.call(providers)
+            return financials
+        except ProvidersExhausted as e:
+            print(f"⚠️ SEC/YFinance fetch failed for {ticker}: {e}. Using mock fallback.")
+            if e.no_data:
+                NEGATIVE_CACHE.record(PROVIDER_NO_DATA, f"financials:{ticker}", str(e))
+            return fallback
+
+    def _fetch_yfinance_financials(self, ticker, fallback):
+        """
+        Fetch financials from yfinance; balance sheet gaps are filled from `fallback`.
+        """
+        return YFINANCE_RETRY.call(self._load_yfinance_financials, ticker, fallback)
+
+    def _load_yfinance_financials(self, ticker, fallback):
+        # One yfinance attempt; YFINANCE_RETRY decides whether to try again
         def _safe_get(series, key):
             if series is None:
                 return None
             val = series.get(key)
-            if val is None or (isinstance(val, float) and pd.isna(val)):
+            if val is None or (isinstance(val, float) and math.isnan(val)):
                 return None
             try:
                 return float(val)
             except Exception:
                 return None
 
-        # Try FMP first if API key is available
-        fmp_key = os.getenv("FMP_API_KEY")
-        if fmp_key:
-            try:
-                fmp_data = self._fetch_fmp_financials(ticker, fmp_key)
-                if fmp_data:
-                    return fmp_data
-            except Exception as e:
-                last_error = e
-                print(f"⚠️ FMP financials failed for {ticker}: {e}. Falling back to yfinance/mock.")
+        stock = yf.Ticker(ticker)
+        income_stmt = getattr(stock, "income_stmt", None)
+        if income_stmt is None or income_stmt.empty:
+            income_stmt = getattr(stock, "financials", None)
+        balance_sheet = getattr(stock, "balance_sheet", None)
+
+        latest_income = income_stmt.iloc[:, 0] if income_stmt is not None and not income_stmt.empty else None
+        prev_income = income_stmt.iloc[:, 1] if income_stmt is not None and income_stmt.shape[1] > 1 else None
+        latest_balance = balance_sheet.iloc[:, 0] if balance_sheet is not None and not balance_sheet.empty else None
+        if latest_income is None:
+            # Unknown or delisted ticker: yfinance answers with empty frames
+            raise ProviderNoData(f"yfinance has no income statement for {ticker}")
+
+        revenue = _safe_get(latest_income, "Total Revenue") or _safe_get(latest_income, "Operating Revenue")
+        cogs = _safe_get(latest_income, "Cost Of Revenue") or 0
+        sga = _safe_get(latest_income, "Selling General Administrative") or 0
+        rnd = _safe_get(latest_income, "Research Development") or 0
+        ebit = _safe_get(latest_income, "Operating Income") or _safe_get(latest_income, "EBIT")
+
+        prev_revenue = _safe_get(prev_income, "Total Revenue") or _safe_get(prev_income, "Operating Revenue")
+        if prev_revenue is None and revenue:
+            prev_revenue = revenue * 0.8  # assume 20% y/y growth when prior period is missing
+        # Statement columns are labelled with the fiscal period end date
+        fiscal_year = getattr(latest_income.name, "year", 0)
+
+        tax_provision = _safe_get(latest_income, "Tax Provision")
+        pretax_income = _safe_get(latest_income, "Pretax Income") or _safe_get(latest_income, "Income Before Tax")
+        if pretax_income not in (None, 0) and tax_provision is not None:
+            tax_rate = max(min(tax_provision / pretax_income, 0.35), 0)
         else:
-            last_error = None
+            tax_rate = 0.21
 
-        # Fallback to yfinance
-        for attempt in range(3):
-            try:
-                stock = yf.Ticker(ticker)
-                income_stmt = getattr(stock, "income_stmt", None)
-                if income_stmt is None or income_stmt.empty:
-                    income_stmt = getattr(stock, "financials", None)
-                balance_sheet = getattr(stock, "balance_sheet", None)
-
-                latest_income = income_stmt.iloc[:, 0] if income_stmt is not None and not income_stmt.empty else None
-                prev_income = income_stmt.iloc[:, 1] if income_stmt is not None and income_stmt.shape[1] > 1 else None
-                latest_balance = balance_sheet.iloc[:, 0] if balance_sheet is not None and not balance_sheet.empty else None
-
-                revenue = _safe_get(latest_income, "Total Revenue") or _safe_get(latest_income, "Operating Revenue")
-                cogs = _safe_get(latest_income, "Cost Of Revenue") or 0
-                sga = _safe_get(latest_income, "Selling General Administrative") or 0
-                rnd = _safe_get(latest_income, "Research Development") or 0
-                ebit = _safe_get(latest_income, "Operating Income") or _safe_get(latest_income, "EBIT")
-
-                prev_revenue = _safe_get(prev_income, "Total Revenue") or _safe_get(prev_income, "Operating Revenue")
-                if prev_revenue is None and revenue:
-                    prev_revenue = revenue * 0.8  # assume 20% y/y growth when prior period is missing
-
-                tax_provision = _safe_get(latest_income, "Tax Provision")
-                pretax_income = _safe_get(latest_income, "Pretax Income") or _safe_get(latest_income, "Income Before Tax")
-                if pretax_income not in (None, 0) and tax_provision is not None:
-                    tax_rate = max(min(tax_provision / pretax_income, 0.35), 0)
-                else:
-                    tax_rate = 0.21
-
-                info = stock.info if hasattr(stock, "info") else {}
-                shares_outstanding = info.get("sharesOutstanding") or fallback["shares_outstanding"]
-
-                cash = _safe_get(latest_balance, "Cash And Cash Equivalents") or _safe_get(latest_balance, "Cash") or fallback["cash"]
-                accounts_receivable = _safe_get(latest_balance, "Accounts Receivable") or fallback["accounts_receivable"]
-                pp_and_e = _safe_get(latest_balance, "Property Plant Equipment") or fallback["pp_and_e"]
-                other_assets = _safe_get(latest_balance, "Other Current Assets") or _safe_get(latest_balance, "Other Assets") or fallback["other_assets"]
-                total_current_liabilities = _safe_get(latest_balance, "Total Current Liabilities") or fallback["total_current_liabilities"]
-                book_value_equity = _safe_get(latest_balance, "Total Stockholder Equity") or fallback["book_value_equity"]
-
-                total_debt = _safe_get(latest_balance, "Total Debt")
-                if total_debt is None:
-                    short_debt = _safe_get(latest_balance, "Short Long Term Debt") or 0
-                    long_debt = _safe_get(latest_balance, "Long Term Debt") or 0
-                    total_debt = short_debt + long_debt
-                debt = total_debt if total_debt is not None else fallback["debt"]
-
-                core_fields = [revenue, sga, rnd, ebit]
-                if any(val is None for val in core_fields):
-                    raise ValueError("Missing core income statement fields")
-
-                return {
-                    "ticker": ticker,
-                    "revenue": revenue,
-                    "cogs": cogs,
-                    "prev_revenue": prev_revenue,
-                    "ebit": ebit,
-                    "sga": sga,
-                    "rnd": rnd,
-                    "tax_rate": tax_rate,
-                    "shares_outstanding": shares_outstanding,
-                    "cash": cash,
-                    "debt": debt,
-                    "accounts_receivable": accounts_receivable,
-                    "pp_and_e": pp_and_e,
-                    "other_assets": other_assets,
-                    "total_current_liabilities": total_current_liabilities,
-                    "book_value_equity": book_value_equity,
-                    "is_mock": False,
-                    "source": "yfinance"
-                }
+        info = stock.info if hasattr(stock, "info") else {}
+        shares_outstanding = info.get("sharesOutstanding") or fallback.shares_outstanding
 
-            except Exception as e:
-                last_error = e
-                if attempt < 2:
-                    time.sleep(1 * (attempt + 1))
-                    continue
+        cash = _safe_get(latest_balance, "Cash And Cash Equivalents") or _safe_get(latest_balance, "Cash") or fallback.cash
+        accounts_receivable = _safe_get(latest_balance, "Accounts Receivable") or fallback.accounts_receivable
+        pp_and_e = _safe_get(latest_balance, "Property Plant Equipment") or fallback.pp_and_e
+        other_assets = _safe_get(latest_balance, "Other Current Assets") or _safe_get(latest_balance, "Other Assets") or fallback.other_assets
+        total_current_liabilities = _safe_get(latest_balance, "Total Current Liabilities") or fallback.total_current_liabilities
+        book_value_equity = _safe_get(latest_balance, "Total Stockholder Equity") or fallback.book_value_equity
+
+        total_debt = _safe_get(latest_balance, "Total Debt")
+        if total_debt is None:
+            short_debt = _safe_get(latest_balance, "Short Long Term Debt") or 0
+            long_debt = _safe_get(latest_balance, "Long Term Debt") or 0
+            total_debt = short_debt + long_debt
+        debt = total_debt if total_debt is not None else fallback.debt
+
+        core_fields = [revenue, sga, rnd, ebit]
+        if any(val is None for val in core_fields):
+            raise ProviderNoData("Missing core income statement fields")
+
+        return Financials(
+            ticker=ticker,
+            revenue=revenue,
+            cogs=cogs,
+            prev_revenue=prev_revenue,
+            ebit=ebit,
+            sga=sga,
+            rnd=rnd,
+            tax_rate=tax_rate,
+            shares_outstanding=shares_outstanding,
+            cash=cash,
+            debt=debt,
+            accounts_receivable=accounts_receivable,
+            pp_and_e=pp_and_e,
+            other_assets=other_assets,
+            total_current_liabilities=total_current_liabilities,
+            book_value_equity=book_value_equity,
+            is_mock=False,
+            source="yfinance",
+            fiscal_year=int(fiscal_year)
+        )
 
-        print(f"⚠️ SEC/YFinance fetch failed for {ticker}: {last_error}. Using mock fallback.")
-        return fallback
-        
     def get_mda_text(self, ticker):
         """
         Fetches MD&A text from the latest 10-K.
         """
+        return FETCH_FLIGHTS.do(("mda", ticker), lambda: get_cache().get_or_set(
+            f"mda:{ticker}", lambda: self._load_mda_text(ticker), MDA_CACHE_TTL,
+            cacheable=lambda mda: not mda.get("is_mock"),
+        ))
+
+    def _load_mda_text(self, ticker):
         try:
             doc_html = self._fetch_latest_10k_html(ticker)
             if doc_html:
@@ -173,6 +233,82 @@ class SECFetcher:
             print(f"⚠️ MD&A fetch failed for {ticker}: {e}. Using mock text.")
 
         # Fallback narrative keeps AI working if SEC fetch fails
+        return self._mock_mda(ticker)
+
+    def get_mda_texts(self, tickers, max_workers=8, parser_pool=None):
+        """
+        Batch version of get_mda_text: downloads filings on threads and parses
+        them on a process pool so regex extraction doesn't serialize on the GIL.
+        Tickers in the shared MD&A cache, or already being fetched by another
+        caller, are not downloaded again.
+
+        Args:
+            tickers (list[str]): Tickers to fetch
+            max_workers (int): Concurrent downloads
+            parser_pool (FilingParserPool, optional): Reusable parsing pool
+
+        Returns:
+            dict: ticker -> {'text', 'is_mock'} (same shape as get_mda_text)
+        """
+        cache = get_cache()
+        results, claimed, joined = {}, {}, {}
+        for ticker in dict.fromkeys(tickers):
+            cached = cache.get(f"mda:{ticker}")
+            if cached is not None:
+                results[ticker] = cached
+                continue
+            future, leader = FETCH_FLIGHTS.claim(("mda", ticker))
+            (claimed if leader else joined)[ticker] = future
+
+        try:
+            loaded = self._load_mda_texts(list(claimed), max_workers, parser_pool)
+        except BaseException as e:
+            for ticker, future in claimed.items():
+                FETCH_FLIGHTS.resolve(("mda", ticker), future, exception=e)
+            raise
+        for ticker, mda in loaded.items():
+            if not mda.get("is_mock"):
+                cache.set(f"mda:{ticker}", mda, MDA_CACHE_TTL)
+            FETCH_FLIGHTS.resolve(("mda", ticker), claimed[ticker], result=mda)
+            results[ticker] = mda
+
+        for ticker, future in joined.items():
+            results[ticker] = future.result()
+        return {ticker: results[ticker] for ticker in tickers}
+
+    def _load_mda_texts(self, tickers, max_workers, parser_pool):
+        # Batch _load_mda_text: threaded downloads, one parse pass on the process pool
+        if not tickers:
+            return {}
+
+        def fetch(ticker):
+            try:
+                return self._fetch_latest_10k_document(ticker)
+            except Exception as e:
+                print(f"⚠️ MD&A fetch failed for {ticker}: {e}. Using mock text.")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            documents = list(executor.map(fetch, tickers))
+        fetched = [(ticker, doc) for ticker, doc in zip(tickers, documents) if doc]
+
+        pool = parser_pool or FilingParserPool()
+        try:
+            sections = pool.parse([doc for _, doc in fetched])
+        finally:
+            if parser_pool is None:
+                pool.close()
+
+        results = {
+            ticker: {"text": section, "is_mock": False}
+            for (ticker, _), section in zip(fetched, sections) if section
+        }
+        for ticker in tickers:
+            if ticker not in results:
+                results[ticker] = self._mock_mda(ticker)
+        return results
+
+    def _mock_mda(self, ticker):
         return {
             "text": (
                 f"Management Discussion & Analysis for {ticker}: "
@@ -188,9 +324,62 @@ class SECFetcher:
         """
         Best-effort fetch of the latest 10-K primary document HTML using SEC's public data endpoints.
         """
+        return decode_filing(self._fetch_latest_10k_document(ticker))
+
+    def _fetch_latest_10k_document(self, ticker):
+        """
+        Raw bytes of the latest 10-K primary document, served from the local
+        filing archive when this accession has been downloaded before.
+        """
+        cik, accession, filing_url = self._latest_10k_filing(ticker)
+        archive = self._get_archive()
+
+        raw = archive.get(cik, accession)
+        if raw is None:
+            filing_url = filing_url or self._resolve_primary_document(cik, accession)
+            filing_resp = self._session.get(filing_url, timeout=10)
+            filing_resp.raise_for_status()
+            raw = filing_resp.content
+            archive.put(cik, accession, raw, url=filing_url)
+        return raw
+
+    def _get_archive(self):
+        if self._archive is None:
+            self._archive = FilingArchive()
+        return self._archive
+
+    def _get_edgar_index(self):
+        if self._edgar_index is None:
+            self._edgar_index = EdgarIndex() if os.path.exists(DEFAULT_INDEX_PATH) else False
+        return self._edgar_index or None
+
+    def _latest_10k_filing(self, ticker):
+        """
+        Resolves (CIK, accession, primary document URL) of the latest 10-K:
+        a local query when a fresh EDGAR full-index covers the company, the
+        submissions API otherwise. The URL is None when the index has not
+        resolved the filing's primary document yet (see _resolve_primary_document).
+        """
+        for kind in (TICKER_UNKNOWN, NO_10K):
+            reason = NEGATIVE_CACHE.check(kind, ticker)
+            if reason is not None:
+                raise ProviderNoData(reason)
+
         cik = self._lookup_cik(ticker)
         if not cik:
-            raise ValueError("CIK lookup failed")
+            NEGATIVE_CACHE.record(TICKER_UNKNOWN, ticker, "CIK lookup failed")
+            raise ProviderNoData("CIK lookup failed")
+
+        # A stale index could miss this year's 10-K; the submissions API is always current
+        index = self._get_edgar_index()
+        filing = index.latest_filing(cik) if index and index.is_fresh() else None
+        if filing is not None:
+            filing_url = None
+            if filing["primary_document"]:
+                filing_url = FILING_DOCUMENT_URL.format(
+                    cik=int(cik), accession=filing["accession"], name=filing["primary_document"]
+                )
+            return int(cik), filing["accession"], filing_url
 
         cik_padded = str(cik).zfill(10)
         submissions_url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
@@ -206,48 +395,36 @@ class SECFetcher:
         # Find latest 10-K
         target_idx = next((i for i, f in enumerate(forms) if f and f.lower() == "10-k"), None)
         if target_idx is None:
-            raise ValueError("No 10-K filing found")
+            NEGATIVE_CACHE.record(NO_10K, ticker, "No 10-K filing found")
+            raise ProviderNoData("No 10-K filing found")
 
         accession = accession_numbers[target_idx].replace("-", "")
         primary_doc = primary_docs[target_idx]
         cik_no_prefix = str(int(cik))  # strip leading zeros
 
         filing_url = f"https://www.sec.gov/Archives/edgar/data/{cik_no_prefix}/{accession}/{primary_doc}"
-        filing_resp = self._session.get(filing_url, timeout=10)
-        filing_resp.raise_for_status()
-        return filing_resp.text
+        return int(cik), accession, filing_url
+
+    def _resolve_primary_document(self, cik, accession):
+        """
+        Primary document URL of an indexed filing, from the filing's directory
+        listing; remembered in the index so each accession is resolved once.
+        """
+        resp = self._session.get(FILING_DIRECTORY_URL.format(cik=int(cik), accession=accession), timeout=10)
+        resp.raise_for_status()
+        name = primary_document(resp.json().get("directory", {}).get("item", []))
+        if not name:
+            raise ValueError(f"No primary document found for accession {accession}")
+        index = self._get_edgar_index()
+        if index:
+            index.set_primary_document(cik, accession, name)
+        return FILING_DOCUMENT_URL.format(cik=int(cik), accession=accession, name=name)
 
     def _extract_mda_section(self, html_text):
         """
         Extracts the MD&A (Item 7) section from the filing HTML by locating Item 7 and ending at Item 7A or 8.
         """
-        lower = html_text.lower()
-        start_regex = re.compile(r'item\s+7\.?\s*(management|[^<]{0,80}discussion)')
-        matches = list(start_regex.finditer(lower))
-        if not matches:
-            return None
-
-        best_snippet = ""
-        for match in matches:
-            start_idx = match.start()
-            tail = lower[start_idx:]
-            end_match = re.search(r'item\s+7a\.?|item\s+8\.?', tail)
-
-            # If the first Item 7A/8 is too close (e.g., table of contents), fall back to a fixed window.
-            if end_match and end_match.start() > 2000:
-                end_idx = start_idx + end_match.start()
-            else:
-                end_idx = start_idx + 8000
-
-            raw = html_text[start_idx:end_idx]
-            cleaned = re.sub(r'<[^>]+>', ' ', raw)  # strip tags
-            cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-            cleaned = unescape(cleaned)
-
-            if len(cleaned) > len(best_snippet):
-                best_snippet = cleaned
-
-        return best_snippet or None
+        return extract_mda_section(html_text)
 
     def _lookup_cik(self, ticker):
         """
@@ -277,7 +454,7 @@ class SECFetcher:
         income_resp.raise_for_status()
         income_data = income_resp.json()
         if not income_data:
-            raise ValueError("Empty income statement from FMP")
+            raise ProviderNoData("Empty income statement from FMP")
 
         latest_income = income_data[0]
         prev_income = income_data[1] if len(income_data) > 1 else None
@@ -287,7 +464,7 @@ class SECFetcher:
         bal_data = bal_resp.json()
         latest_balance = bal_data[0] if bal_data else None
         if latest_balance is None:
-            raise ValueError("Empty balance sheet from FMP")
+            raise ProviderNoData("Empty balance sheet from FMP")
 
         def g(data, key, default=None):
             val = data.get(key) if data else None
@@ -302,6 +479,7 @@ class SECFetcher:
         prev_revenue = g(prev_income, "revenue")
         if prev_revenue is None and revenue:
             prev_revenue = revenue * 0.8
+        fiscal_year = str(g(latest_income, "calendarYear") or g(latest_income, "date", ""))[:4]
 
         income_tax = g(latest_income, "incomeTaxExpense")
         income_before_tax = g(latest_income, "incomeBeforeTax") or g(latest_income, "incomeBeforeTaxUSD")
@@ -327,25 +505,26 @@ class SECFetcher:
 
         core_fields = [revenue, sga, rnd, ebit]
         if any(val is None for val in core_fields):
-            raise ValueError("Missing core income statement fields from FMP")
-
-        return {
-            "ticker": ticker,
-            "revenue": revenue,
-            "cogs": cogs,
-            "prev_revenue": prev_revenue,
-            "ebit": ebit,
-            "sga": sga,
-            "rnd": rnd,
-            "tax_rate": tax_rate,
-            "shares_outstanding": shares_outstanding,
-            "cash": cash,
-            "debt": total_debt if total_debt is not None else 0,
-            "accounts_receivable": accounts_receivable,
-            "pp_and_e": pp_and_e,
-            "other_assets": other_assets,
-            "total_current_liabilities": total_current_liabilities,
-            "book_value_equity": book_value_equity,
-            "is_mock": False,
-            "source": "fmp"
-        }
+            raise ProviderNoData("Missing core income statement fields from FMP")
+
+        return Financials(
+            ticker=ticker,
+            revenue=revenue,
+            cogs=cogs,
+            prev_revenue=prev_revenue,
+            ebit=ebit,
+            sga=sga,
+            rnd=rnd,
+            tax_rate=tax_rate,
+            shares_outstanding=shares_outstanding,
+            cash=cash,
+            debt=total_debt if total_debt is not None else 0,
+            accounts_receivable=accounts_receivable,
+            pp_and_e=pp_and_e,
+            other_assets=other_assets,
+            total_current_liabilities=total_current_liabilities,
+            book_value_equity=book_value_equity,
+            is_mock=False,
+            source="fmp",
+            fiscal_year=int(fiscal_year) if fiscal_year.isdigit() else 0
+        )
@@ -0,0 +1,243 @@
+"""
+Data Source Router
+
+Routes a request across an ordered list of data providers (e.g. FMP → yfinance)
+instead of walking them strictly one after another:
+
+- Per-provider health: rolling latency window (p95) and error rate
+- Circuit breaker: a provider whose recent error rate crosses the threshold is
+  skipped for a cool-down period, then allowed a single half-open trial call
+- Hedged requests: if the current provider hasn't answered within its p95
+  latency, the next provider is fired in parallel and the first valid answer
+  wins. A failed answer triggers the next provider immediately.
+
+Losing calls are left to finish in the background; their outcome still feeds
+the provider's health statistics. A provider raising ProviderNoData (e.g. an
+unknown ticker) answered correctly, so it counts as healthy.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.utils.retry import NonRetryableError
+
+# Hedge delay used until a provider has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 1.5
+MIN_HEDGE_DELAY = 0.05
+MIN_SAMPLES = 5
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class ProvidersExhausted(Exception):
+    """Raised when no provider returned a valid answer."""
+
+    def __init__(self, name, errors):
+        self.errors = errors
+        detail = "; ".join(f"{provider}: {error}" for provider, error in errors.items()) or "all circuits open"
+        super().__init__(f"{name}: {detail}")
+
+    @property
+    def no_data(self):
+        """True if every provider answered that it has no data (none failed or was skipped)."""
+        return bool(self.errors) and all(isinstance(error, ProviderNoData) for error in self.errors.values())
+
+
+class ProviderNoData(NonRetryableError, ValueError):
+    """Raised by a provider that is up but has no data for the request (unknown ticker, missing fields)."""
+
+
+class ProviderHealth:
+    def __init__(self, name, window=50, failure_threshold=0.5, min_calls=MIN_SAMPLES, open_seconds=30.0,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)  # successful calls only
+        self._outcomes = deque(maxlen=window)   # True = success
+        self.state = CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def p95(self):
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def error_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 1 - sum(self._outcomes) / len(self._outcomes)
+
+    def acquire(self):
+        """
+        Returns True if a call may be sent to this provider now.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record(self, success, latency):
+        with self._lock:
+            self._outcomes.append(success)
+            if success:
+                self._latencies.append(latency)
+
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+                if success:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = self._clock()
+
+    def snapshot(self):
+        p95 = self.p95()
+        return {
+            "provider": self.name,
+            "state": self.state,
+            "error_rate": self.error_rate(),
+            "p95_seconds": p95,
+            "calls": len(self._outcomes),
+        }
+
+
+class SourceRouter:
+    """
+    Shared, long-lived router for one kind of request (financials, quotes...).
+
+        router = SourceRouter("financials")
+        result, provider = router.call([("fmp", fetch_fmp), ("yfinance", fetch_yf)])
+    """
+
+    def __init__(self, name, hedge=True, default_hedge_delay=DEFAULT_HEDGE_DELAY, max_workers=8,
+                 health_factory=ProviderHealth):
+        self.name = name
+        self.hedge = hedge
+        self.default_hedge_delay = default_hedge_delay
+        self._health_factory = health_factory
+        self._health = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"router-{name}")
+
+    def health(self, provider):
+        with self._lock:
+            if provider not in self._health:
+                self._health[provider] = self._health_factory(provider)
+            return self._health[provider]
+
+    def health_report(self):
+        with self._lock:
+            providers = list(self._health.values())
+        return [health.snapshot() for health in providers]
+
+    def hedge_delay(self, provider):
+        p95 = self.health(provider).p95()
+        if p95 is None:
+            return self.default_hedge_delay
+        return max(p95, MIN_HEDGE_DELAY)
+
+    def call(self, providers, validate=None, timeout=None):
+        """
+        Runs the request against `providers` in priority order.
+
+        Args:
+            providers (list[tuple[str, callable]]): (name, zero-arg fetch function)
+            validate (callable, optional): Returns True if a result is usable;
+                defaults to "result is not None"
+            timeout (float, optional): Overall deadline in seconds
+
+        Returns:
+            tuple: (result, provider name) of the first valid answer
+
+        Raises:
+            ProvidersExhausted: Every provider failed, was skipped, or the deadline passed
+        """
+        validate = validate or (lambda result: result is not None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        queue = list(providers)
+        pending = {}  # future -> provider name
+        errors = {}
+
+        def launch_next():
+            while queue:
+                provider, fetch = queue.pop(0)
+                health = self.health(provider)
+                if not health.acquire():
+                    errors[provider] = "circuit open"
+                    continue
+                future = self._executor.submit(self._timed, fetch, validate)
+                future.add_done_callback(lambda f, h=health: h.record(*self._health_outcome(*f.result())))
+                pending[future] = provider
+                return provider
+            return None
+
+        current = launch_next()
+        while pending:
+            wait_for = self.hedge_delay(current) if (self.hedge and queue) else None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            if not done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    errors.update({provider: "deadline exceeded" for provider in pending.values()})
+                    break
+                # Hedge: current provider is slower than its p95, fire the backup too
+                current = launch_next() or current
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                result, error, success, _ = future.result()
+                if success:
+                    return result, provider
+                errors[provider] = error
+                print(f"⚠️ {self.name} provider {provider} failed: {error}")
+            if not pending:
+                current = launch_next()
+
+        raise ProvidersExhausted(self.name, errors)
+
+    @staticmethod
+    def _health_outcome(result, error, success, latency):
+        # (success, latency) for ProviderHealth.record
+        return success or isinstance(error, ProviderNoData), latency
+
+    @staticmethod
+    def _timed(fetch, validate):
+        # Never raises: returns (result, error, success, latency) for health tracking
+        start = time.monotonic()
+        try:
+            result = fetch()
+        except Exception as e:
+            return None, e, False, time.monotonic() - start
+        latency = time.monotonic() - start
+        if not validate(result):
+            return result, ValueError("invalid response"), False, latency
+        return result, None, True, latency
@@ -12,8 +12,19 @@ SaaS businesses. The core concept is that true earnings power can be extracted b
 
 This approach reveals the sustainable, maintenance-level earnings power of a business,
 distinguishing it from the inflated earnings during high-growth phases.
+
+Every method also accepts NumPy arrays (e.g. FinancialsBatch.columns, or
+broadcast company x scenario grids) and then evaluates element-wise.
 """
 
+from src.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def _is_array(value):
+    return hasattr(value, "shape")
+
 
 class GreenwaldEPV:
     def calculate_reproduction_value(self, balance_sheet):
@@ -41,6 +52,12 @@ class GreenwaldEPV:
 
         # If book equity is available and higher, use it as a floor but still exclude cash double count
         book_equity = balance_sheet.get('book_value_equity')
+        if _is_array(reproduction_value) or _is_array(book_equity):
+            if book_equity is not None:
+                reproduction_value = np.maximum(
+                    reproduction_value, np.where(book_equity != 0, book_equity - cash, -np.inf)
+                )
+            return np.maximum(reproduction_value, 0)
         if book_equity not in (None, 0):
             reproduction_value = max(reproduction_value, book_equity - cash)
 
@@ -92,6 +109,10 @@ class GreenwaldEPV:
         Step 3: EPV = Normalized Earnings / WACC
         Note: Assumes ZERO growth. This is the 'No-Growth' value.
         """
+        if _is_array(cost_of_capital):
+            return np.divide(normalized_earnings, cost_of_capital,
+                             out=np.zeros(np.broadcast(normalized_earnings, cost_of_capital).shape),
+                             where=cost_of_capital != 0)
         if cost_of_capital == 0:
             return 0
         return normalized_earnings / cost_of_capital
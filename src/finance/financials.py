@@ -0,0 +1,156 @@
+"""
+Financials Records
+
+Typed containers for the per-company inputs the EPV model consumes:
+
+- Financials: one company's income statement / balance sheet snapshot as a
+  slotted dataclass. It also behaves as a read-only Mapping with the same keys
+  as the legacy dict (financials['ebit'], financials.get('cash', 0), dict(...)),
+  so existing callers and GreenwaldEPV work unchanged.
+- FinancialsBatch: many companies stored column-wise, one NumPy array per
+  numeric field. `batch.columns` is a plain dict of arrays, so GreenwaldEPV's
+  dict-based methods evaluate the whole universe in one vectorized pass.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+
+from src.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Numeric fields, in the order used for FinancialsBatch columns
+NUMERIC_FIELDS = (
+    "revenue",
+    "cogs",
+    "prev_revenue",
+    "ebit",
+    "sga",
+    "rnd",
+    "tax_rate",
+    "shares_outstanding",
+    "cash",
+    "debt",
+    "accounts_receivable",
+    "pp_and_e",
+    "other_assets",
+    "total_current_liabilities",
+    "book_value_equity",
+)
+
+
+@dataclass(slots=True)
+class Financials(Mapping):
+    ticker: str
+    revenue: float = 0.0
+    cogs: float = 0.0
+    prev_revenue: float = 0.0
+    ebit: float = 0.0
+    sga: float = 0.0
+    rnd: float = 0.0
+    tax_rate: float = 0.21
+    shares_outstanding: float = 0.0
+    cash: float = 0.0
+    debt: float = 0.0
+    accounts_receivable: float = 0.0
+    pp_and_e: float = 0.0
+    other_assets: float = 0.0
+    total_current_liabilities: float = 0.0
+    book_value_equity: float = 0.0
+    is_mock: bool = False
+    source: str = "unknown"
+    fiscal_year: int = 0  # 0 when the provider gave no period
+
+    # --- Mapping interface (legacy dict shape) ---
+    def __getitem__(self, key):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(_FIELD_NAMES)
+
+    def __len__(self):
+        return len(_FIELD_NAMES)
+
+    def __contains__(self, key):
+        return key in _FIELD_NAMES
+
+    # --- Conversion ---
+    def to_dict(self):
+        return {name: getattr(self, name) for name in _FIELD_NAMES}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a record from the legacy dict shape; unknown keys are ignored and
+        missing keys take the field defaults.
+        """
+        return cls(**{name: data[name] for name in _FIELD_NAMES if name in data})
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Financials))
+
+
+class FinancialsBatch:
+    """
+    Column-oriented collection of Financials records.
+
+    Attributes:
+        tickers (list[str]): Row labels
+        columns (dict[str, ndarray]): One float64 array per NUMERIC_FIELDS entry
+        is_mock (ndarray[bool]): Per-row mock flag
+        sources (list[str]): Per-row data source
+        fiscal_years (list[int]): Per-row fiscal year (0 when unknown)
+    """
+
+    __slots__ = ("tickers", "columns", "is_mock", "sources", "fiscal_years")
+
+    def __init__(self, tickers, columns, is_mock=None, sources=None, fiscal_years=None):
+        self.tickers = list(tickers)
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) for name in NUMERIC_FIELDS}
+        size = len(self.tickers)
+        self.is_mock = np.zeros(size, dtype=bool) if is_mock is None else np.asarray(is_mock, dtype=bool)
+        self.sources = list(sources) if sources is not None else ["unknown"] * size
+        self.fiscal_years = list(fiscal_years) if fiscal_years is not None else [0] * size
+
+        for name, column in self.columns.items():
+            if column.shape != (size,):
+                raise ValueError(f"Column {name!r} has shape {column.shape}, expected ({size},)")
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Args:
+            records (iterable): Financials records or legacy dicts
+        """
+        records = [r if isinstance(r, Financials) else Financials.from_dict(r) for r in records]
+        columns = {
+            name: np.fromiter((getattr(r, name) or 0.0 for r in records), dtype=np.float64, count=len(records))
+            for name in NUMERIC_FIELDS
+        }
+        return cls(
+            tickers=[r.ticker for r in records],
+            columns=columns,
+            is_mock=[r.is_mock for r in records],
+            sources=[r.source for r in records],
+            fiscal_years=[r.fiscal_year for r in records],
+        )
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __getitem__(self, index):
+        return Financials(
+            ticker=self.tickers[index],
+            is_mock=bool(self.is_mock[index]),
+            source=self.sources[index],
+            fiscal_year=self.fiscal_years[index],
+            **{name: float(column[index]) for name, column in self.columns.items()}
+        )
+
+    def to_records(self):
+        return [self[i] for i in range(len(self))]
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self.to_records()]
@@ -0,0 +1,239 @@
+"""
+Rule of 40 & Growth Metrics
+
+The valuation summary scores one snapshot (latest revenue vs the prior year).
+MetricsEngine scores a history: every ticker's annual or quarterly periods are
+held as (tickers, periods) NumPy grids, so growth, margins, Rule of 40 and
+their rolling trends are computed for the whole universe in a few
+vectorized passes:
+
+- revenue_growth      Year-over-year revenue growth % (lag 1 annual, 4 quarterly)
+- ebit_margin         GAAP operating margin %
+- adj_margin          NOPAT margin % after adding back growth SG&A / R&D
+- rule_of_40_gaap     revenue_growth + ebit_margin
+- rule_of_40_adj      revenue_growth + adj_margin
+- <metric>_avg        Rolling mean over `window` periods
+- <metric>_trend      Rolling least-squares slope (points per period)
+
+Computed periods are kept; `extend` with new periods only computes the new
+columns (plus nothing earlier than the lag and window they read):
+
+    engine = MetricsEngine(freq="annual", window=3)
+    engine.extend(history_rows)        # dicts: ticker, period, revenue, ebit, sga, rnd, tax_rate
+    engine.set_adjustments({"DDOG": ai_estimate})
+    frame = engine.frame()             # one row per (ticker, period)
+    engine.extend(rows_for_new_year)   # recomputes the new year only
+
+Adjusted margins use the same GreenwaldEPV normalization as the valuation
+summary; tickers without AI maintenance estimates add nothing back, so their
+adjusted margin is the after-tax GAAP margin.
+
+The app scores the fiscal years the results store collects from each stored
+analysis (ResultsStore.history, via src.pipeline.metrics_history).
+"""
+
+from src.finance.epv_model import GreenwaldEPV
+from src.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+INPUT_FIELDS = ("revenue", "ebit", "sga", "rnd", "tax_rate")
+# Missing values: revenue / EBIT stay NaN, the rest fall back like the fetchers do
+INPUT_DEFAULTS = {"sga": 0.0, "rnd": 0.0, "tax_rate": 0.21}
+
+BASE_METRICS = ("revenue_growth", "ebit_margin", "adj_margin", "rule_of_40_gaap", "rule_of_40_adj")
+METRICS = BASE_METRICS + tuple(f"{m}_{kind}" for m in BASE_METRICS for kind in ("avg", "trend"))
+
+GROWTH_LAG = {"annual": 1, "quarterly": 4}
+DEFAULT_WINDOW = 3
+
+_model = GreenwaldEPV()
+
+
+class MetricsEngine:
+    """
+    Attributes:
+        tickers (list[str]): Grid rows, in first-seen order
+        periods (list): Grid columns, sorted (any sortable labels: 2023, "2024Q1", dates)
+        inputs (dict[str, ndarray]): INPUT_FIELDS -> (tickers, periods) float grid
+        metrics (dict[str, ndarray]): METRICS -> (tickers, periods) float grid, NaN where undefined
+    """
+
+    def __init__(self, freq="annual", window=DEFAULT_WINDOW):
+        if freq not in GROWTH_LAG:
+            raise ValueError(f"freq must be one of {sorted(GROWTH_LAG)}, got {freq!r}")
+        if window < 2:
+            raise ValueError("window must cover at least 2 periods")
+        self.freq = freq
+        self.lag = GROWTH_LAG[freq]
+        self.window = window
+        self.tickers = []
+        self.periods = []
+        self.inputs = {name: np.empty((0, 0)) for name in INPUT_FIELDS}
+        self.metrics = {name: np.empty((0, 0)) for name in METRICS}
+        self._rows = {}
+        self._maintenance = {"maintenance_sga_percent": np.empty(0), "maintenance_rnd_percent": np.empty(0)}
+        self._computed = 0  # leading period columns whose metrics are final
+
+    # --- Data ---
+    def extend(self, records):
+        """
+        Adds or revises history rows. A row for an existing (ticker, period)
+        overwrites it; metrics from the earliest touched period on are
+        recomputed on the next read.
+
+        Args:
+            records (iterable[Mapping]): 'ticker', 'period' and any INPUT_FIELDS
+
+        Returns:
+            MetricsEngine: self, for chaining
+        """
+        records = list(records)
+        if not records:
+            return self
+        self._add_tickers(record["ticker"] for record in records)
+        first_changed = self._add_periods({record["period"] for record in records})
+
+        columns = {period: index for index, period in enumerate(self.periods)}
+        rows = np.fromiter((self._rows[r["ticker"]] for r in records), dtype=np.intp, count=len(records))
+        cols = np.fromiter((columns[r["period"]] for r in records), dtype=np.intp, count=len(records))
+        for name in INPUT_FIELDS:
+            default = INPUT_DEFAULTS.get(name, np.nan)
+            values = [r.get(name) for r in records]
+            self.inputs[name][rows, cols] = np.array(
+                [default if value is None else value for value in values], dtype=np.float64
+            )
+
+        self._computed = min(self._computed, first_changed, int(cols.min()))
+        return self
+
+    def set_adjustments(self, adjustments):
+        """
+        Sets AI maintenance estimates per ticker; every period of those
+        tickers is recomputed on the next read.
+
+        Args:
+            adjustments (dict): ticker -> {'maintenance_sga_percent', 'maintenance_rnd_percent'}
+        """
+        self._add_tickers(adjustments)
+        for ticker, estimate in adjustments.items():
+            for key, column in self._maintenance.items():
+                column[self._rows[ticker]] = estimate.get(key, 1.0)
+        self._computed = 0
+
+    # --- Results ---
+    def compute(self):
+        """
+        Brings every metric grid up to date and returns the metrics dict.
+        """
+        start, end = self._computed, len(self.periods)
+        if start < end:
+            self._compute_base(start)
+            self._compute_rolling(start)
+            self._computed = end
+        return self.metrics
+
+    def frame(self, metrics=METRICS):
+        """
+        Long DataFrame with one row per (ticker, period) that has revenue.
+        """
+        self.compute()
+        rows, cols = np.nonzero(np.isfinite(self.inputs["revenue"]))
+        data = {
+            "ticker": pd.Categorical.from_codes(rows, categories=self.tickers),
+            "period": [self.periods[c] for c in cols],
+        }
+        for name in metrics:
+            data[name] = self.metrics[name][rows, cols]
+        return pd.DataFrame(data)
+
+    def latest(self, metrics=METRICS):
+        """
+        Each ticker's metrics at its most recent period with revenue.
+
+        Returns:
+            dict: ticker -> {'period', metric: value}
+        """
+        self.compute()
+        if not self.periods:
+            return {}
+        has_revenue = np.isfinite(self.inputs["revenue"])
+        last = has_revenue.shape[1] - 1 - np.argmax(has_revenue[:, ::-1], axis=1)
+        result = {}
+        for row, ticker in enumerate(self.tickers):
+            if not has_revenue[row].any():
+                continue
+            col = last[row]
+            values = {name: float(self.metrics[name][row, col]) for name in metrics}
+            result[ticker] = {"period": self.periods[col], **values}
+        return result
+
+    # --- Internal helpers ---
+    def _add_tickers(self, tickers):
+        new = [t for t in dict.fromkeys(tickers) if t not in self._rows]
+        if not new:
+            return
+        for ticker in new:
+            self._rows[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        pad = ((0, len(new)), (0, 0))
+        for grids in (self.inputs, self.metrics):
+            for name, grid in grids.items():
+                grids[name] = np.pad(grid, pad, constant_values=np.nan)
+        for key, column in self._maintenance.items():
+            self._maintenance[key] = np.pad(column, (0, len(new)), constant_values=1.0)
+        # New rows have no metrics yet; their history starts at column 0
+        self._computed = 0
+
+    def _add_periods(self, periods):
+        # Returns the index of the earliest column whose position changed
+        existing = set(self.periods)
+        new = sorted(p for p in periods if p not in existing)
+        if not new:
+            return len(self.periods)
+        merged = sorted(self.periods + new)
+        index = {period: i for i, period in enumerate(merged)}
+        positions = [index[period] for period in self.periods]
+        for grids in (self.inputs, self.metrics):
+            for name, grid in grids.items():
+                widened = np.full((grid.shape[0], len(merged)), np.nan)
+                widened[:, positions] = grid
+                grids[name] = widened
+        self.periods = merged
+        return index[new[0]]
+
+    def _compute_base(self, start):
+        inputs = {name: grid[:, start:] for name, grid in self.inputs.items()}
+        revenue = inputs["revenue"]
+        prior_revenue = _trailing(self.inputs["revenue"], start, self.lag)[:, :-self.lag]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = np.where(prior_revenue != 0, (revenue - prior_revenue) / prior_revenue * 100, np.nan)
+            ebit_margin = np.where(revenue != 0, inputs["ebit"] / revenue * 100, np.nan)
+            normalized = _model.calculate_normalized_earnings(inputs, {
+                key: column[:, None] for key, column in self._maintenance.items()
+            })
+            adj_margin = np.where(revenue != 0, normalized["nopat"] / revenue * 100, np.nan)
+
+        out = self.metrics
+        out["revenue_growth"][:, start:] = growth
+        out["ebit_margin"][:, start:] = ebit_margin
+        out["adj_margin"][:, start:] = adj_margin
+        out["rule_of_40_gaap"][:, start:] = _model.calculate_rule_of_40(growth, ebit_margin)
+        out["rule_of_40_adj"][:, start:] = _model.calculate_rule_of_40(growth, adj_margin)
+
+    def _compute_rolling(self, start):
+        # Full windows only: a window with a missing period yields NaN
+        x = np.arange(self.window) - (self.window - 1) / 2
+        for name in BASE_METRICS:
+            history = _trailing(self.metrics[name], start, self.window - 1)
+            windows = np.lib.stride_tricks.sliding_window_view(history, self.window, axis=1)
+            self.metrics[f"{name}_avg"][:, start:] = windows.mean(axis=2)
+            self.metrics[f"{name}_trend"][:, start:] = windows @ x / (x @ x)
+
+
+def _trailing(grid, start, lookback):
+    # Columns start-lookback.. of grid, NaN-padded on the left where they fall before column 0
+    lo = max(start - lookback, 0)
+    return np.pad(grid[:, lo:], ((0, 0), (lookback - (start - lo), 0)), constant_values=np.nan)
@@ -0,0 +1,276 @@
+"""
+Scenario Sweeps
+
+Evaluates a tickers x scenarios matrix of EPV valuations in one call, e.g.
+bear/base/bull WACC crossed with maintenance splits and tax rates across a
+whole screening universe:
+
+    scenarios = scenario_grid(cost_of_capital=[0.08, 0.10, 0.12], maintenance_sga_percent=[0.3, 0.5])
+    frame = run_scenarios(batch, scenarios, adjustments=ai_estimates)
+
+- Company columns (FinancialsBatch) are broadcast against scenario columns, so
+  GreenwaldEPV's math runs on (tickers, scenarios) NumPy grids, one block of
+  rows at a time to bound peak memory
+- Very large sweeps fan the row blocks out to worker processes, which write
+  straight into a shared-memory result buffer
+- The result is a tidy DataFrame: one row per (ticker, scenario), with
+  categorical 'ticker' / 'scenario' columns and one float column per output
+
+A scenario field left as None falls back to the company's own value (its tax
+rate, its AI maintenance estimate) or, for WACC, DEFAULT_COST_OF_CAPITAL.
+"""
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+from src.finance.epv_model import GreenwaldEPV
+from src.finance.financials import FinancialsBatch
+from src.finance.valuation_graph import DEFAULT_COST_OF_CAPITAL
+from src.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SCENARIO_FIELDS = ("cost_of_capital", "maintenance_sga_percent", "maintenance_rnd_percent", "tax_rate")
+
+OUTPUTS = (
+    "normalized_ebit",
+    "nopat",
+    "adj_margin",
+    "rule_of_40_adj",
+    "firm_epv",
+    "equity_epv",
+    "epv_per_share",
+    "franchise_value",
+    "franchise_value_pct",
+    "upside_pct",
+    "epv_discount_pct",
+)
+DEFAULT_OUTPUTS = ("nopat", "firm_epv", "equity_epv", "epv_per_share", "franchise_value", "rule_of_40_adj")
+MARKET_OUTPUTS = ("upside_pct", "epv_discount_pct")
+
+# Grid cells evaluated per block (bounds the size of the temporary arrays)
+BLOCK_CELLS = 1_000_000
+# Sweeps smaller than this run in-process; worker start-up would dominate
+PARALLEL_MIN_CELLS = 20_000_000
+
+_model = GreenwaldEPV()
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    cost_of_capital: float = None
+    maintenance_sga_percent: float = None
+    maintenance_rnd_percent: float = None
+    tax_rate: float = None
+
+
+def scenario_grid(**values):
+    """
+    Cartesian product of scenario field values.
+
+    Args:
+        **values: SCENARIO_FIELDS name -> list of values
+
+    Returns:
+        list[Scenario]: One scenario per combination, named "field=value,..."
+    """
+    unknown = set(values) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown scenario fields: {sorted(unknown)}")
+    names = list(values)
+    return [
+        Scenario(name=",".join(f"{n}={v:g}" for n, v in zip(names, combo)), **dict(zip(names, combo)))
+        for combo in itertools.product(*(values[n] for n in names))
+    ]
+
+
+def run_scenarios(financials, scenarios, adjustments=None, market_data=None, outputs=DEFAULT_OUTPUTS,
+                  max_workers=None, parallel_min_cells=PARALLEL_MIN_CELLS):
+    """
+    Values every company under every scenario.
+
+    Args:
+        financials (FinancialsBatch | list): Companies (records or legacy dicts)
+        scenarios (list[Scenario]): Assumption sets; names must be unique
+        adjustments (list[dict], optional): Per-company AI estimates used where a
+            scenario leaves the maintenance percentages unset (default 100%)
+        market_data (list[dict], optional): Per-company snapshots; required for
+            'upside_pct' / 'epv_discount_pct'
+        outputs (tuple): Columns to compute, from OUTPUTS
+        max_workers (int, optional): Worker processes for large sweeps (default: CPU count)
+        parallel_min_cells (int): Grid size above which worker processes are used
+
+    Returns:
+        pandas.DataFrame: Columns 'ticker', 'scenario', then one per output
+    """
+    batch = financials if isinstance(financials, FinancialsBatch) else FinancialsBatch.from_records(financials)
+    outputs = tuple(outputs)
+    invalid = [name for name in outputs if name not in OUTPUTS]
+    if invalid:
+        raise ValueError(f"Unknown scenario outputs: {invalid}")
+    if market_data is None and any(name in MARKET_OUTPUTS for name in outputs):
+        raise ValueError(f"{MARKET_OUTPUTS} require market_data")
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique")
+    if len(set(batch.tickers)) != len(batch.tickers):
+        raise ValueError("Tickers must be unique")
+
+    n, m = len(batch), len(scenarios)
+    company = _company_columns(batch, adjustments, market_data)
+    scenario = {
+        field: np.array([_nan_if_none(getattr(s, field)) for s in scenarios], dtype=np.float64)
+        for field in SCENARIO_FIELDS
+    }
+    rows_per_block = max(1, BLOCK_CELLS // max(m, 1))
+    blocks = [(start, min(start + rows_per_block, n)) for start in range(0, n, rows_per_block)]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(blocks) > 1 and n * m >= parallel_min_cells:
+        columns = _run_parallel(company, scenario, outputs, blocks, n, m, workers)
+    else:
+        columns = {name: np.empty(n * m) for name in outputs}
+        for start, stop in blocks:
+            _write_block(columns, company, scenario, outputs, start, stop, m)
+
+    return pd.DataFrame({
+        "ticker": pd.Categorical.from_codes(np.repeat(np.arange(n), m), categories=batch.tickers),
+        "scenario": pd.Categorical.from_codes(np.tile(np.arange(m), n), categories=names),
+        **columns,
+    })
+
+
+def evaluate_grid(company, scenario, outputs=DEFAULT_OUTPUTS):
+    """
+    Vectorized valuation of k companies x m scenarios.
+
+    Args:
+        company (dict): NUMERIC_FIELDS plus per-company 'maintenance_*' (and
+            'price' / 'market_cap') arrays of shape (k,)
+        scenario (dict): SCENARIO_FIELDS arrays of shape (m,), NaN = unset
+
+    Returns:
+        dict: Output name -> (k, m) array
+    """
+    col = {name: values[:, None] for name, values in company.items()}
+
+    def override(field, default):
+        values = scenario[field][None, :]
+        if np.isnan(values).all():
+            return default
+        return np.where(np.isnan(values), default, values)
+
+    income = {
+        "ebit": col["ebit"],
+        "sga": col["sga"],
+        "rnd": col["rnd"],
+        "tax_rate": override("tax_rate", col["tax_rate"]),
+    }
+    normalized = _model.calculate_normalized_earnings(income, {
+        "maintenance_sga_percent": override("maintenance_sga_percent", col["maintenance_sga_percent"]),
+        "maintenance_rnd_percent": override("maintenance_rnd_percent", col["maintenance_rnd_percent"]),
+    })
+    nopat = np.broadcast_to(normalized["nopat"], (len(company["ebit"]), len(scenario["cost_of_capital"])))
+    wacc = override("cost_of_capital", np.float64(DEFAULT_COST_OF_CAPITAL))
+    firm_epv = _model.get_epv(nopat, np.broadcast_to(wacc, nopat.shape))
+
+    results = {"nopat": nopat, "firm_epv": firm_epv}
+    wanted = set(outputs)
+    if "normalized_ebit" in wanted:
+        results["normalized_ebit"] = np.broadcast_to(normalized["normalized_ebit"], nopat.shape)
+    if wanted & {"adj_margin", "rule_of_40_adj"}:
+        revenue = np.where(col["revenue"] == 0, 1.0, col["revenue"])
+        prev_revenue = np.where(col["prev_revenue"] == 0, 1.0, col["prev_revenue"])
+        results["adj_margin"] = nopat / revenue * 100
+        results["rule_of_40_adj"] = _model.calculate_rule_of_40(
+            (revenue - prev_revenue) / prev_revenue * 100, results["adj_margin"]
+        )
+    if wanted & {"equity_epv", "epv_per_share", "upside_pct", "epv_discount_pct"}:
+        results["equity_epv"] = _model.calculate_equity_value(firm_epv, col["cash"], col["debt"])
+        shares = np.where(col["shares_outstanding"] == 0, 1.0, col["shares_outstanding"])
+        results["epv_per_share"] = results["equity_epv"] / shares
+    if wanted & {"franchise_value", "franchise_value_pct"}:
+        results["franchise_value"] = firm_epv - _model.calculate_reproduction_value(col)
+        results["franchise_value_pct"] = _safe_ratio(results["franchise_value"], firm_epv)
+    if "upside_pct" in wanted:
+        results["upside_pct"] = _safe_ratio(results["epv_per_share"] - col["price"], col["price"])
+    if "epv_discount_pct" in wanted:
+        # Positive = market cap below Equity EPV (discount), negative = premium
+        results["epv_discount_pct"] = _safe_ratio(results["equity_epv"] - col["market_cap"], results["equity_epv"])
+    return {name: results[name] for name in outputs}
+
+
+# --- Internal helpers ---
+def _nan_if_none(value):
+    return np.nan if value is None else float(value)
+
+
+def _safe_ratio(numerator, denominator):
+    # numerator / denominator * 100, 0 where the denominator is 0
+    shape = np.broadcast(numerator, denominator).shape
+    return np.divide(numerator, denominator, out=np.zeros(shape), where=np.broadcast_to(denominator != 0, shape)) * 100
+
+
+def _company_columns(batch, adjustments, market_data):
+    n = len(batch)
+    company = dict(batch.columns)
+    for key in ("maintenance_sga_percent", "maintenance_rnd_percent"):
+        company[key] = (
+            np.fromiter((a.get(key, 1.0) for a in adjustments), dtype=np.float64, count=n)
+            if adjustments is not None else np.ones(n)
+        )
+    for key in ("price", "market_cap"):
+        company[key] = (
+            np.fromiter(((d.get(key) or 0.0) for d in market_data), dtype=np.float64, count=n)
+            if market_data is not None else np.zeros(n)
+        )
+    return company
+
+
+def _write_block(columns, company, scenario, outputs, start, stop, m):
+    block = evaluate_grid({name: values[start:stop] for name, values in company.items()}, scenario, outputs)
+    for name in outputs:
+        columns[name][start * m:stop * m] = block[name].ravel()
+
+
+def _run_parallel(company, scenario, outputs, blocks, n, m, workers):
+    # Workers write their blocks straight into one shared buffer (outputs x n x m),
+    # so only the small input slices are pickled
+    buffer = shared_memory.SharedMemory(create=True, size=max(len(outputs) * n * m * 8, 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(
+                    _evaluate_into_shared, buffer.name, (len(outputs), n * m), outputs,
+                    {name: values[start:stop] for name, values in company.items()}, scenario, start, m
+                )
+                for start, stop in blocks
+            ]
+            for future in futures:
+                future.result()
+        shared = np.ndarray((len(outputs), n * m), dtype=np.float64, buffer=buffer.buf)
+        columns = {name: shared[i].copy() for i, name in enumerate(outputs)}
+        del shared
+    finally:
+        buffer.close()
+        buffer.unlink()
+    return columns
+
+
+def _evaluate_into_shared(buffer_name, shape, outputs, company, scenario, start, m):
+    buffer = shared_memory.SharedMemory(name=buffer_name)
+    try:
+        shared = np.ndarray(shape, dtype=np.float64, buffer=buffer.buf)
+        stop = start + len(company["ebit"])
+        block = evaluate_grid(company, scenario, outputs)
+        for i, name in enumerate(outputs):
+            shared[i, start * m:stop * m] = block[name].ravel()
+        del shared
+    finally:
+        buffer.close()
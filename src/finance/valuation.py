@@ -0,0 +1,35 @@
+"""
+Company Valuation Summary
+
+Runs the full Greenwald EPV calculation for a single company and flattens every
+headline number the dashboard displays into one dictionary:
+
+- Normalized EBIT / NOPAT and the growth spend added back
+- Firm EPV, equity EPV and EPV per share
+- Reproduction value and franchise value (moat)
+- GAAP and adjusted Rule of 40
+- Valuation gap versus the current market price and market cap
+
+Keeping this in one place lets the Streamlit UI, the results store and batch
+jobs share exactly the same math. The formulas live in ValuationGraph; use the
+graph directly when the same company is revalued repeatedly (UI reruns, sweeps).
+"""
+
+from src.finance.valuation_graph import DEFAULT_COST_OF_CAPITAL, ValuationGraph
+
+
+def value_company(financials, market_data, adjustments, cost_of_capital=DEFAULT_COST_OF_CAPITAL):
+    """
+    Computes the EPV valuation summary for one company.
+
+    Args:
+        financials (dict): Output of SECFetcher.get_financials
+        market_data (dict): Output of get_market_snapshot
+        adjustments (dict): Contains 'maintenance_sga_percent', 'maintenance_rnd_percent'
+        cost_of_capital (float): WACC used to capitalize NOPAT
+
+    Returns:
+        dict: Flat valuation summary (all currency values in dollars, percentages as 0-100)
+    """
+    graph = ValuationGraph(financials, market_data, adjustments, cost_of_capital)
+    return graph.summary()
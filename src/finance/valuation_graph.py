@@ -0,0 +1,309 @@
+"""
+Incremental Valuation Graph
+
+The EPV summary is a small dependency graph: NOPAT depends on the financials
+and the maintenance percentages, firm EPV on NOPAT and WACC, franchise value on
+firm EPV and reproduction value, and so on. ValuationGraph keeps one memoized
+value per node and recomputes a node only when one of its inputs changed:
+
+- Moving the WACC slider recomputes firm EPV and everything downstream of it,
+  but not normalized earnings, Rule of 40 or reproduction value
+- Moving a maintenance slider recomputes NOPAT and its dependents, but not
+  reproduction value or revenue growth
+- If a recomputed node comes out unchanged, its dependents are not recomputed
+
+The same graph serves the Streamlit UI (one graph per ticker kept in session
+state) and batch sweeps (`sweep` varies one input and reads the outputs).
+"""
+
+import itertools
+
+from src.finance.epv_model import GreenwaldEPV
+
+DEFAULT_COST_OF_CAPITAL = 0.10
+
+INPUTS = (
+    "financials",
+    "market_data",
+    "maintenance_sga_percent",
+    "maintenance_rnd_percent",
+    "cost_of_capital",
+)
+
+# node name -> (dependency names, function of the dependency values)
+NODES = {}
+
+_model = GreenwaldEPV()
+_MISSING = object()
+
+
+def _node(*deps):
+    def register(fn):
+        NODES[fn.__name__] = (deps, fn)
+        return fn
+    return register
+
+
+# --- Earnings ---
+@_node("financials", "maintenance_sga_percent", "maintenance_rnd_percent")
+def normalized_earnings(financials, maint_sga, maint_rnd):
+    return _model.calculate_normalized_earnings(financials, {
+        "maintenance_sga_percent": maint_sga,
+        "maintenance_rnd_percent": maint_rnd,
+    })
+
+
+@_node("normalized_earnings")
+def normalized_ebit(normalized):
+    return normalized["normalized_ebit"]
+
+
+@_node("normalized_earnings")
+def nopat(normalized):
+    return normalized["nopat"]
+
+
+@_node("normalized_earnings")
+def growth_sga(normalized):
+    return normalized["growth_sga"]
+
+
+@_node("normalized_earnings")
+def growth_rnd(normalized):
+    return normalized["growth_rnd"]
+
+
+@_node("financials")
+def reported_ebit(financials):
+    return financials.get("ebit", 0)
+
+
+# --- Rule of 40 ---
+@_node("financials")
+def rev_growth(financials):
+    revenue = financials.get("revenue") or 1  # guard against divide-by-zero
+    prev_revenue = financials.get("prev_revenue") or 1
+    return (revenue - prev_revenue) / prev_revenue * 100
+
+
+@_node("financials")
+def gaap_margin(financials):
+    return financials.get("ebit", 0) / (financials.get("revenue") or 1) * 100
+
+
+@_node("financials", "nopat")
+def adj_margin(financials, nopat_value):
+    return nopat_value / (financials.get("revenue") or 1) * 100
+
+
+@_node("rev_growth", "gaap_margin")
+def rule_of_40_gaap(growth, margin):
+    return _model.calculate_rule_of_40(growth, margin)
+
+
+@_node("rev_growth", "adj_margin")
+def rule_of_40_adj(growth, margin):
+    return _model.calculate_rule_of_40(growth, margin)
+
+
+# --- EPV ---
+@_node("nopat", "cost_of_capital")
+def firm_epv(nopat_value, wacc):
+    return _model.get_epv(nopat_value, wacc)
+
+
+@_node("financials")
+def net_cash(financials):
+    return financials.get("cash", 0) - financials.get("debt", 0)
+
+
+@_node("firm_epv", "financials")
+def equity_epv(firm_value, financials):
+    return _model.calculate_equity_value(firm_value, financials.get("cash", 0), financials.get("debt", 0))
+
+
+@_node("equity_epv", "financials")
+def epv_per_share(equity_value, financials):
+    return equity_value / (financials.get("shares_outstanding") or 1)
+
+
+# --- Moat ---
+@_node("financials")
+def reproduction_value(financials):
+    # Excludes cash to avoid double-counting
+    return _model.calculate_reproduction_value(financials)
+
+
+@_node("firm_epv", "reproduction_value")
+def franchise_value(firm_value, repro_value):
+    return firm_value - repro_value
+
+
+@_node("franchise_value", "firm_epv")
+def franchise_value_pct(franchise, firm_value):
+    return franchise / firm_value * 100 if firm_value else 0.0
+
+
+# --- Market ---
+@_node("market_data")
+def price(market_data):
+    return market_data.get("price") or 0
+
+
+@_node("market_data")
+def market_cap(market_data):
+    return market_data.get("market_cap") or 0
+
+
+@_node("epv_per_share", "price")
+def upside_pct(per_share, current_price):
+    return (per_share - current_price) / current_price * 100 if current_price else 0.0
+
+
+@_node("equity_epv", "market_cap")
+def epv_discount_pct(equity_value, cap):
+    # Positive = market cap below Equity EPV (discount), negative = premium
+    return (equity_value - cap) / equity_value * 100 if equity_value else 0.0
+
+
+# Flat summary returned by value_company, in display order
+SUMMARY_KEYS = (
+    "cost_of_capital",
+    "normalized_ebit",
+    "nopat",
+    "growth_sga",
+    "growth_rnd",
+    "reported_ebit",
+    "rev_growth",
+    "gaap_margin",
+    "adj_margin",
+    "rule_of_40_gaap",
+    "rule_of_40_adj",
+    "firm_epv",
+    "net_cash",
+    "equity_epv",
+    "epv_per_share",
+    "reproduction_value",
+    "franchise_value",
+    "franchise_value_pct",
+    "price",
+    "market_cap",
+    "upside_pct",
+    "epv_discount_pct",
+)
+
+
+class ValuationGraph:
+    """
+    Memoized valuation for one company.
+
+        graph = ValuationGraph(financials, market_data, ai_estimates)
+        graph.set(cost_of_capital=0.09)   # only WACC-dependent nodes go stale
+        graph["equity_epv"]
+
+    Attributes:
+        compute_counts (dict): Times each node has been (re)computed
+    """
+
+    def __init__(self, financials=None, market_data=None, adjustments=None,
+                 cost_of_capital=DEFAULT_COST_OF_CAPITAL):
+        self._versions = itertools.count(1)
+        self._inputs = {}    # input name -> (value, version)
+        self._cache = {}     # node name -> (value, version, dependency versions)
+        self.compute_counts = dict.fromkeys(NODES, 0)
+
+        adjustments = adjustments or {}
+        self.set(
+            financials=financials or {},
+            market_data=market_data or {},
+            maintenance_sga_percent=adjustments.get("maintenance_sga_percent", 1.0),
+            maintenance_rnd_percent=adjustments.get("maintenance_rnd_percent", 1.0),
+            cost_of_capital=cost_of_capital,
+        )
+
+    def set(self, **inputs):
+        """
+        Updates graph inputs. Values equal to the current ones are ignored, so
+        callers can pass every input on each UI rerun.
+
+        Returns:
+            set[str]: Names of the inputs that actually changed
+        """
+        changed = set()
+        for name, value in inputs.items():
+            if name not in INPUTS:
+                raise KeyError(f"Unknown valuation input {name!r}")
+            current = self._inputs.get(name, (_MISSING, 0))[0]
+            if current is not _MISSING and _same(current, value):
+                continue
+            self._inputs[name] = (value, next(self._versions))
+            changed.add(name)
+        return changed
+
+    def set_adjustments(self, adjustments):
+        return self.set(
+            maintenance_sga_percent=adjustments["maintenance_sga_percent"],
+            maintenance_rnd_percent=adjustments["maintenance_rnd_percent"],
+        )
+
+    def get(self, name):
+        if name in self._inputs:
+            return self._inputs[name][0]
+        return self._evaluate(name)[0]
+
+    __getitem__ = get
+
+    def summary(self):
+        """
+        Returns:
+            dict: Flat valuation summary (all currency values in dollars, percentages as 0-100)
+        """
+        return {key: self.get(key) for key in SUMMARY_KEYS}
+
+    def sweep(self, name, values, outputs=SUMMARY_KEYS):
+        """
+        Evaluates the graph for each value of one input, reusing every node
+        that does not depend on it. The input is restored afterwards.
+
+        Returns:
+            list[dict]: One {input, *outputs} row per value
+        """
+        original = self.get(name)
+        rows = []
+        try:
+            for value in values:
+                self.set(**{name: value})
+                rows.append({name: value, **{key: self.get(key) for key in outputs}})
+        finally:
+            self.set(**{name: original})
+        return rows
+
+    # --- Internal helpers ---
+    def _evaluate(self, name):
+        # Returns (value, version); recomputes only if a dependency's version moved
+        deps, fn = NODES[name]
+        dep_states = [self._inputs[d] if d in self._inputs else self._evaluate(d) for d in deps]
+        dep_versions = tuple(version for _, version in dep_states)
+
+        cached = self._cache.get(name)
+        if cached is not None and cached[2] == dep_versions:
+            return cached[0], cached[1]
+
+        value = fn(*(value for value, _ in dep_states))
+        self.compute_counts[name] += 1
+        if cached is not None and _same(cached[0], value):
+            # Early cut-off: unchanged result keeps its version, dependents stay valid
+            version = cached[1]
+        else:
+            version = next(self._versions)
+        self._cache[name] = (value, version, dep_versions)
+        return value, version
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):  # e.g. NumPy arrays
+        return False
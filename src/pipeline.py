@@ -0,0 +1,353 @@
+"""
+End-to-End Analysis Pipeline
+
+Ties the data, AI and finance layers together for one ticker:
+
+1. Fetch financials and the latest 10-K MD&A (SEC EDGAR / FMP / yfinance)
+2. Fetch the market snapshot (price, market cap, company name)
+3. Estimate maintenance vs growth spend from the MD&A with the LLM (or the
+   offline local estimator when no OpenAI key is set / for batch screens)
+4. Compute the EPV valuation summary at the default cost of capital
+
+Results are written to the ResultsStore so the UI can serve them with a single
+read; analyses that fell back to mock data or to placeholder AI estimates are
+never stored. Run as a script to precompute a watchlist:
+
+    python -m src.pipeline SHOP AAPL MSFT
+
+`analyze` / `analyze_many` are the asyncio entry points: steps 1 and 2 run
+concurrently and the spend estimate starts as soon as the MD&A and financials
+are in, so one ticker takes about as long as its slowest dependency chain
+rather than the sum of every call.
+
+`metrics_history` scores the fiscal years the store has collected across
+analyses (Rule of 40, growth, margins and their trends).
+"""
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.ai.local_estimator import estimate_maintenance
+from src.ai.parser import analyze_growth_spend, analyze_growth_spend_streaming
+from src.cache.backends import get_cache
+from src.data.market_data import get_market_snapshot
+from src.data.results_store import ResultsStore, is_mock_record
+from src.data.sec_fetcher import SECFetcher
+from src.finance.metrics import DEFAULT_WINDOW, MetricsEngine
+from src.finance.valuation import DEFAULT_COST_OF_CAPITAL, value_company
+from src.utils import profiling
+from src.utils.singleflight import SingleFlight
+
+# Stored analyses older than this are recomputed on the next request
+DEFAULT_MAX_AGE_SECONDS = float(os.getenv("RESULTS_MAX_AGE_SECONDS", 24 * 60 * 60))
+
+# "auto" = LLM when OPENAI_API_KEY is set, local estimator otherwise; or force "llm" / "local"
+AI_MODES = ("auto", "llm", "local")
+DEFAULT_AI_MODE = os.getenv("AI_ESTIMATOR", "auto")
+
+# Sessions missing the store for the same ticker at once share one pipeline run
+ANALYSIS_FLIGHTS = SingleFlight()
+
+# Tickers analyze_many runs at once; each one keeps up to three blocking calls in flight
+DEFAULT_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", 8))
+# Dedicated pool for the blocking fetch / LLM calls of the async entry points, so a
+# fan-out isn't capped by the event loop's small default executor
+ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=3 * DEFAULT_CONCURRENCY, thread_name_prefix="analysis")
+
+
+def resolve_ai_mode(ai_mode=None):
+    """
+    The estimator ("llm" or "local") a request with `ai_mode` runs right now.
+    """
+    mode = ai_mode or DEFAULT_AI_MODE
+    if mode not in AI_MODES:
+        raise ValueError(f"Unknown AI estimator mode {mode!r}")
+    if mode == "auto":
+        mode = "llm" if os.getenv("OPENAI_API_KEY") else "local"
+    return mode
+
+
+def analysis_settings(ai_mode=None, cost_of_capital=DEFAULT_COST_OF_CAPITAL, **_):
+    """
+    Settings an analysis record depends on, stored with it as record['settings']
+    so a record computed one way is never served for a request made another way.
+    """
+    return {"ai_mode": resolve_ai_mode(ai_mode), "cost_of_capital": cost_of_capital}
+
+
+def estimate_spend(mda_text, financials, ai_mode=None, on_estimate=None, on_reasoning=None, on_local_estimate=None):
+    """
+    Maintenance vs growth spend estimate for one company.
+
+    With on_local_estimate, the local estimate is reported first (milliseconds)
+    as a provisional answer while the LLM runs.
+    """
+    mode = resolve_ai_mode(ai_mode)
+
+    if mode == "local" or on_local_estimate:
+        local = estimate_maintenance(mda_text, financials)
+        if mode == "local":
+            return local
+        on_local_estimate(local)
+
+    if on_estimate or on_reasoning:
+        return analyze_growth_spend_streaming(mda_text, financials, on_estimate=on_estimate, on_reasoning=on_reasoning)
+    return analyze_growth_spend(mda_text, financials)
+
+
+def run_analysis(ticker, cost_of_capital=DEFAULT_COST_OF_CAPITAL, fetcher=None, ai_mode=None, **callbacks):
+    """
+    Runs the full analysis for a ticker without touching the results store.
+
+    `ai_mode` selects the spend estimator (see AI_MODES). Callbacks are passed
+    to estimate_spend: `on_local_estimate` gets the instant offline estimate,
+    `on_estimate` / `on_reasoning` stream the LLM step so callers can show the
+    maintenance percentages before the reasoning has finished.
+
+    Returns:
+        dict: Contains 'ticker', 'financials', 'mda', 'market_data', 'ai_estimates',
+              'valuation' and 'computed_at'
+    """
+    ticker = ticker.strip().upper()
+    fetcher = fetcher or SECFetcher()
+
+    with profiling.profiled(f"analysis-{ticker}"):
+        financials = fetcher.get_financials(ticker)
+        mda = fetcher.get_mda_text(ticker)
+        market_data = get_market_snapshot(ticker)
+        ai_estimates = estimate_spend(mda['text'], financials, ai_mode=ai_mode, **callbacks)
+    return _build_record(ticker, financials, mda, market_data, ai_estimates, cost_of_capital)
+
+
+async def analyze(ticker, cost_of_capital=DEFAULT_COST_OF_CAPITAL, fetcher=None, ai_mode=None, **callbacks):
+    """
+    Async version of run_analysis with the same arguments and record.
+
+    Financials, MD&A and the market snapshot are fetched concurrently on
+    worker threads; the spend estimate (which needs the MD&A and the
+    financials) starts the moment both have arrived, while the quote may still
+    be in flight. Streaming callbacks are called from a worker thread.
+    """
+    ticker = ticker.strip().upper()
+    fetcher = fetcher or SECFetcher()
+
+    async def fetch_and_estimate():
+        mda, financials = await asyncio.gather(
+            _in_thread(fetcher.get_mda_text, ticker),
+            _in_thread(fetcher.get_financials, ticker),
+        )
+        ai_estimates = await _in_thread(estimate_spend, mda['text'], financials, ai_mode=ai_mode, **callbacks)
+        return financials, mda, ai_estimates
+
+    with profiling.profiled(f"analysis-{ticker}"):
+        (financials, mda, ai_estimates), market_data = await asyncio.gather(
+            fetch_and_estimate(),
+            _in_thread(get_market_snapshot, ticker),
+        )
+    return _build_record(ticker, financials, mda, market_data, ai_estimates, cost_of_capital)
+
+
+async def analyze_many(tickers, max_concurrency=DEFAULT_CONCURRENCY, on_loaded=None, **options):
+    """
+    Runs `analyze` for several tickers, at most `max_concurrency` at a time.
+
+    Args:
+        tickers (list[str]): Tickers to analyze (duplicates run once)
+        max_concurrency (int): Tickers in flight at once
+        on_loaded (callable, optional): Called as on_loaded(ticker, record) on
+            the event loop as each ticker finishes
+        **options: Forwarded to analyze (cost_of_capital, fetcher, ai_mode...)
+
+    Returns:
+        dict: Ticker -> analysis record, in the order given
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def bounded(ticker):
+        async with semaphore:
+            record = await analyze(ticker, **options)
+        if on_loaded:
+            on_loaded(ticker, record)
+        return record
+
+    records = await asyncio.gather(*(bounded(ticker) for ticker in tickers))
+    return dict(zip(tickers, records))
+
+
+def load_analysis(ticker, store=None, max_age=DEFAULT_MAX_AGE_SECONDS, **options):
+    """
+    Store-first lookup: returns the stored record for a ticker, computing and
+    persisting it only on a miss (or when the stored record is stale).
+    `ai_mode` and streaming callbacks are forwarded to run_analysis on a miss.
+
+    The store keeps one record per ticker: a stored record computed with other
+    settings (estimator mode, cost of capital; see analysis_settings) counts as
+    a miss and is replaced. Concurrent misses for the same ticker, store and
+    settings run the pipeline once; callers that join an in-flight run get its
+    record but not its streaming callbacks. Before running the pipeline, a miss
+    checks the shared cache backend for a record another replica already computed.
+    """
+    ticker = ticker.strip().upper()
+    store = store or ResultsStore()
+    settings = analysis_settings(**options)
+
+    record = store.get(ticker, max_age=max_age)
+    if record is not None and record.get("settings") == settings:
+        return record
+    key = (ticker, id(store), settings["ai_mode"], settings["cost_of_capital"])
+    return ANALYSIS_FLIGHTS.do(key, _compute_analysis, ticker, store, max_age, settings, options)
+
+
+# AI estimate sources that stand in for a model answer (the LLM failed, or no API key)
+FALLBACK_AI_SOURCES = ("defaults", "simulated")
+
+
+def fallback_reason(record):
+    """
+    Why an analysis must not be persisted or shared (mock provider data, or
+    placeholder AI estimates), or None when it can be.
+    """
+    if is_mock_record(record):
+        return "provider data unavailable (mock fallback)"
+    source = (record.get("ai_estimates") or {}).get("source")
+    if source in FALLBACK_AI_SOURCES:
+        return f"AI estimate unavailable ({source})"
+    return None
+
+
+def _compute_analysis(ticker, store, max_age, settings, options):
+    # Same settings as the ANALYSIS_FLIGHTS key: another estimator or WACC is another analysis
+    shared_key = f"analysis:{ticker}:{settings['ai_mode']}:{settings['cost_of_capital']}"
+    shared = get_cache().get(shared_key)
+    if shared is not None and (max_age is None or time.time() - shared["computed_at"] <= max_age):
+        return store.put(shared)
+
+    record = dict(run_analysis(ticker, **options), settings=settings)
+    if fallback_reason(record):
+        # Fallbacks are served to this caller only, never persisted: the next request retries the providers / LLM
+        return record
+    record = store.put(record)
+    get_cache().set(shared_key, record, max_age)
+    return record
+
+
+def _build_record(ticker, financials, mda, market_data, ai_estimates, cost_of_capital):
+    return {
+        "ticker": ticker,
+        "financials": dict(financials),
+        "mda": mda,
+        "market_data": market_data,
+        "ai_estimates": ai_estimates,
+        "valuation": value_company(financials, market_data, ai_estimates, cost_of_capital),
+        "computed_at": time.time(),
+    }
+
+
+def _in_thread(fn, *args, **kwargs):
+    # Like asyncio.to_thread (context variables included), on ANALYSIS_EXECUTOR
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return asyncio.get_running_loop().run_in_executor(ANALYSIS_EXECUTOR, call)
+
+
+def load_analyses(tickers, store=None, max_workers=8, on_loaded=None, **options):
+    """
+    Loads several tickers concurrently (store hits return immediately, misses
+    run the full pipeline on worker threads).
+
+    Args:
+        tickers (list[str]): Tickers to load
+        on_loaded (callable, optional): Called as on_loaded(ticker, record) in
+            the caller's thread as each ticker finishes, e.g. to advance a progress bar
+        **options: Forwarded to load_analysis (max_age, ai_mode...)
+
+    Returns:
+        dict: Ticker -> analysis record, in the order given
+    """
+    store = store or ResultsStore()
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+    records = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        futures = {pool.submit(load_analysis, ticker, store=store, **options): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            records[ticker] = future.result()
+            if on_loaded:
+                on_loaded(ticker, records[ticker])
+    return {ticker: records[ticker] for ticker in tickers}
+
+
+def metrics_history(tickers=None, store=None, adjustments=None, window=DEFAULT_WINDOW):
+    """
+    Scores the fiscal-year history the store has collected (see
+    ResultsStore.history) with MetricsEngine.
+
+    Args:
+        tickers (list[str], optional): Restrict to these tickers (default: all)
+        adjustments (dict, optional): ticker -> maintenance estimates for the
+            adjusted metrics (default: each ticker's stored AI estimates)
+        window (int): Periods per rolling average / trend
+
+    Returns:
+        MetricsEngine: Read the results with .frame() or .latest()
+    """
+    store = store or ResultsStore()
+    engine = MetricsEngine(freq="annual", window=window).extend(store.history(tickers))
+    if adjustments is None:
+        adjustments = {record["ticker"]: record["ai_estimates"] for record in store.iter_records(tickers)
+                       if record.get("ai_estimates")}
+    engine.set_adjustments(adjustments)
+    return engine
+
+
+def refresh(tickers, store=None, ai_mode=None, max_concurrency=DEFAULT_CONCURRENCY):
+    """
+    Recomputes and stores the analysis for every ticker in the watchlist,
+    `max_concurrency` tickers at a time.
+    """
+    store = store or ResultsStore()
+
+    def stored(ticker, record):
+        reason = fallback_reason(record)
+        if reason:
+            print(f"⚠️ {record['ticker']}: {reason}, not stored")
+            return
+        record = store.put(dict(record, settings=analysis_settings(ai_mode=ai_mode)))
+        print(f"✓ {record['ticker']}: Equity EPV ${record['valuation']['equity_epv']/1e9:.1f}B")
+
+    # One profile for the whole run: concurrent tickers share the sampled threads
+    with profiling.profiled("refresh"):
+        records = asyncio.run(analyze_many(tickers, max_concurrency=max_concurrency, on_loaded=stored, ai_mode=ai_mode))
+    return list(records.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute EPV analyses into the results store.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to refresh (defaults to $WATCHLIST)")
+    parser.add_argument("--store", default=None, help="Path to the results database")
+    parser.add_argument("--ai", choices=AI_MODES, default=None,
+                        help="Spend estimator: LLM, offline local model, or auto (default: $AI_ESTIMATOR or auto)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Tickers analyzed at once (default: $ANALYSIS_CONCURRENCY or 8)")
+    parser.add_argument("--profile", choices=profiling.PROFILE_MODES, default=None,
+                        help="Profile the run and write speedscope/flamegraph output to $EPV_PROFILE_DIR "
+                             "(default: $EPV_PROFILE, off)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable(args.profile)
+
+    tickers = args.tickers or [t for t in os.getenv("WATCHLIST", "").replace(",", " ").split() if t]
+    if not tickers:
+        parser.error("No tickers given and $WATCHLIST is empty")
+
+    refresh(tickers, store=ResultsStore(args.store), ai_mode=args.ai, max_concurrency=args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
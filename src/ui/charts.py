@@ -0,0 +1,57 @@
+"""
+Dashboard Charts
+
+Plotly figure builders for the Earnings Analysis section. They take only the
+plotted values (in $B), so the app can cache figures by those values and skip
+rebuilding a chart whose numbers did not change.
+"""
+
+from src.utils.lazy import lazy_import
+
+px = lazy_import("plotly.express")
+pd = lazy_import("pandas")
+
+
+def earnings_figure(reported_ebit_b, normalized_ebit_b):
+    earnings_df = pd.DataFrame({
+        "Metric": ["Reported EBIT", "Normalized EBIT"],
+        "Amount ($B)": [reported_ebit_b, normalized_ebit_b]
+    })
+    fig = px.bar(
+        earnings_df,
+        x="Metric",
+        y="Amount ($B)",
+        color="Metric",
+        color_discrete_map={"Reported EBIT": "#FF3B30", "Normalized EBIT": "#007AFF"},
+        text_auto='.1f'
+    )
+    return _apply_layout(fig)
+
+
+def valuation_gap_figure(market_cap_b, equity_epv_b):
+    val_df = pd.DataFrame({
+        "Metric": ["Market Cap", "Equity EPV"],
+        "Value ($B)": [market_cap_b, equity_epv_b]
+    })
+    fig = px.bar(
+        val_df,
+        x="Metric",
+        y="Value ($B)",
+        color="Metric",
+        color_discrete_map={"Market Cap": "#8E8E93", "Equity EPV": "#34C759"},
+        text_auto='.1f'
+    )
+    return _apply_layout(fig)
+
+
+def _apply_layout(fig):
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_family="-apple-system, BlinkMacSystemFont, sans-serif",
+        showlegend=False,
+        margin=dict(l=20, r=20, t=30, b=20),
+        yaxis=dict(showgrid=True, gridcolor="#E5E5E5"),
+        xaxis=dict(showgrid=False)
+    )
+    return fig
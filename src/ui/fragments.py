@@ -0,0 +1,80 @@
+"""
+Dashboard Fragments
+
+Helpers for splitting the dashboard into Streamlit fragments:
+
+- timed_fragment: st.fragment plus wall-clock timing of every (re)run, kept in
+  session state per fragment name
+- render_timings: table of last / mean / max render time per fragment, shown
+  when SHOW_RENDER_TIMINGS=1
+
+A fragment reruns on its own when a widget inside it changes; on a full app
+rerun every fragment runs again, so the expensive pieces inside them (figures,
+valuation graph) are cached separately.
+"""
+
+import functools
+import os
+import time
+
+import streamlit as st
+
+TIMINGS_KEY = "render_timings"
+SHOW_TIMINGS = os.getenv("SHOW_RENDER_TIMINGS", "").lower() in ("1", "true", "yes")
+
+
+def timed_fragment(fn=None, *, name=None):
+    """
+    Decorator: turns a render function into a timed st.fragment.
+
+        @timed_fragment
+        def render_charts(valuation): ...
+    """
+    def decorate(fn):
+        label = name or fn.__name__.removeprefix("render_")
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_timing(label, time.perf_counter() - start)
+
+        return st.fragment(timed)
+
+    return decorate(fn) if fn is not None else decorate
+
+
+def record_timing(name, seconds):
+    timings = st.session_state.setdefault(TIMINGS_KEY, {})
+    entry = timings.setdefault(name, {"runs": 0, "last_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0})
+    elapsed_ms = seconds * 1000
+    entry["runs"] += 1
+    entry["last_ms"] = elapsed_ms
+    entry["total_ms"] += elapsed_ms
+    entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+
+def timing_rows():
+    """
+    Returns:
+        list[dict]: One row per fragment with runs and last / mean / max milliseconds
+    """
+    return [
+        {
+            "fragment": name,
+            "runs": entry["runs"],
+            "last_ms": round(entry["last_ms"], 1),
+            "mean_ms": round(entry["total_ms"] / entry["runs"], 1),
+            "max_ms": round(entry["max_ms"], 1),
+        }
+        for name, entry in st.session_state.get(TIMINGS_KEY, {}).items()
+    ]
+
+
+def render_timings():
+    if not SHOW_TIMINGS:
+        return
+    with st.expander("Render Timings", expanded=False):
+        st.dataframe(timing_rows(), hide_index=True, width='stretch')
@@ -0,0 +1,66 @@
+"""
+Lazy Module Imports
+
+Heavy third-party packages (pandas, yfinance, plotly.express, requests) add
+hundreds of milliseconds to interpreter start-up even when a code path never
+touches them. lazy_import returns a module placeholder that only executes the
+real import on first attribute access, so
+
+    yf = lazy_import("yfinance")
+
+at module level costs nothing until yf.Ticker(...) is actually called.
+
+The placeholder forwards attribute reads, writes and deletes to the real module,
+so unittest.mock.patch('src.data.sec_fetcher.yf.Ticker') keeps working, and the
+first load goes through importlib's per-module lock, so concurrent first use
+from worker threads is safe.
+"""
+
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    def _load(self):
+        module = self.__dict__.get("_lazy_target")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if "_lazy_target" in self.__dict__ else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """
+    Returns the module `name`, deferring its execution until first use.
+
+    Already-imported modules are returned as-is. A package that is not
+    installed raises ModuleNotFoundError immediately, like a normal import; a
+    missing submodule of an installed package only fails on first use, since
+    locating it would execute the parent package.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    # find_spec("pyarrow.csv") imports pyarrow (and numpy); the top-level lookup imports nothing
+    package = name.partition(".")[0]
+    if importlib.util.find_spec(package) is None:
+        raise ModuleNotFoundError(f"No module named {package!r}", name=package)
+    return _LazyModule(name)
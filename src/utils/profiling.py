@@ -0,0 +1,372 @@
+"""
+Profiling Hooks
+
+Opt-in profiling of whole analyses, for when a ticker takes far longer than
+it should and the ⚠️ log lines don't say where the time went:
+
+    EPV_PROFILE=sample python -m src.pipeline SHOP
+    python -m src.pipeline SHOP --profile cprofile
+    EPV_PROFILE=sample EPV_PROFILE_MIN_SECONDS=20 streamlit run main.py
+
+Modes:
+
+- sample    A background thread samples every thread's stack each
+            EPV_PROFILE_INTERVAL seconds (default 5 ms). Covers the worker
+            threads the fetchers and async pipeline run on.
+- cprofile  Deterministic cProfile of the calling thread (exact call counts,
+            higher overhead, misses work done on other threads).
+
+Each profile of at least EPV_PROFILE_MIN_SECONDS is written to
+EPV_PROFILE_DIR (default .cache/profiles):
+
+- <name>.speedscope.json   sample: open at https://www.speedscope.app
+- <name>.folded            sample: folded stacks for flamegraph.pl / inferno
+- <name>.pstats            cprofile: python -m pstats, snakeviz
+- <name>.txt               time per module (data.sec_fetcher, ai.parser,
+                           finance.epv_model, main...) and the slowest functions
+
+Sampled time is attributed to the innermost project frame, so a slow SEC
+download counts against data.sec_fetcher rather than requests/ssl.
+
+Disabled (the default), `profiled()` returns a shared no-op context manager:
+no profiler, thread or hook is installed.
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import defaultdict
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_DIR = os.getenv("EPV_PROFILE_DIR", os.path.join(".cache", "profiles"))
+PROFILE_MIN_SECONDS = float(os.getenv("EPV_PROFILE_MIN_SECONDS", 0))
+SAMPLE_INTERVAL = float(os.getenv("EPV_PROFILE_INTERVAL", 0.005))
+TOP_FUNCTIONS = 25
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB = os.path.abspath(sysconfig.get_paths()["stdlib"])
+_LIBRARY_DIRS = ("site-packages", "dist-packages")
+# Leaf frames of a thread blocked on another thread; that time is counted where the other thread is
+_THREAD_WAITS = {("threading", "Condition.wait"), ("threading", "Event.wait"), ("threading", "Thread.join"),
+                 ("threading", "Semaphore.acquire"), ("concurrent.futures._base", "Future.result")}
+_NOOP = contextlib.nullcontext()
+
+
+def _mode_from_env(value):
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "false"):
+        return None
+    if value in ("1", "on", "true"):
+        return "sample"
+    if value not in PROFILE_MODES:
+        print(f"⚠️ Unknown EPV_PROFILE mode {value!r}; profiling disabled")
+        return None
+    return value
+
+
+_mode = _mode_from_env(os.getenv("EPV_PROFILE"))
+_active_lock = threading.Lock()
+_active = False
+
+
+def enable(mode="sample"):
+    """
+    Turns profiling on for every later `profiled()` block (e.g. from a CLI flag).
+    """
+    global _mode
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Profiling mode must be one of {PROFILE_MODES}, got {mode!r}")
+    _mode = mode
+
+
+def disable():
+    global _mode
+    _mode = None
+
+
+def profiling_mode():
+    return _mode
+
+
+def profiled(name, mode=None, out_dir=None, min_seconds=None):
+    """
+    Context manager profiling its block when profiling is enabled.
+
+    Args:
+        name (str): Prefix of the output files, e.g. "analysis-SHOP"
+        mode (str, optional): "sample" or "cprofile" (default: the enabled mode)
+        out_dir (str, optional): Output directory (default: PROFILE_DIR)
+        min_seconds (float, optional): Keep the profile only if the block took
+            at least this long (default: PROFILE_MIN_SECONDS)
+
+    Blocks nested inside (or concurrent with) an active profile are not
+    profiled separately; the outer profile already sees them.
+    """
+    mode = mode or _mode
+    if mode is None:
+        return _NOOP
+    return _Profile(name, mode, out_dir or PROFILE_DIR,
+                    PROFILE_MIN_SECONDS if min_seconds is None else min_seconds)
+
+
+def module_label(filename):
+    """
+    Short module name for a source file: "data.sec_fetcher" for project files
+    under src/, "main" for main.py, the top-level package for libraries
+    ("requests", "yfinance") and the dotted module for the standard library
+    ("concurrent.futures.thread"). Built-ins and frozen modules keep cProfile's
+    / CPython's pseudo-filenames ("~", "<frozen os>").
+    """
+    if filename == "~" or filename.startswith("<"):
+        return filename
+    path = os.path.abspath(filename)
+    parts = path.split(os.sep)
+    for marker in _LIBRARY_DIRS:
+        if marker in parts:
+            index = len(parts) - 1 - parts[::-1].index(marker)
+            return _strip_py(parts[index + 1]) if index + 1 < len(parts) else marker
+    for root, prefix in ((_PROJECT_ROOT, "src."), (_STDLIB, "")):
+        if path.startswith(root + os.sep):
+            relative = _strip_py(os.path.relpath(path, root)).replace(os.sep, ".")
+            relative = relative[:-len(".__init__")] if relative.endswith(".__init__") else relative
+            return relative[len(prefix):] if prefix and relative.startswith(prefix) else relative
+    return _strip_py(os.path.basename(path))
+
+
+class Sampler:
+    """
+    Wall-clock stack sampler for all threads.
+
+    Attributes:
+        stacks (dict): (thread name, frames root->leaf) -> [samples, seconds];
+            a frame is (module label, qualified name, filename, first line, is project code)
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = defaultdict(lambda: [0, 0.0])
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._frames = {}  # code object -> frame tuple
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                # Idle pool workers have no project frame: skip them
+                if any(f[4] for f in stack):
+                    entry = self.stacks[(names.get(ident, str(ident)), stack)]
+                    entry[0] += 1
+                    entry[1] += elapsed
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            entry = self._frames.get(code)
+            if entry is None:
+                entry = self._frames[code] = (
+                    module_label(code.co_filename), code.co_qualname, code.co_filename, code.co_firstlineno,
+                    _is_project(code.co_filename),
+                )
+            stack.append(entry)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    # --- Output ---
+    def folded(self):
+        """
+        Folded stacks ("thread;frame;frame count" per line).
+        """
+        lines = []
+        for (thread, stack), (samples, _) in sorted(self.stacks.items(), key=lambda item: -item[1][0]):
+            frames = ";".join(_frame_name(frame).replace(";", ":") for frame in stack)
+            lines.append(f"{thread};{frames} {samples}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name):
+        """
+        speedscope file-format document: one sampled profile per thread,
+        weighted in seconds.
+        """
+        frames, index = [], {}
+        profiles = {}
+        for (thread, stack), (_, seconds) in self.stacks.items():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": _frame_name(frame), "file": frame[2], "line": frame[3]})
+                sample.append(index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "seconds", "startValue": 0,
+                "endValue": 0.0, "samples": [], "weights": [],
+            })
+            profile["samples"].append(sample)
+            profile["weights"].append(seconds)
+            profile["endValue"] += seconds
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "src.utils.profiling",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def summary(self, top=TOP_FUNCTIONS):
+        """
+        Text report: seconds per module (innermost project frame) and the
+        slowest functions by inclusive and self time.
+        """
+        by_module = defaultdict(float)
+        inclusive = defaultdict(float)
+        own = defaultdict(float)
+        waiting = 0.0
+        for (_, stack), (_, seconds) in self.stacks.items():
+            if (stack[-1][0], stack[-1][1]) in _THREAD_WAITS:
+                waiting += seconds
+                continue
+            project = [frame for frame in stack if frame[4]]
+            by_module[project[-1][0]] += seconds
+            for frame in set(stack):
+                inclusive[frame] += seconds
+            own[stack[-1]] += seconds
+
+        total = sum(by_module.values()) or 1.0
+        lines = [f"Sampled {self.duration:.2f}s wall clock: {sum(by_module.values()):.2f}s of thread time "
+                 f"in project code, {waiting:.2f}s waiting on other threads (not counted below)", "",
+                 "Time by module (innermost project frame):"]
+        for module, seconds in sorted(by_module.items(), key=lambda item: -item[1]):
+            lines.append(f"  {seconds:8.2f}s {seconds / total:6.1%}  {module}")
+        lines += ["", f"Slowest functions (top {top}):", f"  {'inclusive':>9} {'self':>8}  function"]
+        for frame, seconds in sorted(inclusive.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {seconds:8.2f}s {own.get(frame, 0.0):7.2f}s  {_frame_name(frame)}")
+        return "\n".join(lines) + "\n"
+
+
+def cprofile_summary(profile, top=TOP_FUNCTIONS):
+    """
+    Text report for a cProfile run: self time per module and the slowest
+    functions by cumulative time.
+    """
+    stats = pstats.Stats(profile)
+    by_module = defaultdict(float)
+    for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+        by_module[module_label(filename)] += tottime
+
+    total = stats.total_tt or 1.0
+    lines = [f"cProfile: {stats.total_tt:.2f}s in the profiled thread", "", "Self time by module:"]
+    for module, seconds in sorted(by_module.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {seconds:8.2f}s {seconds / total:6.1%}  {module}")
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats("cumulative").print_stats(top)
+    lines += ["", f"Slowest functions (top {top} by cumulative time):", buffer.getvalue().strip()]
+    return "\n".join(lines) + "\n"
+
+
+# --- Internal helpers ---
+class _Profile:
+    def __init__(self, name, mode, out_dir, min_seconds):
+        self.name = name
+        self.mode = mode
+        self.out_dir = out_dir
+        self.min_seconds = min_seconds
+        self.paths = []
+        self._profiler = None
+
+    def __enter__(self):
+        global _active
+        with _active_lock:
+            if _active:
+                return self
+            _active = True
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = Sampler().start()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        if self._profiler is None:
+            return False
+        try:
+            if self.mode == "cprofile":
+                self._profiler.disable()
+            else:
+                self._profiler.stop()
+            duration = time.perf_counter() - self._started
+            if duration >= self.min_seconds:
+                self._write(duration)
+        finally:
+            with _active_lock:
+                _active = False
+        return False
+
+    def _write(self, duration):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stem = os.path.join(self.out_dir, f"{_safe_name(self.name)}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if self.mode == "cprofile":
+            self._profiler.dump_stats(stem + ".pstats")
+            summary = cprofile_summary(self._profiler)
+            self.paths = [stem + ".pstats", stem + ".txt"]
+        else:
+            with open(stem + ".speedscope.json", "w") as fh:
+                json.dump(self._profiler.speedscope(self.name), fh)
+            with open(stem + ".folded", "w") as fh:
+                fh.write(self._profiler.folded())
+            summary = self._profiler.summary()
+            self.paths = [stem + ".speedscope.json", stem + ".folded", stem + ".txt"]
+        with open(stem + ".txt", "w") as fh:
+            fh.write(f"{self.name}: {duration:.2f}s\n\n{summary}")
+        print(f"✓ Profile of {self.name} ({duration:.1f}s) written to {stem}.*")
+
+
+def _is_project(filename):
+    if filename == "~" or filename.startswith("<"):
+        return False
+    path = os.path.abspath(filename)
+    return (path.startswith(_PROJECT_ROOT + os.sep) and path != os.path.abspath(__file__)
+            and not any(marker in path.split(os.sep) for marker in _LIBRARY_DIRS))
+
+
+def _frame_name(frame):
+    return f"{frame[1]} ({frame[0]})"
+
+
+def _strip_py(name):
+    return name[:-3] if name.endswith(".py") else name
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
@@ -0,0 +1,191 @@
+"""
+Retry Policies
+
+One retry engine for every flaky call (yfinance, FMP, SEC, the LLM) in place
+of hard-coded `time.sleep` loops:
+
+- Error classification: only transient failures are retried. Connection
+  errors, timeouts, HTTP 408/425/429/5xx and rate-limit errors are retried;
+  NonRetryableError (unknown ticker, provider has no data), other HTTP 4xx
+  and anything unrecognised (KeyError/TypeError from a parsing bug) fail on
+  the first attempt. A caller whose upstream can return malformed payloads
+  that a fresh attempt may fix opts in with `classify=retry_also(ValueError)`
+- Exponential backoff with full jitter, capped at `max_delay`, so replicas
+  retrying the same outage don't synchronize
+- A total deadline per call: no retry is started that could not finish in time
+- `Retry-After` (seconds or HTTP date) on a 429/503 is honoured as the
+  minimum wait; if it lies beyond the deadline the call gives up immediately
+- `call` sleeps the calling thread; `call_async` awaits asyncio.sleep instead
+
+    FETCH_RETRY = RetryPolicy(name="yfinance", max_attempts=3, deadline=20)
+    financials = FETCH_RETRY.call(fetch_once, ticker)
+
+When the policy gives up, the last error is re-raised unchanged.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, OSError)
+# Client libraries with their own exception trees (openai, httpx) are matched by class name
+TRANSIENT_NAME_PARTS = ("RateLimit", "Timeout", "Connect")
+
+
+class NonRetryableError(Exception):
+    """A failure that retrying cannot fix, e.g. an unknown ticker."""
+
+
+def status_code(error):
+    """
+    HTTP status carried by a requests / OpenAI / httpx-style error, or None.
+    """
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(error):
+    """
+    Seconds requested by the error response's Retry-After header, or None.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+    except AttributeError:
+        return None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """
+    Default classification (see module docstring).
+    """
+    if isinstance(error, NonRetryableError):
+        return False
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    name = type(error).__name__
+    return any(part in name for part in TRANSIENT_NAME_PARTS)
+
+
+def retry_also(*error_types):
+    """
+    Classifier that also retries `error_types` on top of `is_retryable`.
+
+        LLM_RETRY = RetryPolicy(classify=retry_also(ValueError))  # malformed JSON
+
+    NonRetryableError is never retried, even when it subclasses one of the types.
+    """
+    def classify(error):
+        if isinstance(error, error_types) and not isinstance(error, NonRetryableError):
+            return True
+        return is_retryable(error)
+    return classify
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Attributes:
+        name (str): Shown in retry warnings
+        max_attempts (int): Attempts including the first
+        base_delay (float): Backoff ceiling for the first retry, in seconds
+        multiplier (float): Ceiling growth per retry
+        max_delay (float): Cap on a single backoff
+        deadline (float): Total seconds for all attempts and waits (None = no limit)
+        max_retry_after (float): Longest Retry-After the policy will wait out
+        jitter (bool): Full jitter (uniform in [0, ceiling]) instead of the ceiling itself
+        classify (callable): error -> bool, whether another attempt may help
+        log (bool): Print a warning before each retry
+    """
+
+    name: str = "call"
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    multiplier: float = 2.0
+    max_delay: float = 8.0
+    deadline: float = None
+    max_retry_after: float = 60.0
+    jitter: bool = True
+    classify: object = is_retryable
+    log: bool = True
+
+    def with_options(self, **changes):
+        return replace(self, **changes)
+
+    def backoff(self, retry_number, error=None):
+        """
+        Wait before retry `retry_number` (1 = first retry).
+        """
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry_number - 1))
+        delay = random.uniform(0, ceiling) if self.jitter else ceiling
+        requested = retry_after(error) if error is not None else None
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_retry_after))
+        return delay
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Calls fn(*args, **kwargs), retrying per the policy; blocks between attempts.
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as error:
+                delay = self._next_delay(error, attempt, started)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, fn, *args, **kwargs):
+        """
+        Async version of `call`: awaits coroutine functions directly, runs
+        blocking ones on a worker thread, and waits with asyncio.sleep.
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                if inspect.iscoroutinefunction(fn):
+                    return await fn(*args, **kwargs)
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            except Exception as error:
+                delay = self._next_delay(error, attempt, started)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _next_delay(self, error, attempt, started):
+        # Seconds to wait before the next attempt, or None to give up
+        if attempt >= self.max_attempts or not self.classify(error):
+            return None
+        delay = self.backoff(attempt, error)
+        if self.deadline is not None and time.monotonic() - started + delay >= self.deadline:
+            return None
+        if self.log:
+            print(f"⚠️ {self.name} attempt {attempt} failed: {error}. Retrying in {delay:.1f}s")
+        return delay
@@ -0,0 +1,132 @@
+"""
+Single-Flight Request Coalescing
+
+When several callers ask for the same resource at the same time (e.g. a dozen
+Streamlit sessions opening one ticker at market open), only the first caller
+(the leader) runs the fetch; everyone else with the same key waits for the
+leader's result instead of firing a duplicate SEC / market data / LLM call.
+
+    _FLIGHTS = SingleFlight()
+    financials = _FLIGHTS.do(("financials", ticker), fetch, ticker)
+
+- Works across threads (`do`) and asyncio tasks (`do_async`), sharing one key
+  space: an async caller can join a fetch a worker thread started and vice versa
+- Exceptions raised by the leader are re-raised in every waiter
+- Only in-flight calls are shared; once the leader finishes the key is free
+  again, so this never serves stale results (caching is the results store's job)
+- Waiters receive the same result object; treat it as read-only
+- Cancelling an awaiting task only cancels that caller, never the shared work
+
+Inside an event loop always use `do_async`: a blocking `do` there would stall
+the loop that is supposed to finish the fetch.
+
+Batch callers that fetch many keys in one go (one download pool, one parse
+pool) use `claim` / `resolve` instead of a `do` per key:
+
+    future, leader = _FLIGHTS.claim(("mda", ticker))
+    ...
+    _FLIGHTS.resolve(("mda", ticker), future, result=mda)  # leaders only
+"""
+
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+
+
+class SingleFlight:
+    """
+    Group of coalesced calls, keyed by any hashable value.
+
+    Attributes:
+        leaders (int): Calls that actually ran
+        shared (int): Calls that joined an in-flight call instead of running
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> concurrent.futures.Future of the in-flight call
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) unless a call with the same key is already in
+        flight, in which case blocks until it finishes and returns its result.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, exception=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Awaitable version of `do`. `fn` may be a coroutine function (awaited on
+        this loop) or a blocking function (run with asyncio.to_thread).
+        """
+        future, leader = self._join(key)
+        if leader:
+            if inspect.iscoroutinefunction(fn):
+                work = fn(*args, **kwargs)
+            else:
+                work = asyncio.to_thread(fn, *args, **kwargs)
+            # The task settles the shared future even if the leader itself is cancelled
+            task = asyncio.ensure_future(work)
+            task.add_done_callback(lambda t: self._settle(key, future, t))
+        return await asyncio.wrap_future(future)
+
+    def claim(self, key):
+        """
+        `do` split in two for batch callers. Returns (future, leader): a leader
+        must settle the call with `resolve` once its batch is done, even on
+        failure; anyone else waits on future.result().
+        """
+        return self._join(key)
+
+    def resolve(self, key, future, result=None, exception=None):
+        """
+        Settles a claimed call with its result (or exception) and frees the key.
+        """
+        self._finish(key, future, result=result, exception=exception)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    # --- Internal helpers ---
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = concurrent.futures.Future()
+            # RUNNING futures can't be cancelled, so a cancelled waiter
+            # (wrap_future propagates cancellation) can't cancel it for everyone
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, exception=None):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _settle(self, key, future, task):
+        if task.cancelled():
+            self._finish(key, future, exception=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, exception=task.exception())
+        else:
+            self._finish(key, future, result=task.result())
@@ -0,0 +1,6 @@
+import os
+
+
+def pytest_configure(config):
+    # Before collection imports src.ai.telemetry: keep simulated test calls out of the developer's real LLM log
+    os.environ["LLM_TELEMETRY_PATH"] = "off"
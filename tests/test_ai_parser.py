@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import json
-from src.ai.parser import analyze_growth_spend
+from src.ai.client import SIMULATED_RESPONSE
+from src.ai.parser import EstimateStreamParser, MalformedStreamError, analyze_growth_spend, analyze_growth_spend_streaming
+from src.cache.backends import MemoryCache, set_cache
 
 class TestAIParser(unittest.TestCase):
     def setUp(self):
@@ -25,6 +27,11 @@ class TestAIParser(unittest.TestCase):
         self.assertEqual(result['maintenance_sga_percent'], 0.15)
         self.assertEqual(result['maintenance_rnd_percent'], 0.25)
         self.assertEqual(result['reasoning'], "Growth focus.")
+        self.assertEqual(result['source'], "llm")
+
+    @patch('src.ai.parser.get_llm_response', return_value=SIMULATED_RESPONSE)
+    def test_simulated_response_is_labelled(self, mock_get_llm_response):
+        self.assertEqual(analyze_growth_spend(self.mda_text, self.financials)['source'], "simulated")
 
     @patch('src.ai.parser.get_llm_response')
     def test_analyze_growth_spend_json_cleanup(self, mock_get_llm_response):
@@ -54,6 +61,7 @@ class TestAIParser(unittest.TestCase):
         self.assertEqual(result['maintenance_sga_percent'], 0.20)
         self.assertEqual(result['maintenance_rnd_percent'], 0.20)
         self.assertIn("AI Unavailable", result['reasoning'])
+        self.assertEqual(result['source'], "defaults")
 
     @patch('src.ai.parser.get_llm_response')
     def test_analyze_growth_spend_bad_json(self, mock_get_llm_response):
@@ -65,5 +73,113 @@ class TestAIParser(unittest.TestCase):
         # Should fallback to defaults
         self.assertIn("AI Unavailable", result['reasoning'])
 
+    @patch('src.ai.parser.stream_llm_response')
+    def test_streaming_surfaces_estimates_before_reasoning(self, mock_stream):
+        response = json.dumps({
+            "maintenance_sga_percent": 0.15,
+            "maintenance_rnd_percent": 0.25,
+            "reasoning": "NRR of 125% means most S&M drives expansion."
+        })
+        chunks = [response[i:i + 5] for i in range(0, len(response), 5)]
+        mock_stream.return_value = (chunk for chunk in chunks)
+        events = []
+
+        result = analyze_growth_spend_streaming(
+            self.mda_text, self.financials,
+            on_estimate=lambda key, value: events.append((key, value)),
+            on_reasoning=lambda text: events.append(("reasoning", text))
+        )
+
+        self.assertEqual(result['maintenance_rnd_percent'], 0.25)
+        self.assertEqual(events[:2], [("maintenance_sga_percent", 0.15), ("maintenance_rnd_percent", 0.25)])
+        reasoning_updates = [text for kind, text in events if kind == "reasoning"]
+        self.assertGreater(len(reasoning_updates), 1)
+        self.assertTrue(result['reasoning'].startswith(reasoning_updates[-1]))
+
+    @patch('src.utils.retry.time.sleep')
+    @patch('src.ai.parser.stream_llm_response')
+    def test_streaming_aborts_early_on_malformed_output(self, mock_stream, mock_sleep):
+        consumed = []
+
+        def refusal():
+            for chunk in ["I'm sorry, ", "I cannot ", "help with ", "that."]:
+                consumed.append(chunk)
+                yield chunk
+
+        mock_stream.side_effect = lambda **kwargs: refusal()
+
+        result = analyze_growth_spend_streaming(self.mda_text, self.financials)
+
+        self.assertIn("AI Unavailable", result['reasoning'])
+        self.assertEqual(mock_stream.call_count, 3)
+        self.assertEqual(len(consumed), 3)  # one chunk per attempt
+
+    @patch('src.utils.retry.time.sleep')
+    @patch('src.ai.parser.stream_llm_response')
+    def test_streaming_retracts_a_failed_attempt(self, mock_stream, mock_sleep):
+        # The first answer streams valid percentages, then breaks off mid-reasoning
+        truncated = '{"maintenance_sga_percent": 0.9, "maintenance_rnd_percent": 0.8, "reasoning": "Mostly'
+        valid = json.dumps({"maintenance_sga_percent": 0.15, "maintenance_rnd_percent": 0.25, "reasoning": "Growth."})
+        mock_stream.side_effect = [(chunk for chunk in [truncated]), (chunk for chunk in [valid])]
+        events = []
+
+        result = analyze_growth_spend_streaming(
+            self.mda_text, self.financials,
+            on_estimate=lambda key, value: events.append((key, value)),
+            on_reasoning=lambda text: events.append(("reasoning", text))
+        )
+
+        self.assertEqual(result['maintenance_sga_percent'], 0.15)
+        self.assertEqual(events, [
+            ("maintenance_sga_percent", 0.9), ("maintenance_rnd_percent", 0.8), ("reasoning", "Mostly"),
+            ("maintenance_sga_percent", None), ("maintenance_rnd_percent", None), ("reasoning", ""),
+            ("maintenance_sga_percent", 0.15), ("maintenance_rnd_percent", 0.25), ("reasoning", "Growth."),
+        ])
+
+    @patch('src.ai.parser.stream_llm_response')
+    def test_streaming_estimates_arrive_before_the_stream_ends(self, mock_stream):
+        events = []
+        chunks = ['{"maintenance_sga_percent": 0.15, ', '"maintenance_rnd_percent": 0.25, ',
+                  '"reasoning": "NRR of 125%', ' means most S&M', ' drives expansion."}']
+
+        def stream():
+            for i, chunk in enumerate(chunks):
+                events.append(("chunk", i))
+                yield chunk
+            events.append(("end", None))
+
+        mock_stream.side_effect = lambda **kwargs: stream()
+        analyze_growth_spend_streaming(self.mda_text, self.financials,
+                                       on_estimate=lambda key, value: events.append((key, value)))
+
+        self.assertLess(events.index(("maintenance_sga_percent", 0.15)), events.index(("chunk", 1)))
+        self.assertLess(events.index(("maintenance_rnd_percent", 0.25)), events.index(("chunk", 2)))
+        self.assertEqual(events[-1], ("end", None))
+
+    @patch('src.ai.parser.stream_llm_response')
+    @patch('src.ai.parser.get_llm_response')
+    def test_streaming_shares_the_estimate_cache(self, mock_get, mock_stream):
+        previous = set_cache(MemoryCache())
+        self.addCleanup(set_cache, previous)
+        mock_get.return_value = json.dumps({
+            "maintenance_sga_percent": 0.15, "maintenance_rnd_percent": 0.25, "reasoning": "Growth."
+        })
+        events = []
+
+        first = analyze_growth_spend(self.mda_text, self.financials)
+        second = analyze_growth_spend_streaming(self.mda_text, self.financials,
+                                                on_estimate=lambda key, value: events.append((key, value)))
+
+        self.assertEqual(second, first)
+        mock_stream.assert_not_called()
+        self.assertEqual(events, [("maintenance_sga_percent", 0.15), ("maintenance_rnd_percent", 0.25)])
+
+    def test_stream_parser_rejects_out_of_range_percent(self):
+        parser = EstimateStreamParser()
+        parser.feed('```json\n{"maintenance_sga_percent": 0.3')  # number not complete yet
+        self.assertEqual(parser.estimates, {})
+        with self.assertRaises(MalformedStreamError):
+            parser.feed('5, "maintenance_rnd_percent": 40,')
+
 if __name__ == '__main__':
     unittest.main()
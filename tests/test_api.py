@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import patch
+from src.api.app import create_app
+from src.api.testing import asgi_request
+from src.data.results_store import ResultsStore
+from src.finance.valuation import value_company
+
+def fake_analysis(ticker, **options):
+    time.sleep(0.05)  # long enough for concurrent requests to overlap
+    financials = {'ticker': ticker, 'revenue': 1000.0, 'prev_revenue': 800.0, 'ebit': 100.0, 'sga': 400.0,
+                  'rnd': 200.0, 'tax_rate': 0.2, 'shares_outstanding': 10.0, 'cash': 50.0, 'debt': 20.0}
+    market_data = {'price': 100.0, 'market_cap': 1000.0, 'company_name': f'{ticker} Inc'}
+    ai_estimates = {'maintenance_sga_percent': 0.5, 'maintenance_rnd_percent': 0.5, 'reasoning': 'ok'}
+    return {'ticker': ticker, 'financials': financials, 'mda': {'text': '', 'is_mock': False},
+            'market_data': market_data, 'ai_estimates': ai_estimates,
+            'valuation': value_company(financials, market_data, ai_estimates)}
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(store=ResultsStore(":memory:"))
+        patcher = patch('src.pipeline.run_analysis', side_effect=fake_analysis)
+        self.run_analysis = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, *args, **kwargs):
+        return asyncio.run(asgi_request(self.app, *args, **kwargs))
+
+    def test_concurrent_identical_requests_share_one_computation(self):
+        async def burst():
+            return await asyncio.gather(*(asgi_request(self.app, 'GET', '/valuation/shop') for _ in range(10)))
+
+        responses = asyncio.run(burst())
+
+        self.assertEqual({status for status, _, _ in responses}, {200})
+        self.assertEqual(len({body for _, _, body in responses}), 1)
+        self.run_analysis.assert_called_once_with('SHOP')
+        self.assertEqual(json.loads(responses[0][2])['valuation']['equity_epv'], 3230.0)
+
+    def test_etag_revalidation_and_overrides(self):
+        status, headers, body = self.request('GET', '/valuation/SHOP')
+        self.assertEqual(status, 200)
+
+        status, _, body = self.request('GET', '/valuation/SHOP', headers={'If-None-Match': headers['etag']})
+        self.assertEqual((status, body), (304, b''))
+
+        status, headers_08, body = self.request('GET', '/valuation/SHOP?wacc=0.08&maintenance_sga_percent=1')
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers_08['etag'], headers['etag'])
+        # NOPAT with no S&M add-back: (100 + 100) * 0.8 = 160, capitalized at 8%
+        self.assertAlmostEqual(json.loads(body)['valuation']['firm_epv'], 2000.0)
+        self.run_analysis.assert_called_once()
+
+    def test_batch_scenarios_and_validation(self):
+        status, _, body = self.request('GET', '/valuations?tickers=SHOP,DDOG,SHOP')
+        self.assertEqual(status, 200)
+        self.assertEqual([v['ticker'] for v in json.loads(body)['valuations']], ['SHOP', 'DDOG'])
+
+        status, _, body = self.request('POST', '/scenarios', body={
+            'tickers': ['SHOP'],
+            'scenarios': [{'name': 'bear', 'cost_of_capital': 0.125}, {'name': 'base'}],
+            'outputs': ['firm_epv'],
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {
+            'columns': ['ticker', 'scenario', 'firm_epv'],
+            'rows': [['SHOP', 'bear', 2560.0], ['SHOP', 'base', 3200.0]],
+        })
+
+        self.assertEqual(self.request('GET', '/valuation/TOOLONG')[0], 400)
+        self.assertEqual(self.request('GET', '/valuation/SHOP?wacc=abc')[0], 400)
+        self.assertEqual(self.request('POST', '/scenarios', body={'tickers': ['SHOP'], 'scenarios': [{'wacc': 1}]})[0], 400)
+        self.assertEqual(self.request('POST', '/scenarios', body={
+            'tickers': ['SHOP'], 'scenarios': [{'name': 'a'}], 'outputs': ['bogus']})[0], 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import io
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from benchmarks import bench_sessions
+from benchmarks.bench_sessions import OfflineServices, check_budgets, make_sessions, make_universe, run_sessions
+from src.cache.backends import get_cache
+from src.data.sec_fetcher import SECFetcher
+
+def run(sessions, services, **options):
+    with redirect_stdout(io.StringIO()):
+        return run_sessions(sessions, 4, services, **options)
+
+class TestSessionLoadHarness(unittest.TestCase):
+    def setUp(self):
+        self.universe, self.unknown = make_universe(12, random.Random(0))
+        self.services = OfflineServices(self.universe, latency=0.002, llm_latency=0.01)
+
+    def test_pipeline_run_reports_every_session(self):
+        sessions = make_sessions(self.universe, self.unknown, 20, random.Random(1), interactions=3)
+        result = run(sessions, self.services)
+
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(len(result['opens']), 20)
+        self.assertEqual(len(result['interactions']), 60)
+        store = result['caches']['results_store']
+        self.assertEqual(store['hits'] + store['misses'], sum(len(tickers) for tickers, _ in sessions))
+        self.assertGreater(store['hits'], 0)
+        self.assertEqual(set(result['upstream_calls']), {'sec', 'yfinance', 'openai'})
+        self.assertGreater(result['memory']['rss_end'], 0)
+        with redirect_stdout(io.StringIO()) as out:
+            bench_sessions.report(result)
+        self.assertIn('interaction    p50=', out.getvalue())
+
+    def test_concurrent_sessions_share_one_pipeline_run(self):
+        sessions = [(['DDOG'], [('DDOG', 'cost_of_capital', 0.09)])] * 4
+        services = OfflineServices(['SHOP', 'DDOG'], latency=0.02, llm_latency=0.05)
+        flights = run(sessions, services)['caches']['flights']
+        self.assertEqual(flights['analysis_ran'], 1)
+        self.assertEqual(flights['analysis_coalesced'], 3)
+        self.assertEqual(services.calls['openai'], 1)
+
+    def test_stubs_answer_like_the_real_services(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        with self.services.installed(workdir.name):
+            fetcher = SECFetcher()
+            financials = fetcher.get_financials(self.universe[1])
+            self.assertEqual(financials.source, 'yfinance')
+            self.assertFalse(fetcher.get_mda_text(self.universe[1])['is_mock'])
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(fetcher.get_financials(self.unknown[0]).is_mock)
+            self.assertEqual(get_cache().name, 'memory')
+        self.assertNotEqual(get_cache().name, 'memory')
+
+    def test_budgets(self):
+        result = {'opens': [0.1] * 99 + [2.0], 'interactions': [0.001], 'errors': {},
+                  'memory': {'rss_mid': 100 * 1024 ** 2, 'rss_end': 130 * 1024 ** 2}}
+        self.assertEqual(check_budgets(result), [])
+        failures = check_budgets(result, max_p99_ms=1000, max_rss_growth_mb=20)
+        self.assertEqual(failures, ['open p99 2000ms > 1000ms', 'rss grew 30.0MB in the second half > 20.0MB'])
+
+    def test_app_sessions_drive_main(self):
+        sessions = [([self.universe[1]], [(self.universe[1], 'maintenance_sga_percent', 0.25),
+                                          (self.universe[1], 'cost_of_capital', 0.085)])]
+        result = run(sessions, self.services, target='app')
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(len(result['interactions']), 2)
+        # The landing ticker and the typed one
+        self.assertEqual(result['caches']['results_store']['misses'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.cache import codec
+from src.cache.backends import MemoryCache, NullCache, RedisCache, SQLiteCache, create_cache, set_cache
+from src.cache.testing import FakeRedisServer
+from src.data.results_store import ResultsStore
+from src.finance.financials import Financials
+from src.pipeline import load_analysis
+from tests.helpers import FakeClock
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip(self):
+        value = {
+            'ticker': 'SHOP', 'revenue': 7.06e9, 'shares': 1_300_000_000, 'big': -2 ** 70, 'is_mock': False,
+            'sector': None, 'tags': ['saas', 'ecommerce'], 'raw': b'\x00\xff', 'nested': {'a': [1, 2.5, {}]},
+        }
+        self.assertEqual(codec.loads(codec.dumps(value)), value)
+
+    def test_mappings_tuples_and_numpy_scalars(self):
+        import numpy as np
+        financials = Financials(ticker='SHOP', revenue=np.float64(7e9))
+        self.assertEqual(codec.loads(codec.dumps(financials)), financials.to_dict())
+        self.assertEqual(codec.loads(codec.dumps((1, 2))), [1, 2])
+
+    def test_smaller_than_json_and_compresses_large_values(self):
+        financials = Financials(ticker='SHOP', revenue=7_060_000_000, ebit=-1.2e9, tax_rate=0.21).to_dict()
+        self.assertLess(len(codec.dumps(financials)), len(json.dumps(financials)))
+
+        mda = {'text': 'Net revenue retention was 120%. ' * 500, 'is_mock': False}
+        blob = codec.dumps(mda)
+        self.assertLess(len(blob), len(mda['text']) // 10)
+        self.assertEqual(codec.loads(blob), mda)
+
+    def test_rejects_unknown_types(self):
+        with self.assertRaises(codec.CodecError):
+            codec.dumps({'when': object()})
+
+    def test_corrupt_bytes_raise_codec_error(self):
+        blob = codec.dumps({'text': 'Net revenue retention was 120%. ' * 500, 'revenue': 7e9})
+        for data in (b'', b'\x01', b'\x01\x04\x00', b'\x01\x05\x0a\xff', blob[:40], b'\x03junk', b'\x01\x08\x01\x07\x00'):
+            with self.subTest(data=data[:8]):
+                with self.assertRaises(codec.CodecError):
+                    codec.loads(data)
+
+class BackendContract:
+    # Mixed into one TestCase per backend; make_cache() builds it on self.clock
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+
+    def test_set_get_delete(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get('financials:SHOP'))
+        cache.set('financials:SHOP', {'revenue': 7e9})
+        self.assertEqual(cache.get('financials:SHOP'), {'revenue': 7e9})
+        cache.delete('financials:SHOP')
+        self.assertIsNone(cache.get('financials:SHOP'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_corrupt_entries_read_as_misses(self):
+        cache = self.make_cache()
+        cache._set_bytes('financials:SHOP', codec.dumps({'revenue': 7e9})[:4], None)
+        with patch('builtins.print'):
+            self.assertIsNone(cache.get('financials:SHOP'))
+            cache.set('financials:DDOG', {'when': object()})
+        self.assertIsNone(cache.get('financials:DDOG'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['errors']), (0, 2, 2))
+
+    def test_per_key_ttl(self):
+        cache = self.make_cache()
+        cache.set('quote:SHOP', {'price': 75.5}, ttl=300)
+        cache.set('llm:abc', {'reasoning': 'ok'}, ttl=86400)
+        self.clock.now += 301
+        self.assertIsNone(cache.get('quote:SHOP'))
+        self.assertEqual(cache.get('llm:abc'), {'reasoning': 'ok'})
+
+    def test_get_or_set_skips_uncacheable_values(self):
+        cache = self.make_cache()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {'is_mock': True}
+
+        for _ in range(2):
+            cache.get_or_set('mda:SHOP', fetch, ttl=60, cacheable=lambda v: not v['is_mock'])
+        self.assertEqual(len(calls), 2)
+
+class TestMemoryCache(BackendContract, unittest.TestCase):
+    def make_cache(self):
+        return MemoryCache(clock=self.clock)
+
+    def test_values_are_copies_and_lru_bounded(self):
+        cache = MemoryCache(max_entries=2)
+        value = {'price': 1.0}
+        cache.set('a', value)
+        value['price'] = 2.0
+        self.assertEqual(cache.get('a'), {'price': 1.0})
+        cache.set('b', 1)
+        cache.set('c', 1)
+        self.assertIsNone(cache.get('a'))
+
+class TestSQLiteCache(BackendContract, unittest.TestCase):
+    def make_cache(self):
+        cache = SQLiteCache(os.path.join(tempfile.mkdtemp(), 'cache.db'), clock=self.clock)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_shared_between_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        first, second = SQLiteCache(path), SQLiteCache(path)
+        first.set('financials:SHOP', {'revenue': 7e9}, ttl=60)
+        self.assertEqual(second.get('financials:SHOP'), {'revenue': 7e9})
+        first.close()
+        second.close()
+
+class TestRedisCache(BackendContract, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # Expiry is the server's job, so the fake server runs on the test clock
+        self.server = FakeRedisServer(clock=self.clock).start()
+        self.addCleanup(self.server.stop)
+
+    def make_cache(self):
+        cache = RedisCache(self.server.url)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_replicas_share_hits(self):
+        replica_a, replica_b = self.make_cache(), self.make_cache()
+        replica_a.set('llm:abc', {'maintenance_sga_percent': 0.3}, ttl=60)
+        self.assertEqual(replica_b.get('llm:abc'), {'maintenance_sga_percent': 0.3})
+        self.assertEqual((replica_b.hits, replica_b.misses), (1, 0))
+
+    def test_unreachable_server_reads_as_miss(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        cache = RedisCache(f'redis://127.0.0.1:{port}/0', timeout=0.2)
+        with patch('builtins.print'):
+            self.assertIsNone(cache.get('financials:SHOP'))
+            cache.set('financials:SHOP', {'revenue': 1.0})
+        self.assertEqual(cache.misses, 1)
+
+class TestCreateCache(unittest.TestCase):
+    def test_specs(self):
+        self.assertIsInstance(create_cache('none'), NullCache)
+        self.assertIsInstance(create_cache('memory'), MemoryCache)
+        self.assertIsInstance(create_cache('sqlite:///:memory:'), SQLiteCache)
+        self.assertIsInstance(create_cache('redis://localhost:6379/2'), RedisCache)
+        with self.assertRaises(ValueError):
+            create_cache('memcached://localhost')
+
+class TestSharedAnalyses(unittest.TestCase):
+    def test_second_replica_reuses_analysis_from_shared_cache(self):
+        def fake_analysis(ticker, **options):
+            return {'ticker': ticker, 'financials': {'is_mock': False}, 'valuation': {'equity_epv': 1.0}}
+
+        previous = set_cache(MemoryCache())
+        self.addCleanup(set_cache, previous)
+        with patch('src.pipeline.run_analysis', side_effect=fake_analysis) as run_analysis:
+            first = load_analysis('SHOP', store=ResultsStore(':memory:'))
+            second_store = ResultsStore(':memory:')
+            second = load_analysis('SHOP', store=second_store)
+
+        run_analysis.assert_called_once_with('SHOP')
+        self.assertEqual(second, first)
+        self.assertEqual(second_store.get('SHOP'), first)
+
+    def test_shared_analyses_are_keyed_by_settings(self):
+        def fake_analysis(ticker, **options):
+            return {'ticker': ticker, 'financials': {'is_mock': False}, 'options': options}
+
+        previous = set_cache(MemoryCache())
+        self.addCleanup(set_cache, previous)
+        with patch('src.pipeline.run_analysis', side_effect=fake_analysis) as run_analysis:
+            load_analysis('SHOP', store=ResultsStore(':memory:'), ai_mode='local', cost_of_capital=0.09)
+            other_wacc = load_analysis('SHOP', store=ResultsStore(':memory:'), ai_mode='local', cost_of_capital=0.12)
+            llm = load_analysis('SHOP', store=ResultsStore(':memory:'), ai_mode='llm', cost_of_capital=0.12)
+            same = load_analysis('SHOP', store=ResultsStore(':memory:'), ai_mode='llm', cost_of_capital=0.12)
+
+        self.assertEqual(run_analysis.call_count, 3)
+        self.assertEqual(other_wacc['options'], {'ai_mode': 'local', 'cost_of_capital': 0.12})
+        self.assertEqual(same, llm)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from src.data.edgar_index import EdgarIndex, parse_master_index, parse_quarter, primary_document
+from src.data.filing_archive import FilingArchive
+from src.data.sec_fetcher import SECFetcher
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'edgar')
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+class TestEdgarIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EdgarIndex(':memory:')
+        self.addCleanup(self.index.close)
+
+    def test_parse_master_index_streams_rows_after_header(self):
+        with open(fixture('master_2024Q1.idx'), 'rb') as fh:
+            rows = list(parse_master_index(fh))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1], (1561550, 'Datadog, Inc.', '10-K', '2024-02-23',
+                                   'edgar/data/1561550/0001561550-24-000009.txt', '000156155024000009'))
+
+    def test_ingest_is_idempotent_and_records_quarters(self):
+        self.assertEqual(self.index.ingest_file(fixture('master_2023Q1.idx'), 2023, 1), 4)
+        self.index.ingest_file(fixture('master_2024Q1.idx'), 2024, 1)
+        self.index.ingest_file(fixture('master_2024Q1.idx'), 2024, 1)
+
+        self.assertEqual(self.index.count(), 10)
+        self.assertEqual([(y, q, rows) for y, q, rows, _ in self.index.quarters()], [(2023, 1, 4), (2024, 1, 6)])
+
+    def test_latest_filing_across_quarters(self):
+        self.index.ingest_file(fixture('master_2023Q1.idx'))
+        self.index.ingest_file(fixture('master_2024Q1.idx'))
+
+        latest = self.index.latest_filing(1640147)
+        self.assertEqual((latest['accession'], latest['date_filed']), ('000164014724000079', '2024-03-26'))
+        self.assertEqual(self.index.latest_filing(1640147, forms=('10-K/A',))['date_filed'], '2023-04-10')
+        self.assertIsNone(self.index.latest_filing(1594805))  # files 40-F, not 10-K
+
+    def test_filings_since_and_form_filter(self):
+        self.index.ingest_file(fixture('master_2023Q1.idx'), forms=('10-K',))
+        self.index.ingest_file(fixture('master_2024Q1.idx'), forms=('10-K',))
+
+        self.assertEqual(self.index.count(), 6)
+        new = self.index.filings_since('2024-03-01')
+        self.assertEqual([(r['cik'], r['date_filed']) for r in new], [(1640147, '2024-03-26'), (1108524, '2024-03-06')])
+        self.assertEqual(new[0]['accession'], '000164014724000079')
+
+    def test_ingest_rolls_back_on_error(self):
+        def broken_lines():
+            with open(fixture('master_2024Q1.idx'), 'rb') as fh:
+                yield from fh
+            raise IOError('connection reset')
+
+        with self.assertRaises(IOError):
+            self.index.ingest(broken_lines(), batch_size=2)
+        self.assertEqual(self.index.count(), 0)
+
+    def test_helpers(self):
+        self.assertEqual(parse_quarter('2024q3'), (2024, 3))
+        with self.assertRaises(ValueError):
+            parse_quarter('2024Q5')
+        items = [
+            {'name': 'ddog-20231231.htm', 'size': '2400000'},
+            {'name': 'ddog-ex211.htm', 'size': '9000000'},
+            {'name': 'exhibit311.htm', 'size': '9000000'},
+            {'name': 'R2.htm', 'size': '9000000'},
+            {'name': '0001561550-24-000009-index.html', 'size': '9000000'},
+            {'name': 'ddog-20231231.xsd', 'size': '9000000'},
+        ]
+        self.assertEqual(primary_document(items), 'ddog-20231231.htm')
+        self.assertIsNone(primary_document(items[1:]))
+
+# Mid-2024Q1: the fixture quarter is the current one
+NOW = datetime(2024, 2, 15, tzinfo=timezone.utc).timestamp()
+
+class TestSECFetcherWithIndex(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('src.data.edgar_index.time.time', return_value=NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_latest_10k_comes_from_index_without_submissions_api(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        index = EdgarIndex(':memory:')
+        index.ingest_file(fixture('master_2024Q1.idx'), year=2024, quarter=1)
+        archive = FilingArchive(tmpdir.name)
+        self.addCleanup(archive.close)
+        fetcher = SECFetcher(archive=archive, edgar_index=index)
+        fetcher._ticker_map_cache = {'0': {'cik_str': 1561550, 'ticker': 'DDOG'}}
+
+        def get(url, timeout=None):
+            resp = MagicMock()
+            if url.endswith('index.json'):
+                resp.json.return_value = {'directory': {'item': [{'name': 'ddog-20231231.htm', 'size': '100'}]}}
+            else:
+                resp.content = b'<html>Item 7. MD&A</html>'
+            return resp
+
+        fetcher._session = MagicMock()
+        fetcher._session.get.side_effect = get
+
+        self.assertEqual(fetcher._fetch_latest_10k_html('DDOG'), '<html>Item 7. MD&A</html>')
+        urls = [call.args[0] for call in fetcher._session.get.call_args_list]
+        self.assertEqual(urls, [
+            'https://www.sec.gov/Archives/edgar/data/1561550/000156155024000009/index.json',
+            'https://www.sec.gov/Archives/edgar/data/1561550/000156155024000009/ddog-20231231.htm',
+        ])
+        self.assertEqual(index.latest_filing(1561550)['primary_document'], 'ddog-20231231.htm')
+
+        # Indexed + archived: no network at all
+        fetcher._fetch_latest_10k_html('DDOG')
+        self.assertEqual(fetcher._session.get.call_count, 2)
+
+    def test_stale_index_falls_back_to_submissions_api(self):
+        index = EdgarIndex(':memory:')
+        index.ingest_file(fixture('master_2024Q1.idx'), year=2024, quarter=1)
+        self.assertTrue(index.is_fresh())
+        self.assertFalse(index.is_fresh(now=NOW + 8 * 24 * 60 * 60))  # re-ingest stopped a week ago
+        self.assertFalse(index.is_fresh(now=datetime(2024, 4, 2, tzinfo=timezone.utc).timestamp()))  # new quarter
+
+        fetcher = SECFetcher(edgar_index=index)
+        fetcher._ticker_map_cache = {'0': {'cik_str': 1561550, 'ticker': 'DDOG'}}
+        fetcher._session = MagicMock()
+        fetcher._session.get.return_value.json.return_value = {'filings': {'recent': {
+            'form': ['10-K'], 'accessionNumber': ['0001561550-25-000011'], 'primaryDocument': ['ddog-20241231.htm'],
+        }}}
+
+        with patch('src.data.edgar_index.time.time', return_value=NOW + 30 * 24 * 60 * 60):
+            cik, accession, url = fetcher._latest_10k_filing('DDOG')
+        self.assertEqual(accession, '000156155025000011')
+        self.assertTrue(url.endswith('/ddog-20241231.htm'))
+        self.assertIn('submissions/CIK0001561550.json', fetcher._session.get.call_args.args[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import csv
+import os
+import tempfile
+import unittest
+import pyarrow.parquet as pq
+from src.data.export import arrow_table, flatten_record, read_arrow, write_export
+from src.data.results_store import ResultsStore
+
+def record(ticker, equity_epv):
+    return {
+        'ticker': ticker,
+        'computed_at': 1700000000.0,
+        'financials': {'revenue': 1000.0, 'ebit': 100.0, 'is_mock': False, 'source': 'fmp'},
+        'mda': {'text': 'Item 7...', 'is_mock': False},
+        'market_data': {'company_name': f'{ticker} Inc', 'sector': 'Software', 'price': 10.0, 'market_cap': 500.0},
+        'ai_estimates': {'maintenance_sga_percent': 0.4, 'maintenance_rnd_percent': 0.6, 'reasoning': 'ok', 'source': 'llm'},
+        'valuation': {'equity_epv': equity_epv, 'firm_epv': equity_epv - 10, 'cost_of_capital': 0.1},
+    }
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultsStore(":memory:")
+        for i in range(5):
+            self.store.put(record(f'T{i}', 1000.0 + i))
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_arrow_table_flattens_records(self):
+        table = arrow_table(['t3', 'T1', 'MISSING'], store=self.store)
+
+        self.assertEqual(table.column('ticker').to_pylist(), ['T1', 'T3'])
+        self.assertEqual(table.column('equity_epv').to_pylist(), [1001.0, 1003.0])
+        self.assertEqual(table.column('ai_source').to_pylist(), ['llm', 'llm'])
+        legacy = record('OLD', 1.0)
+        del legacy['ai_estimates']['source']
+        self.assertEqual(flatten_record(legacy)['ai_source'], 'unknown')
+        self.assertEqual(table.column('financials_source').to_pylist(), ['fmp', 'fmp'])
+        self.assertIsNone(table.column('nopat')[0].as_py())
+        self.assertNotIn('mda_text', table.column_names)
+
+    def test_parquet_streams_row_groups(self):
+        path = os.path.join(self.tmpdir.name, 'out', 'epv.parquet')
+        rows = write_export(path, store=self.store, batch_size=2)
+
+        self.assertEqual(rows, 5)
+        parquet = pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.read(columns=['ticker']).column(0).to_pylist(), ['T0', 'T1', 'T2', 'T3', 'T4'])
+
+    def test_arrow_ipc_and_csv(self):
+        arrow_path = os.path.join(self.tmpdir.name, 'epv.arrow')
+        write_export(arrow_path, ['T2'], store=self.store, include_mda=True)
+        table = read_arrow(arrow_path)
+        self.assertEqual(table.column('mda_text').to_pylist(), ['Item 7...'])
+
+        csv_path = os.path.join(self.tmpdir.name, 'epv.csv')
+        self.assertEqual(write_export(csv_path, store=self.store), 5)
+        with open(csv_path, newline='') as fh:
+            rows = list(csv.DictReader(fh))
+        self.assertEqual(rows[4]['ticker'], 'T4')
+        self.assertEqual(float(rows[4]['equity_epv']), 1004.0)
+
+        with self.assertRaises(ValueError):
+            write_export(os.path.join(self.tmpdir.name, 'epv.xlsx'), store=self.store)
+
+    def test_iter_records_pages_through_store(self):
+        tickers = [r['ticker'] for r in self.store.iter_records(page_size=2)]
+        self.assertEqual(tickers, ['T0', 'T1', 'T2', 'T3', 'T4'])
+
+if __name__ == '__main__':
+    unittest.main()
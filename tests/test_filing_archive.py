@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.data.filing_archive import FilingArchive
+from src.data.sec_fetcher import SECFetcher
+
+class TestFilingArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive = FilingArchive(self.tmpdir.name, max_pack_bytes=4096)
+
+    def tearDown(self):
+        self.archive.close()
+        self.tmpdir.cleanup()
+
+    def test_put_get_roundtrip_and_dedup(self):
+        doc = b"<html>Item 7. Management's Discussion</html>" * 100
+        self.archive.put(320193, "0000320193-24-000123", doc)
+        self.archive.put(320193, "000032019324000999", doc)  # amended copy, identical bytes
+
+        self.assertEqual(self.archive.get(320193, "000032019324000123"), doc)
+        self.assertEqual(self.archive.get("320193", "0000320193-24-000999"), doc)
+        self.assertIsNone(self.archive.get(320193, "missing"))
+        self.assertIn((320193, "0000320193-24-000123"), self.archive)
+
+        stats = self.archive.stats()
+        self.assertEqual(stats['filings'], 2)
+        self.assertEqual(stats['unique_documents'], 1)
+        self.assertLess(stats['stored_bytes'], stats['raw_bytes'])
+
+    def test_packs_roll_over_and_survive_reopen(self):
+        docs = {f"acc{i}": os.urandom(3000) for i in range(3)}  # incompressible, one per pack
+        for accession, doc in docs.items():
+            self.archive.put(1, accession, doc)
+        self.archive.close()
+
+        reopened = FilingArchive(self.tmpdir.name, max_pack_bytes=4096)
+        try:
+            for accession, doc in docs.items():
+                self.assertEqual(reopened.get(1, accession), doc)
+            packs = [name for name in os.listdir(self.tmpdir.name) if name.startswith("pack-")]
+            self.assertEqual(len(packs), 3)
+        finally:
+            reopened.close()
+        self.archive = FilingArchive(self.tmpdir.name)
+
+    def test_sec_fetcher_serves_repeat_filings_from_archive(self):
+        fetcher = SECFetcher(archive=self.archive)
+        fetcher._session = MagicMock()
+        fetcher._latest_10k_filing = MagicMock(return_value=(42, "0000000042-24-000001", "https://sec.example/doc.htm"))
+        fetcher._session.get.return_value.content = b"<html>filing</html>"
+
+        first = fetcher._fetch_latest_10k_html("TEST")
+        second = fetcher._fetch_latest_10k_html("TEST")
+
+        self.assertEqual(first, second)
+        self.assertEqual(fetcher._session.get.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from src.data.filing_parser import FilingParserPool, extract_mda_section, parse_filings
+
+def make_filing(company, body_repeats=200):
+    body = f"<p>{company} grew revenue and Net Revenue Retention was 120%.</p>" * body_repeats
+    return (
+        "<html><body>"
+        "<p>Table of Contents</p><p>Item 7. Management's Discussion and Analysis</p><p>Item 8. Financial Statements</p>"
+        f"<p><b>Item 7. Management's Discussion and Analysis</b></p>{body}"
+        "<p><b>Item 7A. Quantitative and Qualitative Disclosures</b></p><p>Market risk.</p>"
+        "</body></html>"
+    )
+
+class TestFilingParser(unittest.TestCase):
+    def test_extract_skips_table_of_contents(self):
+        extracted = extract_mda_section(make_filing("Acme"))
+
+        self.assertIn("Acme grew revenue", extracted)
+        self.assertNotIn("Market risk", extracted)
+        self.assertNotIn("<p>", extracted)
+
+    def test_pool_matches_inline_parsing(self):
+        documents = [make_filing(name).encode("utf-8") for name in ("Acme", "Globex", "Initech")]
+        documents.append(b"<html><body>No MD&A here</body></html>")
+
+        with FilingParserPool(max_workers=2) as pool:
+            sections = pool.parse(documents)
+
+        self.assertEqual(sections, parse_filings(documents, max_workers=1))
+        self.assertIn("Globex", sections[1])
+        self.assertIsNone(sections[3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import pickle
+import unittest
+import numpy as np
+from src.finance.epv_model import GreenwaldEPV
+from src.finance.financials import Financials, FinancialsBatch
+
+class TestFinancials(unittest.TestCase):
+    def setUp(self):
+        self.legacy = {
+            'ticker': 'TEST',
+            'revenue': 1000,
+            'cogs': 300,
+            'prev_revenue': 800,
+            'ebit': 100,
+            'sga': 400,
+            'rnd': 200,
+            'tax_rate': 0.25,
+            'shares_outstanding': 100,
+            'cash': 50,
+            'debt': 20,
+            'accounts_receivable': 30,
+            'pp_and_e': 40,
+            'other_assets': 10,
+            'total_current_liabilities': 20,
+            'book_value_equity': 80,
+            'is_mock': False,
+            'source': 'fmp',
+            'fiscal_year': 2024
+        }
+
+    def test_dict_roundtrip_and_mapping_interface(self):
+        record = Financials.from_dict(dict(self.legacy, unexpected='ignored'))
+
+        self.assertEqual(record.to_dict(), self.legacy)
+        self.assertEqual(dict(record), self.legacy)
+        self.assertEqual(record['ebit'], 100)
+        self.assertEqual(record.get('missing', 7), 7)
+        self.assertNotIn('unexpected', record)
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        with self.assertRaises(KeyError):
+            record['unexpected']
+
+    def test_model_accepts_record(self):
+        model = GreenwaldEPV()
+        adjustments = {'maintenance_sga_percent': 0.5, 'maintenance_rnd_percent': 0.5}
+
+        from_record = model.calculate_normalized_earnings(Financials.from_dict(self.legacy), adjustments)
+        from_dict = model.calculate_normalized_earnings(self.legacy, adjustments)
+        self.assertEqual(from_record, from_dict)
+
+    def test_batch_columns_and_vectorized_model(self):
+        other = dict(self.legacy, ticker='OTHER', ebit=-50, sga=1000, is_mock=True, source='mock')
+        batch = FinancialsBatch.from_records([self.legacy, Financials.from_dict(other)])
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.tickers, ['TEST', 'OTHER'])
+        self.assertEqual(batch.columns['sga'].tolist(), [400.0, 1000.0])
+        self.assertEqual(batch.is_mock.tolist(), [False, True])
+        self.assertEqual(batch.to_dicts()[1], dict(other, ebit=-50.0, sga=1000.0))
+
+        # GreenwaldEPV's dict-based math runs column-wise over the batch
+        adjustments = {'maintenance_sga_percent': 0.5, 'maintenance_rnd_percent': 0.5}
+        vectorized = GreenwaldEPV().calculate_normalized_earnings(batch.columns, adjustments)
+        for i, record in enumerate(batch.to_records()):
+            row = GreenwaldEPV().calculate_normalized_earnings(record, adjustments)
+            self.assertAlmostEqual(vectorized['nopat'][i], row['nopat'])
+
+    def test_every_model_method_accepts_batch_columns(self):
+        other = dict(self.legacy, ticker='OTHER', book_value_equity=0, cash=900)
+        batch = FinancialsBatch.from_records([self.legacy, Financials.from_dict(other)])
+        model = GreenwaldEPV()
+
+        reproduction = model.calculate_reproduction_value(batch.columns)
+        epv = model.get_epv(batch.columns['ebit'], np.array([0.1, 0.0]))
+        for i, record in enumerate(batch.to_records()):
+            self.assertAlmostEqual(reproduction[i], model.calculate_reproduction_value(record))
+            self.assertAlmostEqual(epv[i], model.get_epv(record['ebit'], [0.1, 0.0][i]))
+
+if __name__ == '__main__':
+    unittest.main()
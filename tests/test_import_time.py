@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only load on first use, never at import time
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "yfinance", "plotly", "streamlit", "openai")
+
+# Cumulative import time budget for library entry points, in microseconds
+IMPORT_BUDGET_US = int(os.getenv("IMPORT_TIME_BUDGET_US", 250_000))
+
+
+def import_profile(module):
+    """
+    Imports `module` in a fresh interpreter with `python -X importtime` and
+    returns {imported module name: cumulative microseconds}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if len(fields) != 3 or not fields[1].isdigit():
+            continue  # header row
+        timings[fields[2]] = int(fields[1])
+    return timings
+
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_points_do_not_import_heavy_dependencies(self):
+        for module in ("src.data.sec_fetcher", "src.data.market_data", "src.ai.parser", "src.pipeline",
+                       "src.data.export", "src.ui.charts"):
+            with self.subTest(module=module):
+                imported = import_profile(module)
+                self.assertIn(module, imported)
+                self.assertEqual([m for m in HEAVY_MODULES if m in imported], [])
+
+    def test_pipeline_import_within_budget(self):
+        cumulative_us = import_profile("src.pipeline")["src.pipeline"]
+        self.assertLess(cumulative_us, IMPORT_BUDGET_US,
+                        f"import src.pipeline took {cumulative_us / 1000:.1f} ms")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from src.ai.local_estimator import LocalEstimator, extract_features
+from src.data.results_store import ResultsStore
+from src.pipeline import estimate_spend
+
+GROWTH_MDA = (
+    "Our net revenue retention rate was 125% as of year end. We continue to invest aggressively "
+    "in sales and marketing to win new customers and expand into new geographies, and launched new products."
+)
+RETENTION_MDA = (
+    "Annual customer churn was 20%. Sales and marketing focused on renewals and retaining existing customers, "
+    "while R&D prioritized reliability, security and reducing technical debt."
+)
+
+class TestLocalEstimator(unittest.TestCase):
+    def test_extracts_retention_signals(self):
+        features = extract_features(GROWTH_MDA, {'revenue': 1250, 'prev_revenue': 1000})
+        self.assertAlmostEqual(features['nrr_excess'], 0.25)
+        self.assertEqual(features['churn_disclosed'], 0.0)
+        self.assertAlmostEqual(features['revenue_growth'], 0.25)
+
+        features = extract_features("Gross retention was 92%.")
+        self.assertAlmostEqual(features['churn'], 0.08)
+
+    def test_heuristics_direction_and_shape(self):
+        estimator = LocalEstimator()
+        growth = estimator.estimate(GROWTH_MDA)
+        retention = estimator.estimate(RETENTION_MDA)
+
+        self.assertLess(growth['maintenance_sga_percent'], 0.3)
+        self.assertGreater(retention['maintenance_sga_percent'], growth['maintenance_sga_percent'])
+        self.assertGreater(retention['maintenance_rnd_percent'], growth['maintenance_rnd_percent'])
+        self.assertIn("NRR 125%", growth['reasoning'])
+        self.assertEqual(growth['source'], 'local')
+
+    def test_fit_on_results_store_and_persist(self):
+        store = ResultsStore(":memory:")
+        for i, (text, sga, rnd) in enumerate([(GROWTH_MDA, 0.1, 0.2), (RETENTION_MDA, 0.7, 0.5)] * 3):
+            store.put({
+                'ticker': f'T{i}',
+                'mda': {'text': text, 'is_mock': False},
+                'financials': {'revenue': 1000, 'prev_revenue': 900},
+                'ai_estimates': {'maintenance_sga_percent': sga, 'maintenance_rnd_percent': rnd, 'reasoning': 'LLM'},
+            })
+
+        trained = LocalEstimator.from_results_store(store, l2=0.01)
+        self.assertAlmostEqual(trained.estimate(RETENTION_MDA, {'revenue': 1000, 'prev_revenue': 900})['maintenance_sga_percent'], 0.7, places=1)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'model.json')
+            trained.save(path)
+            self.assertEqual(LocalEstimator.load(path).coefficients, trained.coefficients)
+
+    def test_estimate_spend_local_mode_skips_llm(self):
+        result = estimate_spend(GROWTH_MDA, {'revenue': 1000}, ai_mode='local')
+        self.assertEqual(result['source'], 'local')
+
+if __name__ == '__main__':
+    unittest.main()
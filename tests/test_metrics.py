@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from src.finance.metrics import METRICS, MetricsEngine
+from src.finance.valuation import value_company
+
+def history(ticker, revenues, margin=0.1, periods=None):
+    periods = periods or range(2018, 2018 + len(revenues))
+    return [
+        {'ticker': ticker, 'period': period, 'revenue': revenue, 'ebit': revenue * margin,
+         'sga': revenue * 0.3, 'rnd': revenue * 0.2, 'tax_rate': 0.2}
+        for period, revenue in zip(periods, revenues)
+    ]
+
+class TestMetricsEngine(unittest.TestCase):
+    def setUp(self):
+        self.rows = (history('AAA', [100, 120, 150, 180, 200, 240])
+                     + history('BBB', [50, 55, 60, 62, 70, 80], margin=-0.05))
+
+    def test_matches_snapshot_valuation(self):
+        engine = MetricsEngine().extend(self.rows)
+        adjustments = {'maintenance_sga_percent': 0.4, 'maintenance_rnd_percent': 0.6}
+        engine.set_adjustments({'AAA': adjustments})
+        latest = engine.latest()['AAA']
+
+        snapshot = dict(self.rows[5], prev_revenue=200, shares_outstanding=1)
+        valuation = value_company(snapshot, {'price': 1, 'market_cap': 1}, adjustments)
+        self.assertEqual(latest['period'], 2023)
+        for key in ('rule_of_40_gaap', 'rule_of_40_adj'):
+            self.assertAlmostEqual(latest[key], valuation[key])
+
+    def test_rolling_windows(self):
+        engine = MetricsEngine(window=3).extend(self.rows)
+        growth = engine.compute()['revenue_growth'][0]
+        np.testing.assert_allclose(growth[1:], [20, 25, 20, 100 / 9, 20])
+        self.assertTrue(np.isnan(growth[0]))
+
+        avg = engine.metrics['revenue_growth_avg'][0]
+        trend = engine.metrics['revenue_growth_trend'][0]
+        self.assertTrue(np.isnan(avg[:3]).all())  # needs three growth values
+        self.assertAlmostEqual(avg[3], (20 + 25 + 20) / 3)
+        self.assertAlmostEqual(trend[3], 0.0)
+        self.assertAlmostEqual(trend[4], (100 / 9 - 25) / 2)
+
+    def test_incremental_extend_matches_full_recompute(self):
+        engine = MetricsEngine().extend(r for r in self.rows if r['period'] < 2022)
+        engine.compute()
+        engine.extend(r for r in self.rows if r['period'] >= 2022)
+        self.assertEqual(engine._computed, 4)  # 2018-2021 kept
+        engine.extend(history('CCC', [10, 20, 30], periods=[2021, 2022, 2023]))
+
+        full = MetricsEngine().extend(self.rows + history('CCC', [10, 20, 30], periods=[2021, 2022, 2023]))
+        for name in METRICS:
+            np.testing.assert_array_equal(engine.compute()[name], full.compute()[name], err_msg=name)
+
+    def test_out_of_order_periods_and_revisions(self):
+        engine = MetricsEngine().extend(r for r in self.rows if r['period'] != 2020)
+        engine.compute()
+        engine.extend(r for r in self.rows if r['period'] == 2020)
+        self.assertEqual(engine.periods, list(range(2018, 2024)))
+        np.testing.assert_allclose(engine.compute()['revenue_growth'][0, 2], 25)
+
+        engine.extend([dict(self.rows[2], revenue=132)])
+        self.assertAlmostEqual(engine.compute()['revenue_growth'][0, 3], (180 / 132 - 1) * 100)
+
+    def test_quarterly_growth_is_year_over_year(self):
+        periods = [f'{year}Q{q}' for year in (2023, 2024) for q in range(1, 5)]
+        engine = MetricsEngine(freq='quarterly').extend(history('AAA', [10, 11, 12, 13, 15, 16, 18, 19], periods=periods))
+        frame = engine.frame(metrics=('revenue_growth',))
+        self.assertEqual(list(frame['period'][4:6]), ['2024Q1', '2024Q2'])
+        np.testing.assert_allclose(frame['revenue_growth'][4:], [50, 100 * 5 / 11, 50, 100 * 6 / 13])
+        self.assertTrue(frame['revenue_growth'][:4].isna().all())
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            MetricsEngine(freq='monthly')
+        with self.assertRaises(ValueError):
+            MetricsEngine(window=1)
+        self.assertEqual(MetricsEngine().latest(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from src.cache.backends import MemoryCache, get_cache, set_cache
+from src.data import market_data
+from src.data.negative_cache import (
+    DEFAULT_TTLS, NEGATIVE_CACHE, NO_10K, PROVIDER_NO_DATA, TICKER_UNKNOWN, NegativeCache, negative_ttls,
+)
+from src.data.sec_fetcher import SECFetcher
+from tests.helpers import FakeClock
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.cache = NegativeCache(ttls={TICKER_UNKNOWN: 60, PROVIDER_NO_DATA: 10}, shared=False, clock=self.clock)
+
+    def test_entries_expire_per_kind(self):
+        self.cache.record(TICKER_UNKNOWN, 'zzzz', 'CIK lookup failed')
+        self.cache.record(PROVIDER_NO_DATA, 'quote:ZZZZ')
+
+        self.assertEqual(self.cache.check(TICKER_UNKNOWN, 'ZZZZ'), 'CIK lookup failed')
+        self.assertEqual(self.cache.check(PROVIDER_NO_DATA, 'quote:zzzz'), PROVIDER_NO_DATA)
+        self.assertIsNone(self.cache.check(TICKER_UNKNOWN, 'DDOG'))
+
+        self.clock.now += 30
+        self.assertIsNone(self.cache.check(PROVIDER_NO_DATA, 'quote:ZZZZ'))
+        self.assertIsNotNone(self.cache.check(TICKER_UNKNOWN, 'ZZZZ'))
+        self.assertEqual(self.cache.stats(), {'entries': 1, 'hits': 3, 'records': 2})
+
+    def test_local_entries_are_bounded_and_swept(self):
+        cache = NegativeCache(ttls={TICKER_UNKNOWN: 60, PROVIDER_NO_DATA: 10}, shared=False, clock=self.clock,
+                              max_entries=2)
+        cache.record(TICKER_UNKNOWN, 'AAAA')
+        cache.record(TICKER_UNKNOWN, 'BBBB')
+        cache.check(TICKER_UNKNOWN, 'AAAA')
+        cache.record(TICKER_UNKNOWN, 'CCCC')
+
+        self.assertIsNone(cache.check(TICKER_UNKNOWN, 'BBBB'))  # least recently used
+        self.assertIsNotNone(cache.check(TICKER_UNKNOWN, 'AAAA'))
+
+        cache.record(PROVIDER_NO_DATA, 'quote:DDDD')
+        self.clock.now += 30
+        cache.record(PROVIDER_NO_DATA, 'quote:EEEE')  # sweeps DDDD without it being checked again
+        self.assertEqual(cache.stats()['entries'], 2)
+
+    def test_backend_misses_are_remembered_briefly(self):
+        previous = set_cache(MemoryCache())
+        self.addCleanup(set_cache, previous)
+        cache = NegativeCache(clock=self.clock, miss_ttl=5)
+
+        with patch.object(MemoryCache, 'get', wraps=get_cache().get) as backend_get:
+            for _ in range(3):
+                self.assertIsNone(cache.check(NO_10K, 'DDOG'))
+            self.assertEqual(backend_get.call_count, 1)
+
+            NegativeCache(clock=self.clock).record(NO_10K, 'DDOG', 'No 10-K filing found')
+            self.assertIsNone(cache.check(NO_10K, 'DDOG'))
+            self.clock.now += 6
+            self.assertEqual(cache.check(NO_10K, 'DDOG'), 'No 10-K filing found')
+            self.assertEqual(backend_get.call_count, 2)
+
+        cache.record(NO_10K, 'SNOW')
+        self.assertIsNotNone(cache.check(NO_10K, 'SNOW'))
+
+    def test_replicas_share_entries_through_the_cache_backend(self):
+        previous = set_cache(MemoryCache())
+        self.addCleanup(set_cache, previous)
+        NegativeCache(clock=self.clock).record(NO_10K, 'SHOP', 'No 10-K filing found')
+
+        replica = NegativeCache(clock=self.clock)
+        self.assertEqual(replica.check(NO_10K, 'SHOP'), 'No 10-K filing found')
+        replica.forget(NO_10K, 'SHOP')
+        self.assertIsNone(NegativeCache(clock=self.clock).check(NO_10K, 'SHOP'))
+
+    def test_ttl_override(self):
+        with patch.dict(os.environ, {'NEGATIVE_CACHE_TTLS': '{"no_10k": 5}'}):
+            self.assertEqual(negative_ttls()[NO_10K], 5.0)
+        with patch.dict(os.environ, {'NEGATIVE_CACHE_TTLS': 'not json'}):
+            self.assertEqual(negative_ttls(), DEFAULT_TTLS)
+
+class TestBadTickerLookups(unittest.TestCase):
+    def setUp(self):
+        NEGATIVE_CACHE.clear()
+        self.addCleanup(NEGATIVE_CACHE.clear)
+
+    @patch.dict(os.environ, {'FMP_API_KEY': ''})
+    def test_repeat_quote_for_unknown_ticker_skips_providers(self):
+        with patch.object(market_data, 'yf') as yf:
+            yf.Ticker.return_value.info = {'trailingPegRatio': None}
+            self.assertTrue(market_data._load_market_snapshot('ZQXW')['is_mock'])
+
+            start = time.perf_counter()
+            snapshot = market_data._load_market_snapshot('ZQXW')
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(snapshot['is_mock'])
+        self.assertEqual(yf.Ticker.call_count, 1)
+        self.assertLess(elapsed, 0.01)
+
+    def test_repeat_10k_lookups_skip_sec(self):
+        fetcher = SECFetcher(edgar_index=False)
+        fetcher._session = MagicMock()
+        fetcher._session.get.return_value.json.return_value = {'0': {'cik_str': 1594805, 'ticker': 'SHOP'}}
+
+        for ticker in ('ZQXW', 'ZQXW'):
+            self.assertTrue(fetcher._load_mda_text(ticker)['is_mock'])
+        self.assertEqual(fetcher._session.get.call_count, 1)  # ticker map only, once
+
+        fetcher._session.get.return_value.json.return_value = {'filings': {'recent': {'form': ['40-F']}}}
+        for ticker in ('SHOP', 'SHOP'):
+            self.assertTrue(fetcher._load_mda_text(ticker)['is_mock'])
+        self.assertEqual(fetcher._session.get.call_count, 2)  # one submissions request
+        self.assertIsNotNone(NEGATIVE_CACHE.check(NO_10K, 'SHOP'))
+
+if __name__ == '__main__':
+    unittest.main()
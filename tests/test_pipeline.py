@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from src import pipeline
+from src.data.results_store import ResultsStore
+
+DELAY = 0.1
+
+FINANCIALS = {'ticker': 'SHOP', 'revenue': 1000.0, 'prev_revenue': 800.0, 'ebit': 100.0, 'sga': 400.0,
+              'rnd': 200.0, 'tax_rate': 0.2, 'shares_outstanding': 10.0, 'cash': 50.0, 'debt': 20.0}
+
+class SlowDependencies:
+    """Every dependency sleeps DELAY; tracks how many market calls overlap."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.fetcher = MagicMock()
+        self.fetcher.get_financials.side_effect = self.slow(lambda ticker: dict(FINANCIALS, ticker=ticker))
+        self.fetcher.get_mda_text.side_effect = self.slow(lambda ticker: {'text': f'{ticker} MD&A', 'is_mock': False})
+
+    def slow(self, fn):
+        def call(*args, **kwargs):
+            time.sleep(DELAY)
+            return fn(*args, **kwargs)
+        return call
+
+    def market(self, ticker):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(DELAY)
+        with self.lock:
+            self.active -= 1
+        return {'price': 100.0, 'market_cap': 1000.0, 'company_name': ticker}
+
+    def estimate(self, mda_text, financials, ai_mode=None, **callbacks):
+        time.sleep(DELAY)
+        return {'maintenance_sga_percent': 0.5, 'maintenance_rnd_percent': 0.5, 'reasoning': mda_text}
+
+class TestAsyncPipeline(unittest.TestCase):
+    def setUp(self):
+        self.deps = SlowDependencies()
+        for target, fake in (('get_market_snapshot', self.deps.market), ('estimate_spend', self.deps.estimate)):
+            patcher = patch.object(pipeline, target, side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_analyze_overlaps_dependencies(self):
+        start = time.perf_counter()
+        record = asyncio.run(pipeline.analyze(' shop ', fetcher=self.deps.fetcher))
+        elapsed = time.perf_counter() - start
+
+        # Sequential: 4 x DELAY. Concurrent: MD&A || financials, then the estimate
+        self.assertLess(elapsed, 3 * DELAY)
+        self.assertEqual(record['ticker'], 'SHOP')
+        self.assertEqual(record['ai_estimates']['reasoning'], 'SHOP MD&A')
+        sync = pipeline.run_analysis('SHOP', fetcher=self.deps.fetcher)
+        self.assertEqual(record['valuation'], sync['valuation'])
+
+    def test_analyze_many_bounds_concurrency(self):
+        loaded = []
+        records = asyncio.run(pipeline.analyze_many(
+            ['ddog', 'SHOP', 'NET', 'ddog', 'MDB', 'SNOW'], max_concurrency=2,
+            on_loaded=lambda ticker, record: loaded.append(ticker), fetcher=self.deps.fetcher,
+        ))
+
+        self.assertEqual(list(records), ['DDOG', 'SHOP', 'NET', 'MDB', 'SNOW'])
+        self.assertEqual(sorted(loaded), sorted(records))
+        self.assertEqual(self.deps.max_active, 2)
+
+    def test_refresh_stores_every_ticker(self):
+        store = ResultsStore(':memory:')
+        with patch.object(pipeline, 'SECFetcher', return_value=self.deps.fetcher):
+            records = pipeline.refresh(['SHOP', 'NET'], store=store)
+        self.assertEqual([r['ticker'] for r in records], ['SHOP', 'NET'])
+        self.assertEqual(store.get('NET')['market_data']['company_name'], 'NET')
+
+if __name__ == '__main__':
+    unittest.main()
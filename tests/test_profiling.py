@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import profiling
+from src.utils.profiling import module_label, profiled
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.out_dir = tmpdir.name
+        self.addCleanup(profiling.disable)
+
+    def test_disabled_is_a_shared_noop(self):
+        profiling.disable()
+        threads = threading.active_count()
+        with profiled('analysis-SHOP') as profile:
+            self.assertEqual(threading.active_count(), threads)
+        self.assertIs(profile, None)
+        self.assertIs(profiled('a'), profiled('b'))
+
+    def test_sampler_attributes_worker_threads_and_writes_speedscope(self):
+        profiling.enable('sample')
+        with profiled('analysis-SHOP', out_dir=self.out_dir) as profile:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(busy, 0.2).result()
+
+        speedscope, folded, summary = profile.paths
+        self.assertTrue(speedscope.endswith('.speedscope.json'))
+        with open(speedscope) as fh:
+            document = json.load(fh)
+        self.assertEqual(document['shared']['frames'][0].keys(), {'name', 'file', 'line'})
+        self.assertTrue(all(p['type'] == 'sampled' and len(p['samples']) == len(p['weights'])
+                            for p in document['profiles']))
+        with open(folded) as fh:
+            self.assertTrue(any('busy (tests.test_profiling)' in line for line in fh))
+        with open(summary) as fh:
+            report = fh.read()
+        self.assertRegex(report, r'\d+\.\d+s\s+\d+\.\d%\s+tests\.test_profiling')
+        self.assertIn('waiting on other threads', report)
+
+    def test_cprofile_mode_and_min_seconds(self):
+        with profiled('quick', mode='cprofile', out_dir=self.out_dir, min_seconds=60) as profile:
+            busy(0.01)
+        self.assertEqual(profile.paths, [])
+        self.assertEqual(os.listdir(self.out_dir), [])
+
+        with profiled('slow', mode='cprofile', out_dir=self.out_dir) as profile:
+            busy(0.05)
+        pstats_path, summary = profile.paths
+        self.assertTrue(os.path.exists(pstats_path))
+        with open(summary) as fh:
+            self.assertIn('busy', fh.read())
+
+    def test_nested_blocks_are_covered_by_the_outer_profile(self):
+        with profiled('outer', mode='sample', out_dir=self.out_dir) as outer:
+            with profiled('inner', mode='sample', out_dir=self.out_dir) as inner:
+                busy(0.02)
+        self.assertEqual(inner.paths, [])
+        self.assertEqual(len(outer.paths), 3)
+
+    def test_module_labels(self):
+        self.assertEqual(module_label(profiling.__file__), 'utils.profiling')
+        self.assertEqual(module_label(threading.__file__), 'threading')
+        self.assertEqual(module_label('/venv/lib/python3.11/site-packages/requests/sessions.py'), 'requests')
+        self.assertEqual(module_label('<frozen os>'), '<frozen os>')
+        with self.assertRaises(ValueError):
+            profiling.enable('perf')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.data.results_store import ResultsStore
+from src.pipeline import analysis_settings, load_analyses, load_analysis, metrics_history
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultsStore(":memory:")
+        self.record = {
+            'ticker': 'test',
+            'financials': {'revenue': 1000, 'ebit': 100},
+            'mda': {'text': 'MD&A', 'is_mock': False},
+            'market_data': {'company_name': 'Test Corp', 'price': 10, 'market_cap': 1000},
+            'ai_estimates': {'maintenance_sga_percent': 0.3, 'maintenance_rnd_percent': 0.4, 'reasoning': 'x'},
+            'valuation': {'epv_discount_pct': 12.5, 'rule_of_40_adj': 45.0, 'franchise_value_pct': 30.0},
+        }
+
+    def test_put_and_get_roundtrip(self):
+        self.store.put(self.record)
+
+        stored = self.store.get('TEST')
+        self.assertEqual(stored['ticker'], 'TEST')
+        self.assertEqual(stored['market_data']['company_name'], 'Test Corp')
+        self.assertEqual(stored['valuation']['rule_of_40_adj'], 45.0)
+        self.assertIn('computed_at', stored)
+        self.assertEqual(self.store.tickers(), ['TEST'])
+
+    def test_get_miss_and_stale(self):
+        self.assertIsNone(self.store.get('NOPE'))
+
+        self.store.put(dict(self.record, computed_at=0))
+        self.assertIsNone(self.store.get('TEST', max_age=60))
+        self.assertIsNotNone(self.store.get('TEST'))
+
+    def _populate_universe(self):
+        rows = [
+            ('AAA', 'Software', 30.0, 50.0),
+            ('BBB', 'Software', -10.0, 20.0),
+            ('CCC', 'Hardware', 5.0, None),
+            ('DDD', 'Hardware', 60.0, 45.0),
+        ]
+        for ticker, sector, discount, rule_of_40 in rows:
+            self.store.put(dict(
+                self.record,
+                ticker=ticker,
+                market_data={'company_name': f'{ticker} Inc', 'sector': sector, 'market_cap': 1e9},
+                valuation={'epv_discount_pct': discount, 'rule_of_40_adj': rule_of_40, 'franchise_value_pct': 10.0},
+            ))
+
+    def test_query_universe_sorts_filters_and_paginates(self):
+        self._populate_universe()
+
+        rows, total = self.store.query_universe(sort_by='epv_discount_pct', descending=True, page_size=2)
+        self.assertEqual(total, 4)
+        self.assertEqual([r['ticker'] for r in rows], ['DDD', 'AAA'])
+
+        rows, _ = self.store.query_universe(sort_by='epv_discount_pct', descending=True, page=2, page_size=2)
+        self.assertEqual([r['ticker'] for r in rows], ['CCC', 'BBB'])
+
+        rows, total = self.store.query_universe(sort_by='rule_of_40_adj', descending=False, sector='Hardware')
+        self.assertEqual(total, 2)
+        # NULLs sort last regardless of direction
+        self.assertEqual([r['ticker'] for r in rows], ['DDD', 'CCC'])
+
+        rows, total = self.store.query_universe(search='bb', min_rule_of_40=10)
+        self.assertEqual([r['ticker'] for r in rows], ['BBB'])
+
+        with self.assertRaises(ValueError):
+            self.store.query_universe(sort_by='payload; DROP TABLE results')
+
+    def test_sector_summary(self):
+        self._populate_universe()
+
+        summary = {row['sector']: row for row in self.store.sector_summary()}
+        self.assertEqual(summary['Software']['companies'], 2)
+        self.assertAlmostEqual(summary['Software']['avg_epv_discount_pct'], 10.0)
+        self.assertEqual(summary['Hardware']['undervalued'], 2)
+        self.assertEqual(self.store.sectors(), ['Hardware', 'Software'])
+
+    def test_mock_records_are_hidden_from_screens(self):
+        self._populate_universe()
+        self.store.put(dict(self.record, ticker='MOCK', market_data={
+            'company_name': 'MOCK (Mock)', 'sector': 'Mocked', 'market_cap': 9.8e10, 'is_mock': True,
+        }))
+
+        rows, total = self.store.query_universe()
+        self.assertEqual(total, 4)
+        self.assertNotIn('MOCK', [r['ticker'] for r in rows])
+        self.assertEqual(self.store.query_universe(include_mock=True)[1], 5)
+        self.assertNotIn('Mocked', [row['sector'] for row in self.store.sector_summary()])
+        self.assertEqual(self.store.sectors(), ['Hardware', 'Software'])
+
+    def test_legacy_mock_rows_are_flagged_on_open(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'results.db')
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE results (ticker TEXT PRIMARY KEY, computed_at REAL NOT NULL, "
+                         "company_name TEXT, epv_discount_pct REAL, rule_of_40_adj REAL, "
+                         "franchise_value_pct REAL, payload TEXT NOT NULL)")
+            for ticker, mock in (('REAL', False), ('MOCK', True)):
+                payload = dict(self.record, ticker=ticker, financials={'revenue': 1, 'is_mock': mock})
+                conn.execute("INSERT INTO results VALUES (?, 1, ?, 1, 1, 1, ?)", (ticker, ticker, json.dumps(payload)))
+            conn.commit()
+            conn.close()
+
+            store = ResultsStore(path)
+            self.assertEqual([r['ticker'] for r in store.query_universe()[0]], ['REAL'])
+            store.close()
+
+    def test_history_collects_fiscal_years_across_analyses(self):
+        def financials(year, revenue, ebit, **extra):
+            return dict({'revenue': revenue, 'ebit': ebit, 'sga': 400, 'rnd': 200, 'tax_rate': 0.2,
+                         'fiscal_year': year}, **extra)
+
+        self.store.put(dict(self.record, financials=financials(2023, 800, 40)))
+        self.store.put(dict(self.record, financials=financials(2024, 1000, 100)))
+        self.store.put(dict(self.record, ticker='undated'))
+        self.store.put(dict(self.record, ticker='mock', financials=financials(2024, 1, 1, is_mock=True)))
+        self.store.delete('TEST')
+
+        self.assertEqual([(r['ticker'], r['period'], r['revenue']) for r in self.store.history()],
+                         [('TEST', 2023, 800), ('TEST', 2024, 1000)])
+        self.assertEqual(self.store.history(['nope']), [])
+
+        adjusted = metrics_history(['test'], store=self.store, adjustments={'TEST': self.record['ai_estimates']})
+        latest = adjusted.latest()['TEST']
+        self.assertEqual(latest['period'], 2024)
+        self.assertAlmostEqual(latest['revenue_growth'], 25.0)
+        self.assertAlmostEqual(latest['rule_of_40_gaap'], 35.0)
+        # Growth S&M (70% of 400) and R&D (60% of 200) added back: (100 + 400) * 0.8 / 1000
+        self.assertAlmostEqual(latest['rule_of_40_adj'], 65.0)
+
+    @patch('src.pipeline.run_analysis')
+    def test_mock_fallbacks_are_not_stored(self, mock_run_analysis):
+        mock_run_analysis.return_value = dict(self.record, ticker='TEST', market_data={'price': 75.5, 'is_mock': True})
+
+        load_analysis('TEST', store=self.store)
+        record = load_analysis('TEST', store=self.store)
+
+        self.assertTrue(record['market_data']['is_mock'])
+        self.assertEqual(mock_run_analysis.call_count, 2)
+        self.assertIsNone(self.store.get('TEST'))
+
+    @patch('src.pipeline.run_analysis')
+    def test_fallback_ai_estimates_are_not_stored(self, mock_run_analysis):
+        for source in ('defaults', 'simulated'):
+            ai_estimates = dict(self.record['ai_estimates'], source=source)
+            mock_run_analysis.return_value = dict(self.record, ticker='TEST', ai_estimates=ai_estimates)
+
+            record = load_analysis('TEST', store=self.store)
+
+            self.assertEqual(record['ai_estimates']['source'], source)
+            self.assertIsNone(self.store.get('TEST'))
+
+    @patch('src.pipeline.run_analysis')
+    def test_load_analysis_computes_only_on_miss(self, mock_run_analysis):
+        mock_run_analysis.return_value = dict(self.record, ticker='TEST')
+
+        first = load_analysis('test', store=self.store)
+        second = load_analysis('TEST', store=self.store)
+
+        mock_run_analysis.assert_called_once_with('TEST')
+        self.assertEqual(first['ticker'], second['ticker'])
+
+    @patch('src.pipeline.run_analysis')
+    def test_stored_record_with_other_settings_is_a_miss(self, mock_run_analysis):
+        mock_run_analysis.side_effect = lambda ticker, **options: dict(self.record, ticker=ticker, options=options)
+
+        local = load_analysis('TEST', store=self.store, ai_mode='local')
+        llm = load_analysis('TEST', store=self.store, ai_mode='llm')
+        other_wacc = load_analysis('TEST', store=self.store, ai_mode='llm', cost_of_capital=0.12)
+        again = load_analysis('TEST', store=self.store, ai_mode='llm', cost_of_capital=0.12)
+
+        self.assertEqual(mock_run_analysis.call_count, 3)
+        self.assertEqual(local['settings'], {'ai_mode': 'local', 'cost_of_capital': 0.1})
+        self.assertEqual(llm['options'], {'ai_mode': 'llm'})
+        self.assertEqual(again, other_wacc)
+        self.assertEqual(self.store.get('TEST')['settings'], {'ai_mode': 'llm', 'cost_of_capital': 0.12})
+
+    @patch('src.pipeline.run_analysis')
+    def test_load_analyses_loads_concurrently_in_order(self, mock_run_analysis):
+        mock_run_analysis.side_effect = lambda ticker, **options: dict(self.record, ticker=ticker)
+        self.store.put(dict(self.record, ticker='AAA', settings=analysis_settings()))
+        loaded = []
+
+        records = load_analyses(['bbb', 'AAA', 'ccc', 'BBB'], store=self.store,
+                                on_loaded=lambda ticker, record: loaded.append(ticker))
+
+        self.assertEqual(list(records), ['BBB', 'AAA', 'CCC'])
+        self.assertEqual(sorted(loaded), ['AAA', 'BBB', 'CCC'])
+        self.assertEqual(sorted(c.args[0] for c in mock_run_analysis.call_args_list), ['BBB', 'CCC'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import types
+import unittest
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+from src.data import market_data
+from src.data.source_router import ProviderNoData, ProvidersExhausted, SourceRouter
+from src.utils.retry import NonRetryableError, RetryPolicy, is_retryable, retry_after, retry_also
+
+def http_error(status, headers=None):
+    error = Exception(f"HTTP {status}")
+    error.response = types.SimpleNamespace(status_code=status, headers=headers or {})
+    return error
+
+class Flaky:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+@patch('src.utils.retry.time.sleep')
+class TestRetryPolicy(unittest.TestCase):
+    policy = RetryPolicy(name="test", max_attempts=4, base_delay=1.0, max_delay=3.0, jitter=False, log=False)
+
+    def test_retries_transient_errors_with_capped_exponential_backoff(self, sleep):
+        fn = Flaky(ConnectionError("reset"), TimeoutError(), http_error(503), "ok")
+        self.assertEqual(self.policy.call(fn), "ok")
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1.0, 2.0, 3.0])
+
+    def test_non_retryable_errors_fail_on_first_attempt(self, sleep):
+        for error in (NonRetryableError("unknown ticker"), http_error(404), http_error(401)):
+            fn = Flaky(error, "ok")
+            with self.assertRaises(Exception) as ctx:
+                self.policy.call(fn)
+            self.assertIs(ctx.exception, error)
+            self.assertEqual(fn.calls, 1)
+        sleep.assert_not_called()
+
+    def test_gives_up_after_max_attempts_with_last_error(self, sleep):
+        errors = [ConnectionError(f"reset {i}") for i in range(4)]
+        with self.assertRaises(ConnectionError) as ctx:
+            self.policy.call(Flaky(*errors))
+        self.assertIs(ctx.exception, errors[-1])
+        self.assertEqual(sleep.call_count, 3)
+
+    def test_retry_after_is_honoured(self, sleep):
+        fn = Flaky(http_error(429, {"Retry-After": "2.5"}), "ok")
+        self.assertEqual(self.policy.call(fn), "ok")
+        sleep.assert_called_once_with(2.5)
+
+        date_header = {"Retry-After": formatdate(usegmt=True)}
+        self.assertAlmostEqual(retry_after(http_error(503, date_header)), 0.0, delta=1.0)
+        self.assertIsNone(retry_after(http_error(503, {"Retry-After": "soon"})))
+
+    def test_deadline_stops_retries_that_cannot_finish(self, sleep):
+        policy = self.policy.with_options(deadline=5.0)
+        fn = Flaky(http_error(429, {"Retry-After": "30"}), "ok")
+        with self.assertRaises(Exception):
+            policy.call(fn)
+        self.assertEqual(fn.calls, 1)
+        sleep.assert_not_called()
+
+    def test_full_jitter_stays_under_the_ceiling(self, sleep):
+        policy = self.policy.with_options(jitter=True)
+        delays = [policy.backoff(3) for _ in range(200)]
+        self.assertTrue(all(0 <= d <= 3.0 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_classification(self, sleep):
+        RateLimitError = type("RateLimitError", (Exception,), {})
+        self.assertTrue(is_retryable(RateLimitError()))
+        self.assertTrue(is_retryable(http_error(408)))
+        self.assertFalse(is_retryable(http_error(400)))
+        self.assertFalse(is_retryable(ProviderNoData("no quote")))
+        APITimeoutError = type("APITimeoutError", (Exception,), {})
+        self.assertTrue(is_retryable(APITimeoutError()))
+
+    def test_unknown_errors_fail_fast(self, sleep):
+        for error in (KeyError("close"), TypeError("NoneType"), AttributeError("info"), ValueError("bad json")):
+            fn = Flaky(error, "ok")
+            with self.assertRaises(type(error)):
+                self.policy.call(fn)
+            self.assertEqual(fn.calls, 1)
+        sleep.assert_not_called()
+
+    def test_malformed_responses_are_retried_when_opted_in(self, sleep):
+        policy = self.policy.with_options(classify=retry_also(ValueError))
+        self.assertEqual(policy.call(Flaky(ValueError("bad json"), ConnectionError(), "ok")), "ok")
+        for error in (KeyError("close"), ProviderNoData("no quote")):
+            fn = Flaky(error, "ok")
+            with self.assertRaises(type(error)):
+                policy.call(fn)
+            self.assertEqual(fn.calls, 1)
+
+class TestAsyncRetry(unittest.TestCase):
+    def test_call_async_awaits_between_attempts(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=0.01, jitter=False, log=False)
+        fn = Flaky(ConnectionError(), "sync ok")
+        attempts = []
+
+        async def coro():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise TimeoutError()
+            return "async ok"
+
+        with patch('src.utils.retry.time.sleep') as sleep:
+            self.assertEqual(asyncio.run(policy.call_async(fn)), "sync ok")
+            self.assertEqual(asyncio.run(policy.call_async(coro)), "async ok")
+        sleep.assert_not_called()
+        self.assertEqual(len(attempts), 2)
+
+class TestInvalidTickers(unittest.TestCase):
+    @patch('src.utils.retry.time.sleep')
+    def test_unknown_ticker_is_not_retried(self, sleep):
+        with patch.object(market_data, 'yf') as yf:
+            yf.Ticker.return_value.info = {'trailingPegRatio': None}
+            with self.assertRaises(ProviderNoData):
+                market_data._fetch_yfinance_quote('ZZZZZZ')
+        self.assertEqual(yf.Ticker.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_no_data_does_not_trip_the_circuit(self):
+        router = SourceRouter("test", hedge=False)
+        fetch = MagicMock(side_effect=ProviderNoData("unknown ticker"))
+        for _ in range(10):
+            with self.assertRaises(ProvidersExhausted):
+                router.call([("yfinance", fetch)])
+        router._executor.shutdown(wait=True)
+        health = router.health("yfinance")
+        self.assertEqual(health.state, "closed")
+        self.assertEqual(health.error_rate(), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src.finance import scenarios as scenarios_module
+from src.finance.scenarios import Scenario, run_scenarios, scenario_grid
+from src.finance.valuation import value_company
+
+def company(ticker, scale):
+    return {
+        'ticker': ticker, 'revenue': 1000 * scale, 'prev_revenue': 800 * scale, 'ebit': 100 * scale,
+        'sga': 400 * scale, 'rnd': 200 * scale, 'tax_rate': 0.2, 'shares_outstanding': 10 * scale,
+        'cash': 50 * scale, 'debt': 20 * scale, 'accounts_receivable': 100 * scale, 'pp_and_e': 50 * scale,
+        'other_assets': 0, 'total_current_liabilities': 50 * scale, 'book_value_equity': 900 * scale,
+    }
+
+class TestScenarios(unittest.TestCase):
+    def setUp(self):
+        self.companies = [company('AAA', 1), company('BBB', 3), company('CCC', 0.5)]
+        self.adjustments = [{'maintenance_sga_percent': 0.4, 'maintenance_rnd_percent': 0.6}] * 3
+        self.market = [{'price': 100, 'market_cap': 1000}, {'price': 0, 'market_cap': 0}, {'price': 50, 'market_cap': 250}]
+
+    def test_matches_single_company_valuation(self):
+        scenarios = [
+            Scenario('base'),
+            Scenario('bear', cost_of_capital=0.12, maintenance_sga_percent=0.8, tax_rate=0.25),
+        ]
+        outputs = scenarios_module.OUTPUTS
+        frame = run_scenarios(self.companies, scenarios, self.adjustments, self.market, outputs=outputs)
+
+        self.assertEqual(len(frame), 6)
+        self.assertEqual(list(frame['scenario'][:2]), ['base', 'bear'])
+        for row in frame.itertuples():
+            i = ['AAA', 'BBB', 'CCC'].index(row.ticker)
+            financials = dict(self.companies[i])
+            adjustments = dict(self.adjustments[i])
+            wacc = 0.10
+            if row.scenario == 'bear':
+                financials['tax_rate'] = 0.25
+                adjustments['maintenance_sga_percent'] = 0.8
+                wacc = 0.12
+            expected = value_company(financials, self.market[i], adjustments, wacc)
+            for name in outputs:
+                self.assertAlmostEqual(getattr(row, name), expected[name], places=6, msg=(row.ticker, row.scenario, name))
+
+    def test_grid_and_validation(self):
+        grid = scenario_grid(cost_of_capital=[0.08, 0.1], maintenance_rnd_percent=[0.3, 0.5, 0.7])
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0].name, 'cost_of_capital=0.08,maintenance_rnd_percent=0.3')
+
+        with self.assertRaises(ValueError):
+            scenario_grid(wacc=[0.1])
+        with self.assertRaises(ValueError):
+            run_scenarios(self.companies, [Scenario('a'), Scenario('a')])
+        with self.assertRaises(ValueError):
+            run_scenarios(self.companies, grid, outputs=('upside_pct',))
+
+    def test_parallel_matches_in_process(self):
+        grid = scenario_grid(cost_of_capital=[0.0, 0.08, 0.1], maintenance_sga_percent=[0.2, 0.9])
+        serial = run_scenarios(self.companies, grid, self.adjustments)
+        with patch.object(scenarios_module, 'BLOCK_CELLS', 6):  # one company per block
+            parallel = run_scenarios(self.companies, grid, self.adjustments, max_workers=2, parallel_min_cells=0)
+
+        for name in scenarios_module.DEFAULT_OUTPUTS:
+            np.testing.assert_allclose(parallel[name], serial[name])
+        # Zero WACC is guarded like GreenwaldEPV.get_epv
+        self.assertEqual(serial.loc[serial['scenario'].str.startswith('cost_of_capital=0,'), 'firm_epv'].abs().sum(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
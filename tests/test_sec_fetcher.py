@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import json
-from src.data.sec_fetcher import SECFetcher
+import os
+import threading
+from src.cache.backends import MemoryCache, set_cache
+from src.data.filing_parser import FilingParserPool
+from src.data.sec_fetcher import FETCH_FLIGHTS, SECFetcher
 
 class TestSECFetcher(unittest.TestCase):
     def setUp(self):
@@ -10,8 +14,9 @@ class TestSECFetcher(unittest.TestCase):
 
     @patch('src.data.sec_fetcher.os.getenv')
     def test_get_financials_mock_fallback(self, mock_getenv):
-        # Mock API keys to be None/Empty
-        mock_getenv.return_value = None
+        # Mock API keys to be None/Empty (yfinance is imported lazily inside this
+        # patch and reads its own settings, so only hide our keys)
+        mock_getenv.side_effect = lambda key, default=None: None if key.endswith("_API_KEY") else os.environ.get(key, default)
 
         # Mock yfinance Ticker to fail or be empty
         with patch('src.data.sec_fetcher.yf.Ticker') as mock_ticker_cls:
@@ -43,7 +48,8 @@ class TestSECFetcher(unittest.TestCase):
                 "researchAndDevelopmentExpenses": 50,
                 "incomeTaxExpense": 20,
                 "incomeBeforeTax": 100,
-                "weightedAverageShsOutDil": 50
+                "weightedAverageShsOutDil": 50,
+                "calendarYear": "2024"
             },
             {
                 "revenue": 800 # Previous
@@ -70,6 +76,7 @@ class TestSECFetcher(unittest.TestCase):
         self.assertEqual(data['source'], 'fmp')
         self.assertEqual(data['revenue'], 1000)
         self.assertEqual(data['ebit'], 200)
+        self.assertEqual(data['fiscal_year'], 2024)
 
     def test_extract_mda_section(self):
         # Create a mock HTML with Item 7
@@ -93,5 +100,30 @@ class TestSECFetcher(unittest.TestCase):
         extracted = self.fetcher._extract_mda_section(html)
         self.assertIsNone(extracted)
 
+    def test_get_mda_texts_uses_shared_cache_and_flights(self):
+        cache = MemoryCache()
+        previous = set_cache(cache)
+        self.addCleanup(set_cache, previous)
+        cached = {"text": "Cached MD&A", "is_mock": False}
+        cache.set("mda:SNOW", cached)
+        filing = (b"<p><b>Item 7. Management's Discussion and Analysis</b></p><p>DDOG MD&A.</p>"
+                  b"<p><b>Item 8. Financial Statements</b></p>")
+        # Another caller is already fetching SHOP
+        future, leader = FETCH_FLIGHTS.claim(("mda", "SHOP"))
+        self.assertTrue(leader)
+        in_flight = {"text": "SHOP MD&A", "is_mock": False}
+        threading.Timer(0.05, FETCH_FLIGHTS.resolve, (("mda", "SHOP"), future), {"result": in_flight}).start()
+
+        with patch.object(SECFetcher, '_fetch_latest_10k_document', return_value=filing) as fetch:
+            results = self.fetcher.get_mda_texts(["SNOW", "DDOG", "SHOP"], parser_pool=FilingParserPool(max_workers=1))
+
+        fetch.assert_called_once_with("DDOG")
+        self.assertEqual(list(results), ["SNOW", "DDOG", "SHOP"])
+        self.assertEqual(results["SNOW"], cached)
+        self.assertIn("DDOG MD&A", results["DDOG"]["text"])
+        self.assertIs(results["SHOP"], in_flight)
+        self.assertEqual(self.fetcher.get_mda_text("DDOG"), results["DDOG"])  # now in the shared cache
+        self.assertEqual(FETCH_FLIGHTS.in_flight(), 0)
+
 if __name__ == '__main__':
     unittest.main()
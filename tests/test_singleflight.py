@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.data.results_store import ResultsStore
+from src.pipeline import load_analyses
+from src.utils.singleflight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = 0
+
+    def slow_fetch(self, value, delay=0.05):
+        self.calls += 1
+        time.sleep(delay)
+        return {"value": value}
+
+    def test_concurrent_threads_share_one_call(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.flights.do("SHOP", self.slow_fetch, "SHOP"), range(8)))
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual((self.flights.leaders, self.flights.shared), (1, 7))
+        self.assertEqual(self.flights.in_flight(), 0)
+
+    def test_different_keys_and_sequential_calls_run_separately(self):
+        self.flights.do("SHOP", self.slow_fetch, "SHOP", delay=0)
+        self.flights.do("SHOP", self.slow_fetch, "SHOP", delay=0)
+        self.flights.do("DDOG", self.slow_fetch, "DDOG", delay=0)
+        self.assertEqual(self.calls, 3)
+
+    def test_leader_exception_reaches_every_waiter(self):
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("SEC unavailable")
+
+        def call():
+            try:
+                self.flights.do("SHOP", failing)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(call)
+            started.wait()
+            followers = [pool.submit(call) for _ in range(3)]
+            errors = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(errors, ["SEC unavailable"] * 4)
+        self.assertEqual(self.flights.leaders, 1)
+
+    def test_async_tasks_join_thread_fetch(self):
+        async def main():
+            thread = asyncio.create_task(asyncio.to_thread(self.flights.do, "SHOP", self.slow_fetch, "SHOP"))
+            await asyncio.sleep(0.01)
+            joined = await asyncio.gather(*(self.flights.do_async("SHOP", self.slow_fetch, "SHOP") for _ in range(5)))
+            return [await thread] + joined
+
+        results = asyncio.run(main())
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_cancelled_waiter_does_not_cancel_shared_work(self):
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            first = asyncio.create_task(self.flights.do_async("SHOP", fetch))
+            second = asyncio.create_task(self.flights.do_async("SHOP", fetch))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second, first.cancelled()
+
+        self.assertEqual(asyncio.run(main()), ("done", True))
+
+class TestPipelineCoalescing(unittest.TestCase):
+    def test_concurrent_loads_of_one_ticker_run_pipeline_once(self):
+        def fake_analysis(ticker, **options):
+            time.sleep(0.05)
+            return {"ticker": ticker, "valuation": {}}
+
+        store = ResultsStore(":memory:")
+        with patch("src.pipeline.run_analysis", side_effect=fake_analysis) as run_analysis:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: load_analyses(["shop"], store=store), range(4)))
+
+        run_analysis.assert_called_once_with("SHOP")
+        self.assertTrue(all(r["SHOP"]["ticker"] == "SHOP" for r in results))
+
+if __name__ == '__main__':
+    unittest.main()
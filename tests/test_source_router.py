@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from src.data.source_router import CLOSED, OPEN, ProviderHealth, ProvidersExhausted, SourceRouter
+from tests.helpers import FakeClock
+
+class TestSourceRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = SourceRouter("test", default_hedge_delay=0.05)
+
+    def test_failure_falls_through_to_next_provider(self):
+        def broken():
+            raise ConnectionError("down")
+
+        result, provider = self.router.call([("primary", broken), ("backup", lambda: "ok")])
+
+        self.assertEqual((result, provider), ("ok", "backup"))
+        self.assertEqual(self.router.health("primary").error_rate(), 1.0)
+
+    def test_slow_primary_is_hedged(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(2)
+            return "slow"
+
+        start = time.monotonic()
+        result, provider = self.router.call([("primary", slow), ("backup", lambda: "fast")])
+        elapsed = time.monotonic() - start
+        release.set()
+
+        self.assertEqual((result, provider), ("fast", "backup"))
+        self.assertLess(elapsed, 1.0)
+
+    def test_invalid_answers_and_exhaustion(self):
+        with self.assertRaises(ProvidersExhausted) as ctx:
+            self.router.call([("a", lambda: None), ("b", lambda: {})], validate=bool)
+        self.assertEqual(set(ctx.exception.errors), {"a", "b"})
+
+    def test_circuit_opens_then_half_opens(self):
+        clock = FakeClock()
+        router = SourceRouter("test", health_factory=lambda name: ProviderHealth(name, min_calls=3, open_seconds=30, clock=clock))
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            raise TimeoutError("timeout")
+
+        for _ in range(3):
+            router.call([("flaky", flaky), ("backup", lambda: "ok")])
+        self.assertEqual(router.health("flaky").state, OPEN)
+
+        # Open circuit: provider is skipped without being called
+        router.call([("flaky", flaky), ("backup", lambda: "ok")])
+        self.assertEqual(len(calls), 3)
+
+        # After the cool-down a single trial is allowed; success closes the circuit
+        clock.now = 31
+        result, provider = router.call([("flaky", lambda: "recovered"), ("backup", lambda: "ok")])
+        self.assertEqual(provider, "flaky")
+        self.assertEqual(router.health("flaky").state, CLOSED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+from src.ai import telemetry
+from src.ai.client import get_llm_response, stream_llm_response
+from src.ai.parser import analyze_growth_spend
+from src.ai.telemetry import Histogram, LLMCall, Telemetry, format_report, load_events
+
+GOOD_JSON = '{"maintenance_sga_percent": 0.4, "maintenance_rnd_percent": 0.3, "reasoning": "ok"}'
+
+def fake_openai(create):
+    # Stand-in for the openai package: OpenAI(api_key).chat.completions.create
+    module = types.ModuleType('openai')
+
+    class OpenAI:
+        def __init__(self, api_key=None):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+    module.OpenAI = OpenAI
+    return patch.dict(sys.modules, {'openai': module})
+
+def completion(text, prompt_tokens=1200, completion_tokens=80):
+    return types.SimpleNamespace(
+        choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))],
+        usage=types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+class TelemetryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.telemetry = Telemetry(path=None)
+        for target in ('src.ai.telemetry.TELEMETRY', 'src.ai.parser.TELEMETRY'):
+            patcher = patch(target, self.telemetry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def calls(self, name, model):
+        return self.telemetry.snapshot()['counters'].get(name, {}).get(model, 0)
+
+class TestClientTelemetry(TelemetryTestCase):
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'OPENAI_MODEL': 'gpt-5.1'})
+    def test_fallback_call_records_model_tokens_and_cost(self):
+        def create(model, **kwargs):
+            if model != 'gpt-4o':
+                raise RuntimeError('model not found')
+            return completion(GOOD_JSON)
+
+        with fake_openai(create):
+            self.assertEqual(get_llm_response('system', 'user'), GOOD_JSON)
+
+        snapshot = self.telemetry.snapshot()
+        self.assertEqual(self.calls('calls', 'gpt-4o'), 1)
+        self.assertEqual(self.calls('fallbacks', 'gpt-4o'), 1)
+        self.assertEqual(self.calls('prompt_tokens', 'gpt-4o'), 1200)
+        self.assertAlmostEqual(snapshot['cost_usd'], (1200 * 2.50 + 80 * 10.00) / 1e6)
+        self.assertEqual(snapshot['histograms']['latency_s']['gpt-4o']['count'], 1)
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'OPENAI_MODEL': 'gpt-5.1'})
+    def test_failed_call_is_an_error(self):
+        def create(model, **kwargs):
+            raise RuntimeError('rate limited')
+
+        with fake_openai(create):
+            self.assertIn('Error calling OpenAI', get_llm_response('system', 'user'))
+        self.assertEqual(self.calls('errors', 'gpt-4o'), 1)
+
+    def test_simulated_calls_estimate_tokens_and_cost_nothing(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('OPENAI_API_KEY', None)
+            get_llm_response('system', 'x' * 400)
+            ''.join(stream_llm_response('system', 'user'))
+
+        model = os.getenv('OPENAI_MODEL', 'gpt-5.1')
+        self.assertEqual(self.calls('simulated', model), 2)
+        self.assertGreater(self.calls('prompt_tokens', model), 100)
+        self.assertEqual(self.telemetry.snapshot()['cost_usd'], 0.0)
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'OPENAI_MODEL': 'gpt-5.1'})
+    def test_stream_records_time_to_first_token_and_usage(self):
+        def create(model, **kwargs):
+            chunks = [types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=c))],
+                                            usage=None) for c in ('{"a"', ': 1}')]
+            chunks.append(types.SimpleNamespace(choices=[], usage={'prompt_tokens': 900, 'completion_tokens': 5}))
+            stream = MagicMock()
+            stream.__iter__.return_value = iter(chunks)
+            return stream
+
+        with fake_openai(create):
+            self.assertEqual(''.join(stream_llm_response('system', 'user')), '{"a": 1}')
+
+        snapshot = self.telemetry.snapshot()
+        self.assertEqual(snapshot['counters']['prompt_tokens']['gpt-5.1'], 900)
+        self.assertEqual(snapshot['histograms']['time_to_first_token_s']['gpt-5.1']['count'], 1)
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'OPENAI_MODEL': 'gpt-5.1', 'LLM_PRICES': 'not json'})
+    def test_invalid_price_override_never_fails_the_call(self):
+        with fake_openai(lambda **kwargs: completion('{"ok": true}')), patch('builtins.print') as warn:
+            self.assertEqual(get_llm_response('system', 'user'), '{"ok": true}')
+            get_llm_response('system', 'user')
+        self.assertEqual(self.calls('calls', 'gpt-5.1'), 2)
+        self.assertEqual(warn.call_count, 1)  # parsed once
+        self.assertEqual(telemetry.model_prices(), telemetry.MODEL_PRICES)
+
+class TestParserTelemetry(TelemetryTestCase):
+    @patch('src.utils.retry.time.sleep')
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'OPENAI_MODEL': 'gpt-5.1'})
+    def test_retries_are_tagged_and_counted(self, _sleep):
+        responses = iter(['{ bad json', GOOD_JSON])
+        with fake_openai(lambda model, **kwargs: completion(next(responses))):
+            result = analyze_growth_spend('Retry telemetry MD&A', {'revenue': 1})
+
+        self.assertEqual(result['reasoning'], 'ok')
+        counters = self.telemetry.snapshot()['counters']
+        self.assertEqual(counters['calls']['gpt-5.1'], 2)
+        self.assertEqual(counters['retry_calls']['gpt-5.1'], 1)
+        self.assertEqual(counters['retries']['analyze_growth_spend'], 1)
+        self.assertEqual(counters['outcome_ok']['analyze_growth_spend'], 1)
+
+class TestReport(unittest.TestCase):
+    def test_histogram_quantiles(self):
+        hist = Histogram((1, 2, 4, 8))
+        for value in (0.5, 1.5, 1.5, 3, 3, 3, 6, 6, 7, 20):
+            hist.observe(value)
+        self.assertEqual(hist.count, 10)
+        self.assertTrue(2 <= hist.quantile(0.5) <= 4)
+        self.assertTrue(8 <= hist.quantile(0.99) <= 20)
+        self.assertIsNone(Histogram((1,)).quantile(0.5))
+
+    def test_jsonl_log_round_trips_into_report(self):
+        path = os.path.join(tempfile.mkdtemp(), 'llm_calls.jsonl')
+        writer = Telemetry(path=path)
+        writer.record_call(LLMCall(model_requested='gpt-5.1', prompt_tokens=1000, completion_tokens=100, latency_s=3.2))
+        writer.record_call(LLMCall(model_requested='gpt-5.1', model_used='gpt-4o', fallback=True, latency_s=1.1))
+        writer.record_outcome('analyze_growth_spend', 2, 'ok')
+        with open(path, 'a') as fh:
+            fh.write('{"type": "call", "model_req')  # torn final line
+
+        snapshot = load_events(path).snapshot()
+        self.assertEqual(snapshot['counters']['calls'], {'gpt-5.1': 1, 'gpt-4o': 1})
+        self.assertAlmostEqual(snapshot['cost_usd'], writer.snapshot()['cost_usd'])
+
+        report = format_report(snapshot, budget_usd=1.0)
+        self.assertIn('gpt-4o', report)
+        self.assertIn('analyze_growth_spend: 1 runs, 1 retries, 0 fell back to defaults', report)
+        self.assertIn('Budget:', report)
+        self.assertEqual(format_report(Telemetry().snapshot()), 'No LLM calls recorded.')
+
+    def test_log_rotates_and_report_reads_both_files(self):
+        path = os.path.join(tempfile.mkdtemp(), 'llm_calls.jsonl')
+        writer = Telemetry(path=path, max_bytes=200)
+        for _ in range(3):
+            writer.record_call(LLMCall(model_requested='gpt-4o', model_used='gpt-4o', prompt_tokens=10))
+
+        self.assertTrue(os.path.exists(path + '.1'))
+        self.assertLess(os.path.getsize(path), 1000)
+        rotated = load_events([path + '.1', path]).snapshot()
+        self.assertEqual(rotated['counters']['calls']['gpt-4o'], 2)  # the oldest file is dropped on the second rotation
+        self.assertEqual(load_events(path).snapshot()['counters']['calls']['gpt-4o'], 1)
+
+    def test_unknown_models_are_unpriced(self):
+        self.assertIsNone(telemetry.call_cost(LLMCall(model_requested='in-house-llm', prompt_tokens=10)))
+        with patch.dict(os.environ, {'LLM_PRICES': '{"in-house-llm": [1.0, 2.0]}'}):
+            self.assertAlmostEqual(
+                telemetry.call_cost(LLMCall(model_requested='in-house-llm', prompt_tokens=1_000_000)), 1.0
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from src.finance.valuation import value_company
+from src.finance.valuation_graph import ValuationGraph
+
+FINANCIALS = {
+    'revenue': 1000, 'prev_revenue': 800, 'ebit': 100, 'sga': 400, 'rnd': 200, 'tax_rate': 0.2,
+    'shares_outstanding': 10, 'cash': 50, 'debt': 20, 'accounts_receivable': 100, 'pp_and_e': 50,
+    'other_assets': 0, 'total_current_liabilities': 50, 'book_value_equity': 0,
+}
+MARKET = {'price': 80, 'market_cap': 800}
+ADJUSTMENTS = {'maintenance_sga_percent': 0.5, 'maintenance_rnd_percent': 0.5}
+
+class TestValuationGraph(unittest.TestCase):
+    def test_summary_matches_hand_calculation(self):
+        summary = value_company(FINANCIALS, MARKET, ADJUSTMENTS, 0.1)
+
+        # Growth add-back: 200 S&M + 100 R&D -> normalized EBIT 400, NOPAT 320
+        self.assertAlmostEqual(summary['nopat'], 320)
+        self.assertAlmostEqual(summary['firm_epv'], 3200)
+        self.assertAlmostEqual(summary['equity_epv'], 3230)
+        self.assertAlmostEqual(summary['epv_per_share'], 323)
+        self.assertAlmostEqual(summary['reproduction_value'], 700)
+        self.assertAlmostEqual(summary['rule_of_40_adj'], 25 + 32)
+        self.assertEqual(summary['cost_of_capital'], 0.1)
+
+    def test_wacc_change_only_recomputes_downstream_nodes(self):
+        graph = ValuationGraph(FINANCIALS, MARKET, ADJUSTMENTS, 0.1)
+        graph.summary()
+        before = dict(graph.compute_counts)
+
+        self.assertEqual(graph.set(cost_of_capital=0.08), {'cost_of_capital'})
+        summary = graph.summary()
+
+        recomputed = {name for name, count in graph.compute_counts.items() if count != before[name]}
+        self.assertEqual(recomputed, {
+            'firm_epv', 'equity_epv', 'epv_per_share', 'franchise_value', 'franchise_value_pct',
+            'upside_pct', 'epv_discount_pct',
+        })
+        self.assertEqual(summary, value_company(FINANCIALS, MARKET, ADJUSTMENTS, 0.08))
+
+    def test_unchanged_inputs_and_results_are_cut_off(self):
+        graph = ValuationGraph(FINANCIALS, MARKET, ADJUSTMENTS)
+        graph.summary()
+        before = dict(graph.compute_counts)
+
+        # Equal (but not identical) inputs are ignored entirely
+        self.assertEqual(graph.set(financials=dict(FINANCIALS), market_data=dict(MARKET)), set())
+        graph.summary()
+        self.assertEqual(graph.compute_counts, before)
+
+        # A new market cap with the same price leaves per-share upside alone
+        graph.set(market_data={'price': 80, 'market_cap': 900})
+        graph.summary()
+        self.assertEqual(graph.compute_counts['upside_pct'], before['upside_pct'])
+        self.assertEqual(graph.compute_counts['epv_discount_pct'], before['epv_discount_pct'] + 1)
+
+    def test_sweep_restores_input(self):
+        graph = ValuationGraph(FINANCIALS, MARKET, ADJUSTMENTS, 0.1)
+        rows = graph.sweep('cost_of_capital', [0.08, 0.1, 0.12], outputs=('firm_epv',))
+
+        self.assertEqual([round(r['firm_epv']) for r in rows], [4000, 3200, 2667])
+        self.assertEqual(graph['cost_of_capital'], 0.1)
+        self.assertEqual(graph.compute_counts['normalized_earnings'], 1)
+
+        with self.assertRaises(KeyError):
+            graph.set(wacc=0.1)
+
+if __name__ == '__main__':
+    unittest.main()